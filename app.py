@@ -13,6 +13,7 @@ from src.database.connection import DatabaseConnection
 from src.vector_store.chroma_manager import ChromaManager
 from src.utils.join_parser import JoinParser
 from src.utils.openai_generator import OpenAIGenerator
+from src.monitoring import track_page
 import json
 
 # Add a small delay to ensure proper module loading
@@ -78,6 +79,7 @@ def sync_table_inputs():
     while len(st.session_state.table_inputs) > st.session_state.num_table_inputs:
         st.session_state.table_inputs.pop()
 
+@track_page("Home")
 def main():
     st.title("SQL Integration Tool")
     
@@ -0,0 +1,298 @@
+"""
+Benchmark the hot paths of the Dataset Understanding Agent against a synthetic warehouse.
+
+Usage:
+    python -m benchmarks.run_benchmarks --orders 10000 --output bench.json
+    python -m benchmarks.run_benchmarks --compare baseline.json --threshold 0.2
+"""
+
+from types import SimpleNamespace
+from typing import List, Dict, Optional, Any, Callable
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_warehouse import build_warehouse, DATASET_VIEW
+from src.cache.result_cache import result_cache
+from src.database.connection import DatabaseConnection
+from src.utils.dataset_profiler import DatasetProfiler
+from src.utils.join_parser import JoinParser
+
+def measure(name: str, fn: Callable[[], Any], iterations: int = 10, warmup: int = 1,
+            setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Time a callable and summarize the wall-clock distribution
+
+    Args:
+        name: Benchmark name used in the results file
+        fn: Callable to time; if it returns a sized object its length is recorded as rows
+        iterations: Timed runs
+        warmup: Untimed runs before timing
+        setup: Untimed callable run before every iteration
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    timings = []
+    rows = None
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        if hasattr(result, "__len__"):
+            rows = len(result)
+
+    timings.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "rows": rows,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+def skipped(name: str, reason: str) -> Dict[str, Any]:
+    """Record a benchmark that could not run in this environment"""
+    print(f"  skipped {name}: {reason}")
+    return {"name": name, "skipped": reason}
+
+class _FakeCompletions:
+    """Stand-in for client.chat.completions that returns a canned view definition"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        content = f"CREATE VIEW bench_view AS SELECT * FROM orders -- {len(kwargs['messages'][-1]['content'])}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def fake_openai_client(latency: float = 0.0):
+    """Build an object shaped like openai.OpenAI() for OpenAIGenerator"""
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(latency)))
+
+def run_database_benchmarks(url: str, label: str, iterations: int, preview_rows: int) -> List[Dict[str, Any]]:
+    """Benchmark DatabaseConnection and profiling against one warehouse"""
+    results = []
+    print(f"[{label}] database benchmarks")
+
+    def connect():
+        db = DatabaseConnection(url)
+        if not db.connect():
+            raise RuntimeError(f"Failed to connect to {url}")
+        db.close()
+
+    results.append(measure(f"{label}.connect", connect, iterations))
+
+    db = DatabaseConnection(url)
+    if not db.connect():
+        raise RuntimeError(f"Failed to connect to {url}")
+    try:
+        def reflect():
+            tables = db.get_tables()
+            for table in tables:
+                db.get_table_columns(table)
+                db.get_foreign_keys(table)
+            return tables
+
+        # Clearing the shared schema cache per iteration measures uncached reflection
+        results.append(measure(f"{label}.schema_reflection", reflect, iterations, setup=result_cache.clear))
+        results.append(measure(f"{label}.schema_reflection_cached", reflect, iterations))
+
+        preview_query = db.build_sample_query(DATASET_VIEW, preview_rows)
+        results.append(measure(f"{label}.execute_query_preview", lambda: db.execute_query(preview_query), iterations))
+
+        full = db.execute_query(db.build_sample_query(DATASET_VIEW))
+        results.append(measure(f"{label}.execute_query_full_view", lambda: db.execute_query(db.build_sample_query(DATASET_VIEW)), max(1, iterations // 2)))
+
+        preview = full.head(preview_rows)
+        results.append(measure(f"{label}.profile_preview", lambda: DatasetProfiler(preview).profile(), iterations))
+        results.append(measure(f"{label}.profile_full_view", lambda: DatasetProfiler(full).profile(), max(1, iterations // 2)))
+    finally:
+        db.close()
+    return results
+
+def run_chroma_benchmarks(iterations: int, datasets: int) -> List[Dict[str, Any]]:
+    """Benchmark ChromaManager upserts and lookups in a throwaway directory"""
+    print("[chroma] vector store benchmarks")
+    try:
+        from src.vector_store.chroma_manager import ChromaManager
+    except ImportError as e:
+        return [skipped(name, str(e)) for name in ("chroma.upsert", "chroma.lookup", "chroma.reopen")]
+
+    directory = tempfile.mkdtemp(prefix="du_bench_chroma_")
+    try:
+        manager = ChromaManager(persist_directory=directory, snapshot_interval=None)
+        tables = ["customers", "orders", "order_items", "products"]
+
+        def upsert():
+            for i in range(datasets):
+                manager.save_dataset(f"bench_{i}", f"Synthetic dataset {i} joining orders and customers", tables)
+            return range(datasets)
+
+        def lookup():
+            return [manager.get_dataset_info(f"bench_{i}") for i in range(datasets)]
+
+        def reopen():
+            # Cold load of the persisted store, as after a restart
+            manager.close()
+            reopened = ChromaManager(persist_directory=directory, snapshot_interval=None)
+            return [reopened.get_dataset_info("bench_0")]
+
+        results = [
+            measure("chroma.upsert", upsert, iterations),
+            measure("chroma.lookup", lookup, iterations),
+            measure("chroma.reopen", reopen, iterations),
+        ]
+        manager.close()
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def run_parser_benchmarks(iterations: int, conditions: int) -> List[Dict[str, Any]]:
+    """Benchmark JoinParser parsing and SQL generation"""
+    print("[join_parser] parsing benchmarks")
+    text = ", ".join(
+        f"left join orders{i} table with customers{i} table using customer_id" for i in range(conditions)
+    )
+
+    def parse():
+        joins = JoinParser.parse_join_condition(text)
+        JoinParser.generate_sql_join(joins)
+        return joins
+
+    return [measure("join_parser.parse_and_generate", parse, iterations)]
+
+def run_generator_benchmarks(url: str, iterations: int, latency: float) -> List[Dict[str, Any]]:
+    """Benchmark OpenAIGenerator prompt building and response handling with a fake client"""
+    print("[openai_generator] generator benchmarks")
+    try:
+        from src.utils.openai_generator import OpenAIGenerator
+    except ImportError as e:
+        return [skipped("openai_generator.generate_create_view_query", str(e))]
+
+    db = DatabaseConnection(url)
+    db.connect()
+    try:
+        tables = ["customers", "orders", "order_items", "products"]
+        table_columns = {table: db.get_table_columns(table) for table in tables}
+    finally:
+        db.close()
+
+    generator = OpenAIGenerator(api_key="benchmark", client=fake_openai_client(latency))
+    return [measure(
+        "openai_generator.generate_create_view_query",
+        lambda: generator.generate_create_view_query(
+            view_name="bench_view",
+            tables=tables,
+            table_columns=table_columns,
+            join_conditions="Join orders to customers on customer_id and order items to products on product_id"
+        ),
+        iterations
+    )]
+
+def compare(results: Dict[str, Any], baseline_path: str, threshold: float) -> List[str]:
+    """List benchmarks whose median regressed more than threshold relative to a baseline file"""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"] if "median_ms" in r}
+
+    regressions = []
+    for result in results["results"]:
+        before = baseline.get(result["name"])
+        if not before or "median_ms" not in result or not before["median_ms"]:
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1
+        marker = "REGRESSION" if change > threshold else "ok"
+        print(f"  {result['name']:<48} {before['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms ({change:+.1%}) {marker}")
+        if change > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+def _git_commit() -> Optional[str]:
+    """Current git commit of the working tree, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run the benchmark suite against a synthetic warehouse")
+    parser.add_argument("--orders", type=int, default=10000, help="Orders in the synthetic warehouse")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--width", type=int, default=5, help="Extra VARCHAR columns per table")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--preview-rows", type=int, default=1000)
+    parser.add_argument("--datasets", type=int, default=100, help="Datasets upserted per ChromaManager iteration")
+    parser.add_argument("--join-conditions", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated completion latency in seconds")
+    parser.add_argument("--postgres-url", help="Empty PostgreSQL database to also benchmark against")
+    parser.add_argument("--output", default="bench_results.json", help="Machine-readable results file")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown before failing")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="du_bench_")
+    sqlite_url = f"sqlite:///{os.path.join(workdir, 'warehouse.db')}"
+    warehouse = dict(orders=args.orders, customers=args.customers, products=args.products,
+                     width=args.width, seed=args.seed)
+    try:
+        print(f"Building SQLite warehouse in {workdir}")
+        row_counts = {"sqlite": build_warehouse(sqlite_url, **warehouse)}
+        results = run_database_benchmarks(sqlite_url, "sqlite", args.iterations, args.preview_rows)
+
+        if args.postgres_url:
+            print("Building PostgreSQL warehouse")
+            row_counts["postgresql"] = build_warehouse(args.postgres_url, **warehouse)
+            results += run_database_benchmarks(args.postgres_url, "postgresql", args.iterations, args.preview_rows)
+
+        results += run_chroma_benchmarks(args.iterations, args.datasets)
+        results += run_parser_benchmarks(args.iterations * 10, args.join_conditions)
+        results += run_generator_benchmarks(sqlite_url, args.iterations, args.llm_latency)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": vars(args),
+            "row_counts": row_counts,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from sqlalchemy import create_engine, text
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+import random
+
+# Name of the multi-table view every benchmark reads from
+DATASET_VIEW = "v_order_details"
+
+REGIONS = ["North", "South", "East", "West", "Central"]
+STATUSES = ["pending", "shipped", "delivered", "cancelled", "returned"]
+CATEGORIES = ["Hardware", "Software", "Services", "Books", "Apparel", "Grocery"]
+
+def _extra_columns(width: int) -> List[str]:
+    """Names of the filler columns that widen every table"""
+    return [f"attr_{i:02d}" for i in range(width)]
+
+def _schema(width: int) -> List[str]:
+    """DDL for the synthetic schema, portable across SQLite, PostgreSQL and SQL Server"""
+    extra = "".join(f",\n        {c} VARCHAR(40)" for c in _extra_columns(width))
+    return [
+        f"""CREATE TABLE customers (
+        customer_id INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(100),
+        region VARCHAR(20),
+        created_at TIMESTAMP{extra}
+    )""",
+        f"""CREATE TABLE products (
+        product_id INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        category VARCHAR(40),
+        list_price NUMERIC(12, 2){extra}
+    )""",
+        f"""CREATE TABLE orders (
+        order_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL REFERENCES customers (customer_id),
+        order_date TIMESTAMP,
+        status VARCHAR(20),
+        total NUMERIC(12, 2){extra}
+    )""",
+        """CREATE TABLE order_items (
+        order_item_id INTEGER PRIMARY KEY,
+        order_id INTEGER NOT NULL REFERENCES orders (order_id),
+        product_id INTEGER NOT NULL REFERENCES products (product_id),
+        quantity INTEGER,
+        unit_price NUMERIC(12, 2)
+    )""",
+        f"""CREATE VIEW {DATASET_VIEW} AS
+    SELECT oi.order_item_id, o.order_id, o.order_date, o.status, o.total,
+           c.customer_id, c.name AS customer_name, c.email, c.region,
+           p.product_id, p.name AS product_name, p.category,
+           oi.quantity, oi.unit_price
+    FROM order_items oi
+    JOIN orders o ON o.order_id = oi.order_id
+    JOIN customers c ON c.customer_id = o.customer_id
+    JOIN products p ON p.product_id = oi.product_id""",
+    ]
+
+def build_warehouse(url: str, orders: int = 10000, customers: int = 1000, products: int = 200,
+                    items_per_order: int = 3, width: int = 5, seed: int = 42,
+                    batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Create and populate a synthetic order warehouse
+
+    Args:
+        url: SQLAlchemy URL of an empty database (e.g. sqlite:///bench.db)
+        orders: Number of orders; order_items gets about items_per_order times as many rows
+        customers: Number of customers
+        products: Number of products
+        items_per_order: Average line items per order
+        width: Number of extra VARCHAR columns added to customers, products and orders
+        seed: Random seed, so the same arguments always build the same data
+        batch_size: Rows per executemany batch
+
+    Returns:
+        Row counts per table
+    """
+    rng = random.Random(seed)
+    extra = _extra_columns(width)
+    start = datetime(2020, 1, 1)
+
+    def filler() -> Dict[str, Any]:
+        return {c: f"{c}-{rng.randint(0, 999):03d}" for c in extra}
+
+    customer_rows = [
+        dict(customer_id=i, name=f"Customer {i}", email=f"customer{i}@example.com",
+             region=rng.choice(REGIONS), created_at=start + timedelta(days=rng.randint(0, 1500)), **filler())
+        for i in range(1, customers + 1)
+    ]
+    product_rows = [
+        dict(product_id=i, name=f"Product {i}", category=rng.choice(CATEGORIES),
+             list_price=round(rng.uniform(1, 500), 2), **filler())
+        for i in range(1, products + 1)
+    ]
+
+    def order_rows():
+        for i in range(1, orders + 1):
+            yield dict(order_id=i, customer_id=rng.randint(1, customers),
+                       order_date=start + timedelta(minutes=rng.randint(0, 2_000_000)),
+                       status=rng.choice(STATUSES), total=round(rng.uniform(5, 5000), 2), **filler())
+
+    def item_rows():
+        item_id = 0
+        for order_id in range(1, orders + 1):
+            for _ in range(rng.randint(1, 2 * items_per_order - 1)):
+                item_id += 1
+                yield dict(order_item_id=item_id, order_id=order_id, product_id=rng.randint(1, products),
+                           quantity=rng.randint(1, 10), unit_price=round(rng.uniform(1, 500), 2))
+
+    engine = create_engine(url)
+    counts = {}
+    try:
+        with engine.begin() as connection:
+            for statement in _schema(width):
+                connection.execute(text(statement))
+        for table, rows in [("customers", customer_rows), ("products", product_rows),
+                            ("orders", order_rows()), ("order_items", item_rows())]:
+            counts[table] = _insert(engine, table, rows, batch_size)
+    finally:
+        engine.dispose()
+    return counts
+
+def _insert(engine, table: str, rows, batch_size: int) -> int:
+    """Insert an iterable of row dicts in executemany batches"""
+    statement = None
+    written = 0
+    batch = []
+    with engine.begin() as connection:
+        for row in rows:
+            if statement is None:
+                columns = list(row.keys())
+                statement = text(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"
+                )
+            batch.append(row)
+            if len(batch) >= batch_size:
+                connection.execute(statement, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            connection.execute(statement, batch)
+            written += len(batch)
+    return written
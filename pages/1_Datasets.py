@@ -1,11 +1,25 @@
 import streamlit as st
 import pandas as pd
+import os
+import tempfile
 from src.database.connection import DatabaseConnection
+from src.database.materialization import MATERIALIZATION_MODES
+from src.utils.dataset_exporter import DatasetExporter, EXPORT_FORMATS
+from src.cache.local_cache import LocalDatasetCache
+from src.services import DatasetService
+from src.monitoring import track_page
 
 # Initialize session state
 if 'db_connection' not in st.session_state:
     st.session_state.db_connection = None
+if 'local_cache' not in st.session_state:
+    try:
+        st.session_state.local_cache = LocalDatasetCache()
+    except ImportError:
+        # duckdb is optional; previews and profiles then always read from the server
+        st.session_state.local_cache = None
 
+@track_page("Datasets")
 def main():
     st.title("Datasets")
     
@@ -78,50 +92,106 @@ def main():
         st.subheader("Existing Datasets")
         
         try:
-            # Query to get all datasets
-            query = """
-            SELECT 
-                DatasetID,
-                DatasetName,
-                Description,
-                CreatedDate,
-                CreatedBy,
-                ViewName,
-                JoinConditions,
-                Tables,
-                DatabaseName,
-                ServerName
-            FROM DU_Datasets
-            ORDER BY CreatedDate DESC
-            """
-            
-            datasets_df = st.session_state.db_connection.execute_query(query)
+            # Get all datasets
+            service = DatasetService(st.session_state.db_connection)
+            datasets_df = service.list_datasets()
             
             if datasets_df is not None and not datasets_df.empty:
+                materializer = service.materializer
+                local_cache = st.session_state.local_cache
+                
                 # Add actions column
                 datasets_df['Actions'] = ''
                 
                 # Display datasets in a table with actions
                 for index, row in datasets_df.iterrows():
+                    mode = row['MaterializationMode'] or "view"
+                    read_source = materializer.read_source(row['ViewName'], mode, row['MaterializedName'])
+                    
                     col1, col2, col3 = st.columns([3, 1, 1])
                     with col1:
                         st.write(f"**{row['DatasetName']}**")
                         st.write(f"Description: {row['Description']}")
                         st.write(f"Created: {row['CreatedDate']}")
                         st.write(f"View: {row['ViewName']}")
+                        if mode != "view":
+                            st.write(f"Materialization: {MATERIALIZATION_MODES[mode]} ({row['RefreshSchedule']})")
+                            st.write(f"Last Refreshed: {row['LastRefreshedDate']}")
+                            if materializer.is_refresh_due(row['RefreshSchedule'], row['LastRefreshedDate']):
+                                st.warning("Scheduled refresh is due")
+                        # Catalog or plan estimate; materialized datasets are sized from their materialized object
+                        estimate_source = row['MaterializedName'] if mode in ("materialized_view", "snapshot_table") else row['ViewName']
+                        # Cached so reruns do not query the catalog again for every dataset
+                        estimate = service.estimate_rows(row['ViewName'], estimate_source)
+                        if estimate:
+                            size_info = f", {estimate['bytes'] / 1024 ** 2:,.1f} MB" if estimate['bytes'] else ""
+                            st.write(f"Estimated Rows: ~{estimate['rows']:,}{size_info}")
+                        if local_cache is not None:
+                            cache_info = local_cache.freshness(st.session_state.db_connection, row['ViewName'])
+                            if cache_info:
+                                st.write(f"Local Cache: {cache_info['row_count']} rows, extracted {cache_info['extracted_at']:%Y-%m-%d %H:%M}")
                         st.markdown("---")
                     
                     with col2:
                         if st.button("View Sample", key=f"sample_{index}"):
-                            sample_query = f"SELECT TOP 5 * FROM {row['ViewName']}"
-                            sample_data = st.session_state.db_connection.execute_query(sample_query)
+                            if local_cache is not None and local_cache.is_fresh(st.session_state.db_connection, row['ViewName']):
+                                sample_data = local_cache.load_frame(st.session_state.db_connection, row['ViewName'], limit=5)
+                            else:
+                                # Shared across sessions until a base table of the dataset changes
+                                sample_data = service.preview(row['ViewName'], 5, read_source=read_source)
                             if sample_data is not None:
                                 st.dataframe(sample_data)
+                        
+                        if mode in ("materialized_view", "snapshot_table"):
+                            if st.button("Refresh", key=f"refresh_{index}"):
+                                try:
+                                    duration_ms = materializer.refresh(row['ViewName'], mode, row['MaterializedName'])
+                                    st.success(f"Refreshed in {duration_ms} ms")
+                                except Exception as e:
+                                    st.error(f"Error refreshing dataset: {str(e)}")
                     
                     with col3:
                         if st.button("Profile", key=f"profile_{index}"):
                             st.session_state.profile_view_name = row['ViewName']
+                            st.session_state.profile_source = read_source
                             st.switch_page("pages/3_Dataset_Profiling.py")
+                        
+                        if local_cache is not None and st.button("Cache Locally", key=f"cache_{index}"):
+                            try:
+                                rows = local_cache.extract(
+                                    st.session_state.db_connection, row['ViewName'], source=read_source
+                                )
+                                st.success(f"Cached {rows} rows locally")
+                            except Exception as e:
+                                st.error(f"Error caching dataset: {str(e)}")
+                    
+                    with st.expander(f"Export {row['DatasetName']}"):
+                        export_format = st.selectbox(
+                            "Format", list(EXPORT_FORMATS.keys()), key=f"export_format_{index}"
+                        )
+                        if st.button("Prepare Export", key=f"export_{index}"):
+                            try:
+                                extension = EXPORT_FORMATS[export_format]
+                                # A file of its own per export, so sessions exporting the same dataset do not collide
+                                with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as export_file:
+                                    export_path = export_file.name
+                                exporter = DatasetExporter(st.session_state.db_connection)
+                                # Materialized datasets export from their materialized copy
+                                source = row['MaterializedName'] if mode in ("materialized_view", "snapshot_table") else row['ViewName']
+                                rows = exporter.export(source, export_path, fmt=export_format)
+                                st.success(f"Exported {rows} rows")
+                                with open(export_path, "rb") as export_file:
+                                    data = export_file.read()
+                                os.remove(export_path)
+                                st.download_button(
+                                    label=f"Download {extension}",
+                                    data=data,
+                                    file_name=f"{row['ViewName']}{extension}",
+                                    mime="application/octet-stream",
+                                    key=f"download_{index}"
+                                )
+                            except Exception as e:
+                                st.error(f"Error exporting dataset: {str(e)}")
             else:
                 st.info("No datasets found. Create a new dataset to get started!")
         except Exception as e:
@@ -2,13 +2,15 @@ import streamlit as st
 import time
 import importlib
 import sys
-import json
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import OPENAI_API_KEY
 from src.database.connection import DatabaseConnection
+from src.database.materialization import MATERIALIZATION_MODES, REFRESH_SCHEDULES
+from src.services import DatasetService
 from src.vector_store.chroma_manager import ChromaManager
 from src.utils.openai_generator import OpenAIGenerator
+from src.monitoring import track_page
 
 # Add a small delay to ensure proper module loading
 time.sleep(0.1)
@@ -48,49 +50,7 @@ def sync_table_inputs():
     while len(st.session_state.table_inputs) > st.session_state.num_table_inputs:
         st.session_state.table_inputs.pop()
 
-def save_dataset_info(dataset_name: str, description: str, join_conditions: str, view_name: str):
-    """Save dataset information to DU_Datasets table"""
-    try:
-        # Get current user and database info
-        is_connected, connection_info = st.session_state.db_connection.verify_connection()
-        if not is_connected:
-            raise Exception("Database connection verification failed")
-            
-        # Get current user
-        user_query = "SELECT SYSTEM_USER"
-        current_user = st.session_state.db_connection.execute_query(user_query).iloc[0, 0]
-        
-        # Get database and server info
-        db_query = "SELECT DB_NAME()"
-        db_name = st.session_state.db_connection.execute_query(db_query).iloc[0, 0]
-        
-        server_query = "SELECT @@SERVERNAME"
-        server_name = st.session_state.db_connection.execute_query(server_query).iloc[0, 0]
-        
-        # Prepare insert query
-        insert_query = f"""
-        INSERT INTO DU_Datasets (
-            DatasetName, Description, CreatedBy, ViewName,
-            JoinConditions, Tables, DatabaseName, ServerName
-        ) VALUES (
-            '{dataset_name}',
-            '{description}',
-            '{current_user}',
-            '{view_name}',
-            '{join_conditions}',
-            '{json.dumps(st.session_state.selected_tables)}',
-            '{db_name}',
-            '{server_name}'
-        )
-        """
-        
-        # Execute insert
-        st.session_state.db_connection.execute_query(insert_query)
-        return True
-    except Exception as e:
-        st.error(f"Error saving dataset information: {str(e)}")
-        return False
-
+@track_page("Create Dataset")
 def main():
     st.title("Create New Dataset")
     
@@ -191,25 +151,25 @@ def main():
         
         if st.button("Generate View Definition"):
             try:
-                # Get table columns for all selected tables
-                table_columns = {}
-                for table in st.session_state.selected_tables:
-                    table_columns[table] = st.session_state.db_connection.get_table_columns(table)
-                
-                # Initialize OpenAI generator
-                generator = OpenAIGenerator(OPENAI_API_KEY)
-                
-                # Generate CREATE VIEW query
+                # Generate CREATE VIEW query from the selected tables' columns
+                service = DatasetService(st.session_state.db_connection, generator=OpenAIGenerator(OPENAI_API_KEY))
                 st.session_state.view_name = dataset_name  # Use dataset name as view name
-                st.session_state.create_view_query = generator.generate_create_view_query(
+                st.session_state.create_view_query = service.generate_view_query(
                     view_name=st.session_state.view_name,
                     tables=st.session_state.selected_tables,
-                    table_columns=table_columns,
                     join_conditions=join_conditions
                 )
                 
                 st.code(st.session_state.create_view_query, language="sql")
                 
+                # Output columns checked from metadata, before anything is created
+                validation = service.validate_view_definition(st.session_state.create_view_query)
+                if validation["valid"]:
+                    st.caption(f"Validated without executing: {len(validation['columns'])} output columns")
+                    st.dataframe(validation["columns"])
+                else:
+                    st.warning("The generated view definition is invalid: " + "; ".join(validation["errors"]))
+                
             except Exception as e:
                 st.error(f"Error generating view definition: {str(e)}")
         
@@ -225,32 +185,51 @@ def main():
             else:
                 st.error(f"Connection verification failed: {connection_info}")
             
+            # Materialization options
+            service = DatasetService(st.session_state.db_connection)
+            materialization_mode = st.selectbox(
+                "Materialization",
+                service.materializer.supported_modes(),
+                format_func=lambda mode: MATERIALIZATION_MODES[mode],
+                help="Materialized datasets are read at table-scan cost instead of re-executing the joins"
+            )
+            key_columns = []
+            refresh_schedule = "on_demand"
+            if materialization_mode == "indexed_view":
+                key_columns_text = st.text_input("Unique Key Columns (comma separated)")
+                key_columns = [c.strip() for c in key_columns_text.split(",") if c.strip()]
+            if materialization_mode in ("materialized_view", "snapshot_table"):
+                refresh_schedule = st.selectbox("Refresh Schedule", list(REFRESH_SCHEDULES.keys()))
+            
             if st.button("Create View"):
                 try:
-                    # Execute the CREATE VIEW query
-                    st.session_state.db_connection.execute_query(st.session_state.create_view_query)
-                    
-                    # Save dataset information
-                    if save_dataset_info(
+                    # Create the view, register it, record its lineage and materialize it if requested
+                    result = service.create_dataset(
                         dataset_name=dataset_name,
-                        description=dataset_description,
+                        tables=st.session_state.selected_tables,
                         join_conditions=join_conditions,
-                        view_name=st.session_state.view_name
-                    ):
-                        st.success(f"Successfully created view: {st.session_state.view_name}")
-                        
-                        # Show sample data from the view
-                        sample_query = f"SELECT TOP 5 * FROM {st.session_state.view_name}"
-                        sample_data = st.session_state.db_connection.execute_query(sample_query)
-                        if sample_data is not None:
-                            st.subheader("Sample Data from View")
-                            st.dataframe(sample_data)
-                        
-                        # Add button to return to datasets page
-                        if st.button("Return to Datasets"):
-                            st.switch_page("pages/1_Datasets.py")
-                    else:
-                        st.error("Failed to save dataset information")
+                        description=dataset_description,
+                        view_name=st.session_state.view_name,
+                        create_view_query=st.session_state.create_view_query,
+                        materialization_mode=materialization_mode,
+                        refresh_schedule=refresh_schedule,
+                        key_columns=key_columns
+                    )
+                    st.success(f"Successfully created view: {result['view_name']}")
+                    if result["materialized_name"]:
+                        st.success(f"Materialized dataset as {MATERIALIZATION_MODES[materialization_mode].lower()}: {result['materialized_name']}")
+                    if result["materialization_error"]:
+                        st.warning(f"The view was created but could not be materialized, so it is registered as a plain view: {result['materialization_error']}")
+                    
+                    # Show sample data from the view
+                    sample_data = service.preview(result["view_name"], 5, read_source=result["read_source"])
+                    if sample_data is not None:
+                        st.subheader("Sample Data from View")
+                        st.dataframe(sample_data)
+                    
+                    # Add button to return to datasets page
+                    if st.button("Return to Datasets"):
+                        st.switch_page("pages/1_Datasets.py")
                 except Exception as e:
                     st.error(f"Error creating view: {str(e)}")
                     st.error("Please check if you have sufficient permissions to create views in the database.")
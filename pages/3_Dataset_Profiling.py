@@ -1,33 +1,11 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime
+from src.utils.dataset_profiler import DatasetProfiler, PROFILE_STRATEGIES
+from src.services import DatasetService
+from src.jobs import get_job_store
+from src.monitoring import track_page
 
-def get_column_statistics(df: pd.DataFrame, column: str) -> dict:
-    """Calculate basic statistics for a column"""
-    stats = {
-        'Data Type': str(df[column].dtype),
-        'Total Rows': len(df),
-        'Null Count': df[column].isnull().sum(),
-        'Null Percentage': f"{(df[column].isnull().sum() / len(df) * 100):.2f}%"
-    }
-    
-    # Add numeric statistics if applicable
-    if pd.api.types.is_numeric_dtype(df[column]):
-        stats.update({
-            'Min': df[column].min(),
-            'Max': df[column].max(),
-            'Mean': df[column].mean(),
-            'Median': df[column].median(),
-            'Standard Deviation': df[column].std()
-        })
-    
-    # Add unique value count for categorical columns
-    if pd.api.types.is_string_dtype(df[column]) or pd.api.types.is_categorical_dtype(df[column]):
-        stats['Unique Values'] = df[column].nunique()
-    
-    return stats
-
+@track_page("Dataset Profiling")
 def main():
     st.title("Dataset Profiling")
     
@@ -46,11 +24,45 @@ def main():
         return
     
     view_name = st.session_state.profile_view_name
+    # Materialized datasets are read from their materialized object
+    read_source = st.session_state.get('profile_source') or view_name
+    
+    # Profile the local extract at in-process speed when one is cached and fresh
+    local_cache = st.session_state.get('local_cache')
+    use_cache = False
+    if local_cache is not None and local_cache.is_fresh(st.session_state.db_connection, view_name):
+        use_cache = st.checkbox("Use local cache", value=True)
     
     try:
-        # Get sample data from the view
-        sample_query = f"SELECT TOP 1000 * FROM {view_name}"
-        df = st.session_state.db_connection.execute_query(sample_query)
+        if use_cache:
+            df = local_cache.load_frame(st.session_state.db_connection, view_name)
+            cache_info = local_cache.freshness(st.session_state.db_connection, view_name)
+            st.caption(f"Profiling local extract from {cache_info['extracted_at']:%Y-%m-%d %H:%M}")
+            # Profile all columns in whole-frame batches
+            profile = DatasetProfiler(df).profile()
+        else:
+            # Full scan, database aggregates or a sample, depending on the estimated size
+            # Profiles precomputed by the background jobs are served first; recomputing runs the queries now
+            service = DatasetService(st.session_state.db_connection, job_store=get_job_store())
+            # A recompute request applies to this run only
+            recompute = st.session_state.pop('profile_recompute', None) == view_name
+            profile = service.profile(view_name, read_source=read_source, use_precomputed=not recompute)
+            # Profiles do not keep the profiled rows; the sample below comes from the shared preview
+            df = service.preview(view_name, 5, read_source=read_source)
+            estimate = profile["estimate"]
+            size_info = f"~{estimate['rows']:,} rows estimated ({estimate['method']})" if estimate else "size unknown"
+            st.caption(f"{PROFILE_STRATEGIES[profile['strategy']]}: {size_info}")
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                if profile.get("computed_at"):
+                    st.caption(f"Precomputed by a background job at {profile['computed_at']:%Y-%m-%d %H:%M}")
+                elif st.button("Profile in Background"):
+                    job_id = service.queue_profile(view_name)
+                    st.info("Profile job queued" if job_id else "A profile job for this dataset is already queued")
+            with col2:
+                if profile.get("computed_at") and st.button("Recompute Now"):
+                    st.session_state.profile_recompute = view_name
+                    st.rerun()
         
         if df is None or df.empty:
             st.error(f"No data found in view: {view_name}")
@@ -58,22 +70,39 @@ def main():
         
         # Display basic information
         st.subheader(f"View: {view_name}")
-        st.write(f"Total Rows: {len(df)}")
+        # Sampled profiles cover part of the dataset; the estimated total is in the caption above
+        st.write(f"Rows Profiled: {profile.get('rows_profiled', len(df)):,}")
         st.write(f"Number of Columns: {len(df.columns)}")
         
-        # Create profiling DataFrame
-        profiling_data = []
-        for column in df.columns:
-            stats = get_column_statistics(df, column)
-            stats['Column Name'] = column
-            profiling_data.append(stats)
-        
-        profiling_df = pd.DataFrame(profiling_data)
+        profiling_df = profile["columns"]
         
         # Display profiling results
         st.subheader("Column-wise Statistics")
         st.dataframe(profiling_df)
         
+        numeric_columns = profile["histograms"]["Column Name"].unique().tolist()
+        if numeric_columns:
+            st.subheader("Histograms")
+            histogram_column = st.selectbox("Column", numeric_columns)
+            histogram_kind = st.radio("Binning", ["Equal width", "Quantile"], horizontal=True)
+            histograms = profile["histograms"] if histogram_kind == "Equal width" else profile["quantile_histograms"]
+            histogram = histograms[histograms["Column Name"] == histogram_column].copy()
+            histogram["Range"] = histogram.apply(lambda r: f"{r['Lower']:.4g} – {r['Upper']:.4g}", axis=1)
+            st.bar_chart(histogram.set_index("Range")["Count"])
+        
+        st.subheader("Most Frequent Values")
+        st.dataframe(profile["top_values"])
+        
+        if not profile["strings"].empty:
+            st.subheader("String Lengths")
+            st.dataframe(profile["strings"])
+            st.subheader("String Patterns")
+            st.dataframe(profile["patterns"])
+        
+        if not profile["correlation"].empty:
+            st.subheader("Correlation Matrix")
+            st.dataframe(profile["correlation"].round(3))
+        
         # Add download button
         csv = profiling_df.to_csv(index=False)
         st.download_button(
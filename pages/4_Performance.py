@@ -0,0 +1,95 @@
+import streamlit as st
+from datetime import datetime
+from src.monitoring import instrumentation, PrometheusHook, track_page
+from src.database.engine_registry import engine_registry
+
+@track_page("Performance")
+def main():
+    st.title("Performance")
+
+    # Add navigation buttons
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        if st.button("← Home"):
+            st.switch_page("app.py")
+    with col2:
+        if st.button("← Back to Datasets"):
+            st.switch_page("pages/1_Datasets.py")
+
+    spans = instrumentation.recent()
+    # Exclude renders of this page so viewing it does not skew the numbers
+    spans = spans[spans["page"] != "Performance"]
+    if spans.empty:
+        st.info("No instrumented calls recorded yet. Use the other pages and come back here.")
+        return
+
+    st.caption(f"{len(spans)} recent calls since {spans['started_at'].min():%Y-%m-%d %H:%M:%S} (all sessions)")
+
+    # Headline numbers
+    col1, col2, col3, col4 = st.columns(4)
+    queries = spans[spans["component"] == "sql"]
+    col1.metric("SQL statements", len(queries))
+    col2.metric("Median SQL latency", f"{queries['duration_ms'].median():.1f} ms" if not queries.empty else "-")
+    col3.metric("Errors", int((spans["status"] != "ok").sum()))
+    col4.metric("Pool wait", f"{spans['pool_wait_ms'].sum():.1f} ms")
+
+    st.subheader("Slowest Queries")
+    slowest = instrumentation.slowest(25, component="sql")
+    slowest = slowest[slowest["page"] != "Performance"]
+    st.dataframe(
+        slowest[["started_at", "page", "duration_ms", "rows", "statement"]].round({"duration_ms": 2}),
+        use_container_width=True
+    )
+
+    st.subheader("Per-page Latency")
+    renders = instrumentation.summary(by=["page", "component", "operation"])
+    renders = renders[renders["component"] == "page"][["page", "calls", "p50_ms", "p95_ms", "max_ms"]]
+    st.dataframe(renders.round(2), use_container_width=True)
+
+    # Time spent per component within each page; nested calls are counted in both levels
+    breakdown = spans[spans["component"].isin(["sql", "chroma", "openai", "local_cache"])
+                      | ((spans["component"] == "database") & (spans["operation"] != "verify_connection"))]
+    if not breakdown.empty:
+        breakdown = breakdown.assign(page=breakdown["page"].fillna("(none)")).pivot_table(
+            index="page", columns="component", values="duration_ms", aggfunc="sum", fill_value=0
+        )
+        st.bar_chart(breakdown)
+
+    st.subheader("Operations")
+    st.dataframe(instrumentation.summary().round(2), use_container_width=True)
+
+    cache = instrumentation.cache_summary()
+    if not cache.empty:
+        st.subheader("Cache Hit Rate")
+        st.dataframe(cache.round(3), use_container_width=True)
+
+    failures = spans[spans["status"] != "ok"]
+    if not failures.empty:
+        st.subheader("Recent Errors")
+        st.dataframe(failures[["started_at", "page", "component", "operation", "duration_ms", "error"]],
+                     use_container_width=True)
+
+    st.subheader("Connection Pools")
+    st.caption(f"{engine_registry.open_connections} of {engine_registry.max_connections} database connections open")
+    pools = engine_registry.stats()
+    if pools:
+        st.dataframe(pools, use_container_width=True)
+
+    prometheus = instrumentation.get_hook(PrometheusHook)
+    if prometheus is not None:
+        with st.expander("Prometheus metrics"):
+            exposition = prometheus.exposition()
+            st.code(exposition, language="text")
+            st.download_button(
+                label="Download metrics",
+                data=exposition,
+                file_name=f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prom",
+                mime="text/plain"
+            )
+
+    if st.button("Clear Recorded Data"):
+        instrumentation.clear()
+        st.rerun()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Local analytic cache package for dataset extracts and shared query results.
+"""
+
+from .local_cache import LocalDatasetCache
+from .result_cache import TaggedResultCache, result_cache
+
+__all__ = ['LocalDatasetCache', 'TaggedResultCache', 'result_cache']
@@ -0,0 +1,291 @@
+from sqlalchemy import text
+from typing import List, Dict, Optional, Any
+from datetime import datetime, timedelta
+import hashlib
+import os
+import threading
+import uuid
+import pandas as pd
+from src.database.compact import column_types, type_kind
+from src.monitoring import instrumented, annotate
+
+# Cheap per-dialect change signal for a view: latest DDL change or write to
+# the view and the objects it references. None means freshness is age-based only.
+_SIGNATURE_QUERIES = {
+    "mssql": """
+        SELECT CONVERT(varchar(33), MAX(ts), 126) FROM (
+            SELECT o.modify_date AS ts
+            FROM sys.objects o
+            WHERE o.object_id = OBJECT_ID(:view_name)
+               OR o.object_id IN (SELECT d.referenced_id FROM sys.sql_expression_dependencies d
+                                  WHERE d.referencing_id = OBJECT_ID(:view_name))
+            UNION ALL
+            SELECT s.last_user_update
+            FROM sys.dm_db_index_usage_stats s
+            WHERE s.database_id = DB_ID()
+              AND s.object_id IN (SELECT d.referenced_id FROM sys.sql_expression_dependencies d
+                                  WHERE d.referencing_id = OBJECT_ID(:view_name))
+        ) changes
+    """,
+    "postgresql": """
+        SELECT CAST(COALESCE(SUM(s.n_tup_ins + s.n_tup_upd + s.n_tup_del), 0) AS text)
+        FROM information_schema.view_table_usage u
+        JOIN pg_stat_user_tables s ON s.schemaname = u.table_schema AND s.relname = u.table_name
+        WHERE u.view_name = :view_name
+    """,
+}
+
+_META_TABLE = "_du_cache_meta"
+
+# DuckDB column types for server type kinds (see compact.type_kind)
+_DUCKDB_TYPES = {"integer": "BIGINT", "float": "DOUBLE", "boolean": "BOOLEAN", "string": "VARCHAR"}
+
+# Write locks shared by every cache instance on the same DuckDB file
+_write_locks: Dict[str, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
+def _write_lock(cache_path: str) -> threading.Lock:
+    with _write_locks_guard:
+        return _write_locks.setdefault(os.path.abspath(cache_path), threading.Lock())
+
+class LocalDatasetCache:
+    def __init__(self, cache_path: str = "./dataset_cache/datasets.duckdb",
+                 max_age: timedelta = timedelta(hours=24)):
+        """
+        Initialize a local DuckDB cache of dataset extracts
+
+        Extracts are keyed by the source connection and view name, so the same view name
+        on two servers or databases gets separate extracts.
+
+        Args:
+            cache_path: DuckDB database file holding the extracts
+            max_age: Age after which an extract is considered stale
+        """
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("The local dataset cache requires duckdb. Install it with: pip install duckdb")
+
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self.cache_path = cache_path
+        self.max_age = max_age
+        self.connection = duckdb.connect(cache_path)
+        # Serializes writes across all caches on this file; reads use their own cursors
+        self._write_lock = _write_lock(cache_path)
+        with self._write_lock:
+            self._drop_unkeyed_extracts()
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {_META_TABLE} (
+                    connection_key VARCHAR NOT NULL,
+                    view_name VARCHAR NOT NULL,
+                    table_name VARCHAR NOT NULL,
+                    extracted_at TIMESTAMP NOT NULL,
+                    row_count BIGINT NOT NULL,
+                    sample_rows BIGINT,
+                    source_signature VARCHAR,
+                    PRIMARY KEY (connection_key, view_name)
+                )
+            """)
+
+    def _drop_unkeyed_extracts(self):
+        """Drop extracts written before they were keyed by connection; their source is unknown"""
+        columns = [row[0] for row in self.connection.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = ?", [_META_TABLE]
+        ).fetchall()]
+        if not columns or "connection_key" in columns:
+            return
+        for (view_name,) in self.connection.execute(f"SELECT view_name FROM {_META_TABLE}").fetchall():
+            self.connection.execute(f"DROP TABLE IF EXISTS {self._quote(view_name)}")
+        self.connection.execute(f"DROP TABLE {_META_TABLE}")
+
+    @staticmethod
+    def table_name(db_connection, view_name: str) -> str:
+        """DuckDB table holding the extract of a view from a given connection"""
+        digest = hashlib.sha1(db_connection.connection_key.encode("utf-8")).hexdigest()[:12]
+        return f"{view_name}__{digest}"
+
+    @instrumented("local_cache")
+    def extract(self, db_connection, view_name: str, source: Optional[str] = None,
+                sample_rows: Optional[int] = None, batch_size: int = 50000) -> int:
+        """
+        Pull a full or sampled extract of a dataset into the local cache
+
+        Args:
+            db_connection: Connected DatabaseConnection for the source server
+            view_name: Dataset view name
+            source: Object to read from, e.g. a materialized copy (defaults to view_name)
+            sample_rows: Limit the extract to the first N rows; None extracts everything
+            batch_size: Rows fetched from the server per batch
+
+        Returns:
+            int: Number of rows cached
+        """
+        query = db_connection.build_sample_query(source or view_name, sample_rows)
+        types = column_types(db_connection.get_table_columns(view_name))
+        signature = self.source_signature(db_connection, view_name)
+        table_name = self.table_name(db_connection, view_name)
+        staging = self._quote(f"{table_name}__staging_{uuid.uuid4().hex}")
+        target = self._quote(table_name)
+
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            try:
+                row_count = 0
+                created = False
+                try:
+                    for batch in db_connection.iter_query_batches(query, batch_size=batch_size):
+                        cursor.register("du_batch", batch)
+                        if not created:
+                            cursor.execute(
+                                f"CREATE TABLE {staging} AS SELECT {self._staging_columns(batch, types)} FROM du_batch"
+                            )
+                            created = True
+                        else:
+                            cursor.execute(f"INSERT INTO {staging} SELECT * FROM du_batch")
+                        cursor.unregister("du_batch")
+                        row_count += len(batch)
+                except Exception:
+                    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+                    raise
+                if not created:
+                    raise Exception(f"No result set returned for {view_name}")
+
+                # Swap the new extract in atomically
+                cursor.execute("BEGIN TRANSACTION")
+                cursor.execute(f"DROP TABLE IF EXISTS {target}")
+                cursor.execute(f"ALTER TABLE {staging} RENAME TO {target}")
+                cursor.execute(
+                    f"DELETE FROM {_META_TABLE} WHERE connection_key = ? AND view_name = ?",
+                    [db_connection.connection_key, view_name]
+                )
+                cursor.execute(
+                    f"INSERT INTO {_META_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [db_connection.connection_key, view_name, table_name, datetime.now(),
+                     row_count, sample_rows, signature]
+                )
+                cursor.execute("COMMIT")
+            finally:
+                cursor.close()
+        return row_count
+
+    def _staging_columns(self, batch: pd.DataFrame, types: Dict[str, str]) -> str:
+        """
+        Select list typing the staging table from the first batch
+
+        Columns that are all NULL in the batch would otherwise be typed INTEGER by DuckDB and
+        reject later values, so they take the server type's DuckDB equivalent, or VARCHAR.
+        """
+        columns = []
+        for column in batch.columns:
+            quoted = self._quote(str(column))
+            if batch[column].isna().all():
+                duckdb_type = _DUCKDB_TYPES.get(type_kind(types.get(column) or ""), "VARCHAR")
+                columns.append(f"CAST({quoted} AS {duckdb_type}) AS {quoted}")
+            else:
+                columns.append(quoted)
+        return ", ".join(columns)
+
+    def source_signature(self, db_connection, view_name: str) -> Optional[str]:
+        """Get the cheap change signal for a view on the source server"""
+        query = _SIGNATURE_QUERIES.get(db_connection.dialect)
+        if not query:
+            return None
+        try:
+            with db_connection.engine.connect() as connection:
+                value = connection.execute(text(query), {"view_name": view_name}).scalar()
+            return None if value is None else str(value)
+        except Exception as e:
+            # e.g. missing VIEW SERVER STATE permission; fall back to age-based freshness
+            print(f"Error getting source signature for {view_name}: {str(e)}")
+            return None
+
+    def freshness(self, db_connection, view_name: str) -> Optional[Dict[str, Any]]:
+        """Get extract metadata (extracted_at, row_count, sample_rows, source_signature)"""
+        cursor = self.connection.cursor()
+        try:
+            row = cursor.execute(
+                f"SELECT extracted_at, row_count, sample_rows, source_signature FROM {_META_TABLE} "
+                f"WHERE connection_key = ? AND view_name = ?",
+                [db_connection.connection_key, view_name]
+            ).fetchone()
+        finally:
+            cursor.close()
+        if row is None:
+            return None
+        return {
+            "extracted_at": row[0],
+            "row_count": row[1],
+            "sample_rows": row[2],
+            "source_signature": row[3],
+        }
+
+    @instrumented("local_cache")
+    def is_fresh(self, db_connection, view_name: str, check_signature: bool = True) -> bool:
+        """
+        Check whether a cached extract can be used instead of the source view
+
+        An extract is fresh when it is younger than max_age and, unless check_signature
+        is False, the source view's change signal has not moved since extraction.
+        """
+        meta = self.freshness(db_connection, view_name)
+        if meta is None:
+            fresh = False
+        elif datetime.now() - meta["extracted_at"] > self.max_age:
+            fresh = False
+        elif check_signature and meta["source_signature"] is not None:
+            fresh = self.source_signature(db_connection, view_name) == meta["source_signature"]
+        else:
+            fresh = True
+        annotate(cache="hit" if fresh else "miss")
+        return fresh
+
+    @instrumented("local_cache")
+    def load_frame(self, db_connection, view_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Load a cached extract (or its first rows) as a DataFrame"""
+        query = f"SELECT * FROM {self._quote(self.table_name(db_connection, view_name))}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self.query(query)
+
+    def filter(self, db_connection, view_name: str, where: str, params: Optional[List[Any]] = None,
+               limit: Optional[int] = None) -> pd.DataFrame:
+        """Run an ad-hoc filter (DuckDB SQL WHERE clause) against a cached extract"""
+        query = f"SELECT * FROM {self._quote(self.table_name(db_connection, view_name))} WHERE {where}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self.query(query, params)
+
+    @instrumented("local_cache")
+    def query(self, sql: str, params: Optional[List[Any]] = None) -> pd.DataFrame:
+        """Run arbitrary DuckDB SQL against the cache; extract tables are listed by list_cached"""
+        cursor = self.connection.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def list_cached(self) -> pd.DataFrame:
+        """List cached extracts with their source connection, table name and freshness metadata"""
+        return self.query(f"SELECT * FROM {_META_TABLE} ORDER BY extracted_at DESC")
+
+    def drop(self, db_connection, view_name: str):
+        """Remove a cached extract"""
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(f"DROP TABLE IF EXISTS {self._quote(self.table_name(db_connection, view_name))}")
+                cursor.execute(
+                    f"DELETE FROM {_META_TABLE} WHERE connection_key = ? AND view_name = ?",
+                    [db_connection.connection_key, view_name]
+                )
+            finally:
+                cursor.close()
+
+    def close(self):
+        """Close the cache database"""
+        self.connection.close()
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Quote a view name for use as a DuckDB table name"""
+        return '"' + identifier.replace('"', '""') + '"'
@@ -0,0 +1,122 @@
+from typing import Dict, Optional, Any, Hashable, Iterable, Callable, Set
+from collections import OrderedDict
+from datetime import timedelta
+import threading
+import time
+from src.monitoring import annotate
+
+class TaggedResultCache:
+    def __init__(self, max_entries: int = 256, ttl: Optional[timedelta] = timedelta(minutes=10)):
+        """
+        In-process LRU cache whose entries carry tags for targeted invalidation
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Maximum age of an entry, bounding staleness when no invalidation arrives (None for no limit)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl.total_seconds() if ttl is not None else None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        # Bumped on every invalidation of a tag (and _epoch on clear), so results computed
+        # across an invalidation are not stored
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value, or default when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                annotate(cache="miss")
+                return default
+            self._entries.move_to_end(key)
+        annotate(cache="hit")
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = ()):
+        """Store a value under the given tags"""
+        tags = frozenset(tags)
+        with self._lock:
+            self._store(key, value, tags)
+
+    def _store(self, key: Hashable, value: Any, tags: frozenset):
+        """Store a value (caller holds the lock)"""
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, tags, time.monotonic())
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _generation(self, tags: frozenset) -> tuple:
+        """Invalidation state of a set of tags (caller holds the lock)"""
+        return self._epoch, tuple(self._generations.get(tag, 0) for tag in sorted(tags))
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], tags: Iterable[str] = (),
+                       copy: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Return the cached value, computing and storing it on a miss (None results are not cached)
+
+        Args:
+            key: Cache key
+            compute: Produces the value on a miss
+            tags: Tags the value is invalidated by
+            copy: When given, callers get a copy and the cached value is never handed out,
+                  so a caller mutating its result cannot affect other callers
+        """
+        sentinel = object()
+        tags = frozenset(tags)
+        with self._lock:
+            generation = self._generation(tags)
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            if value is not None:
+                with self._lock:
+                    # A tag invalidated while computing means the value may already be stale
+                    if self._generation(tags) == generation:
+                        self._store(key, value, tags)
+        if copy is not None and value is not None:
+            return copy(value)
+        return value
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of the tags; returns how many were dropped"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        """Drop one entry and its tag references (caller holds the lock)"""
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+# Shared by every session: previews, profiles and schema lookups
+result_cache = TaggedResultCache()
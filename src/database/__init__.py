@@ -3,5 +3,8 @@ Database connection and metadata handling package.
 """
 
 from .connection import DatabaseConnection
+from .engine_registry import EngineRegistry, engine_registry
+from .repository import DatasetRepository, DATASET_COLUMNS
+from .materialization import DatasetMaterializer, MATERIALIZATION_MODES, REFRESH_SCHEDULES
 
-__all__ = ['DatabaseConnection'] 
\ No newline at end of file
+__all__ = ['DatabaseConnection', 'EngineRegistry', 'engine_registry', 'DatasetRepository', 'DATASET_COLUMNS', 'DatasetMaterializer', 'MATERIALIZATION_MODES', 'REFRESH_SCHEDULES']
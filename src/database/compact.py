@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# Compact query results by default (DU_COMPACT_FRAMES=1); callers can still opt in per query
+COMPACT_FRAMES = os.getenv("DU_COMPACT_FRAMES", "").lower() in ("1", "true", "yes")
+
+# Strings become categoricals when at most this share of their non-null values is distinct
+CATEGORY_MAX_RATIO = 0.5
+
+_INTEGER_TYPE = re.compile(r"^(TINYINT|SMALLINT|MEDIUMINT|INT|INTEGER|BIGINT|SERIAL|BIGSERIAL)\b", re.IGNORECASE)
+_WHOLE_DECIMAL_TYPE = re.compile(r"^(DECIMAL|NUMERIC)\s*\(\s*\d+\s*(,\s*0\s*)?\)", re.IGNORECASE)
+_FLOAT_TYPE = re.compile(r"^(FLOAT|REAL|DOUBLE)\b", re.IGNORECASE)
+_BOOLEAN_TYPE = re.compile(r"^(BIT|BOOLEAN|BOOL)\b", re.IGNORECASE)
+_STRING_TYPE = re.compile(r"^(N?VARCHAR|N?CHAR|CHARACTER|VARCHAR2|STRING|N?TEXT|CLOB)\b", re.IGNORECASE)
+
+# Largest magnitude up to which every whole number is exactly representable as a float64
+_FLOAT_EXACT_INTEGER_LIMIT = 2 ** 53
+
+# Nullable integer dtypes from smallest to largest
+_NULLABLE_INTS = ("Int8", "Int16", "Int32", "Int64")
+
+def column_types(columns: List[Dict]) -> Dict[str, str]:
+    """Map column names to server type names, as returned by DatabaseConnection.get_table_columns"""
+    return {column["name"]: column["type"] for column in columns if column.get("type")}
+
+def compact_frame(df: pd.DataFrame, types: Optional[Dict[str, str]] = None,
+                  category_ratio: float = CATEGORY_MAX_RATIO) -> pd.DataFrame:
+    """
+    Convert a query result to memory-compact dtypes
+
+    Server types pick the target dtype where known; other columns are judged from their
+    pandas dtype. Integers are downcast (nullable Int8-Int64 when they hold nulls), floats
+    become float32 only when no value changes, BIT/BOOLEAN columns become nullable booleans,
+    repetitive strings become categoricals and other strings Arrow-backed strings. Columns
+    whose values do not fit their type are left unchanged.
+
+    Args:
+        df: Query result
+        types: Column name to server type name (see column_types)
+        category_ratio: Largest distinct/non-null ratio stored as a categorical
+
+    Returns:
+        A new DataFrame with the same columns and values
+    """
+    types = types or {}
+    return pd.DataFrame(
+        {column: _compact_column(df[column], types.get(column), category_ratio) for column in df.columns},
+        index=df.index
+    )
+
+def _compact_column(series: pd.Series, server_type: Optional[str], category_ratio: float) -> pd.Series:
+    kind = type_kind(server_type) if server_type else None
+    if kind is None:
+        kind = _inferred_kind(series)
+    try:
+        if kind == "integer":
+            return _compact_integers(series)
+        if kind == "float":
+            return _compact_floats(series)
+        if kind == "boolean":
+            return _compact_booleans(series)
+        if kind == "string":
+            return _compact_strings(series, category_ratio)
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return series
+
+def type_kind(server_type: str) -> Optional[str]:
+    """Classify a server type name as integer, float, boolean or string (None when unknown)"""
+    if _INTEGER_TYPE.match(server_type) or _WHOLE_DECIMAL_TYPE.match(server_type):
+        return "integer"
+    if _FLOAT_TYPE.match(server_type):
+        return "float"
+    if _BOOLEAN_TYPE.match(server_type):
+        return "boolean"
+    if _STRING_TYPE.match(server_type):
+        return "string"
+    return None
+
+def _inferred_kind(series: pd.Series) -> Optional[str]:
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+    if pd.api.types.is_integer_dtype(dtype):
+        return "integer"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        return "string"
+    return None
+
+def _compact_integers(series: pd.Series) -> pd.Series:
+    numeric = pd.to_numeric(series, errors="raise")
+    values = numeric.dropna()
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    # Floats above 2**53 cannot be told apart from their neighbours, so they are never treated as whole numbers
+    if pd.api.types.is_float_dtype(numeric.dtype) and max(abs(low), abs(high)) > _FLOAT_EXACT_INTEGER_LIMIT:
+        return series
+    if not (values % 1 == 0).all():
+        return series
+    int64 = np.iinfo("int64")
+    if not (int64.min <= low and high <= int64.max):
+        return series
+    if len(values) == len(numeric):
+        return pd.to_numeric(numeric.astype("int64"), downcast="integer")
+    for dtype in _NULLABLE_INTS:
+        bounds = np.iinfo(dtype.lower())
+        if bounds.min <= low and high <= bounds.max:
+            return numeric.astype(dtype)
+    return series
+
+def _compact_floats(series: pd.Series) -> pd.Series:
+    numeric = pd.to_numeric(series, errors="raise").astype("float64")
+    narrow = numeric.astype("float32")
+    # Keep float64 when float32 would round any value
+    if ((narrow.astype("float64") == numeric) | numeric.isna()).all():
+        return narrow
+    return numeric
+
+def _compact_booleans(series: pd.Series) -> pd.Series:
+    values = series.dropna()
+    if not values.isin([0, 1, True, False]).all():
+        return series
+    return series.astype("boolean")
+
+def _compact_strings(series: pd.Series, category_ratio: float) -> pd.Series:
+    values = series.dropna()
+    if not values.map(lambda value: isinstance(value, str)).all():
+        return series
+    if len(values) and values.nunique() <= category_ratio * len(values):
+        return series.astype("category")
+    string_dtype = _arrow_string_dtype()
+    if string_dtype is None or series.dtype == string_dtype:
+        return series
+    return series.astype(string_dtype)
+
+def _arrow_string_dtype():
+    """Arrow-backed string dtype, or None when pyarrow is not installed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype("pyarrow")
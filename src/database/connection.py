@@ -1,48 +1,154 @@
-from sqlalchemy import create_engine, MetaData, inspect, text
+from sqlalchemy import MetaData, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Iterator
+import json
+import re
+import time
+import weakref
 import pandas as pd
+from src.monitoring import instrumented, annotate, instrument_engine
+from .engine_registry import engine_registry, normalize_connection_string
+from .single_flight import query_flights, query_key
+from .lineage import table_tag, tables_tag
+from .schema_watcher import get_schema_watcher, SCHEMA_WATCH_INTERVAL
+from .compact import compact_frame
+from src.cache.result_cache import result_cache
+
+# Current database, server and user for each dialect
+_SESSION_INFO_QUERIES = {
+    "mssql": "SELECT DB_NAME(), @@SERVERNAME, SYSTEM_USER",
+    "postgresql": "SELECT current_database(), inet_server_addr()::text, CURRENT_USER",
+    "mysql": "SELECT DATABASE(), @@hostname, CURRENT_USER()",
+    "sqlite": "SELECT 'main', 'localhost', 'sqlite'",
+    "default": "SELECT NULL, NULL, CURRENT_USER",
+}
+
+# Catalog-statistics row count (and size in bytes) of a table, indexed view or materialized view
+_CATALOG_ESTIMATE_QUERIES = {
+    "mssql": """
+        SELECT SUM(CASE WHEN ps.index_id IN (0, 1) THEN ps.row_count END), SUM(ps.used_page_count) * 8192
+        FROM sys.dm_db_partition_stats ps
+        WHERE ps.object_id = OBJECT_ID(:name)
+    """,
+    "postgresql": """
+        SELECT CASE WHEN c.reltuples >= 0 THEN CAST(c.reltuples AS bigint) END, pg_total_relation_size(c.oid)
+        FROM pg_class c
+        WHERE c.oid = to_regclass(:name) AND c.relkind IN ('r', 'm', 'p')
+    """,
+    "mysql": """
+        SELECT TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = COALESCE(:schema, DATABASE()) AND TABLE_NAME = :table AND TABLE_TYPE = 'BASE TABLE'
+    """,
+    "sqlite": """
+        SELECT CAST(substr(stat || ' ', 1, instr(stat || ' ', ' ') - 1) AS INTEGER), NULL
+        FROM sqlite_stat1
+        WHERE tbl = :table
+        LIMIT 1
+    """,
+}
+
+# CREATE VIEW header: name, optional column list and options, then the SELECT body
+_CREATE_VIEW_PATTERN = re.compile(
+    r"^\s*CREATE\s+(?:OR\s+(?:REPLACE|ALTER)\s+)?VIEW\s+([^\s(]+)\s*(?:\(([^)]*)\))?"
+    r"(?:\s+WITH\s+\w+(?:\s*,\s*\w+)*)?\s+AS\s+(.+?)\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Name SQLite gives the second and later occurrences of a duplicated column ("id:1")
+_SQLITE_DUPLICATE_NAME = re.compile(r"^(.*):\d+$")
+
+def _strip_markdown(query: str) -> str:
+    """Remove the markdown code fences generated queries often come wrapped in"""
+    return query.replace("```sql", "").replace("```", "").strip()
+
+def _compact_key(compact: bool, column_types: Optional[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+    """Single-flight key parameters separating compact reads made with different type maps"""
+    if not compact:
+        return None
+    return {"compact": True, "types": tuple(sorted((column_types or {}).items()))}
 
 class DatabaseConnection:
-    def __init__(self, connection_string: str):
-        """Initialize database connection"""
+    def __init__(self, connection_string: str, identity: Optional[str] = None, watch_schema: bool = True):
+        """
+        Initialize database connection
+
+        Args:
+            connection_string: SQLAlchemy URL
+            identity: Who the connection acts for, when the URL alone does not say (e.g. trusted connections)
+            watch_schema: Start the shared schema watcher that keeps cached results fresh
+        """
         self.connection_string = connection_string
+        self.identity = identity
+        self.watch_schema = watch_schema
         self.engine = None
+        self._release_engine = None
+        # Identity of the shared engine; identical queries under the same key are coalesced
+        self.connection_key, _ = normalize_connection_string(connection_string, identity)
         self.inspector = None
         self.metadata = None
         self.current_database = None
         self.current_server = None
 
+    @instrumented("database")
     def connect(self) -> bool:
         """Establish database connection"""
         try:
-            # For SQL Server with Windows Authentication
+            # Reconnecting gives up the previously shared engine first
+            self.close()
+            
+            # Engines are shared process-wide per connection string and identity
             if "mssql" in self.connection_string.lower():
-                self.engine = create_engine(
+                # For SQL Server with Windows Authentication
+                self.engine = engine_registry.acquire(
                     self.connection_string,
-                    connect_args={"TrustServerCertificate": "yes"}
+                    self.identity,
+                    connect_args={"TrustServerCertificate": "yes"},
+                    # Send executemany batches as a single parameter array
+                    fast_executemany=True
                 )
             else:
-                self.engine = create_engine(self.connection_string)
+                self.engine = engine_registry.acquire(self.connection_string, self.identity)
+            # Sessions dropped without close() (e.g. closed browser tabs) still give their reference back
+            self._release_engine = weakref.finalize(self, engine_registry.release, self.engine)
+            instrument_engine(self.engine)
             
             self.inspector = inspect(self.engine)
             self.metadata = MetaData()
             
             # Get current database and server information
-            with self.engine.connect() as connection:
-                # Get current database
-                result = connection.execute(text("SELECT DB_NAME()")).scalar()
-                self.current_database = result
-                
-                # Get server name
-                result = connection.execute(text("SELECT @@SERVERNAME")).scalar()
-                self.current_server = result
+            session_info = self.get_session_info()
+            self.current_database = session_info["database"]
+            self.current_server = session_info["server"]
+            
+            if self.watch_schema and SCHEMA_WATCH_INTERVAL > 0:
+                try:
+                    get_schema_watcher(self)
+                except Exception as e:
+                    # Caches then rely on their TTL alone
+                    print(f"Error starting schema watcher: {str(e)}")
                 
             return True
         except SQLAlchemyError as e:
             print(f"Error connecting to database: {str(e)}")
+            self.close()
             return False
 
+    @property
+    def dialect(self) -> Optional[str]:
+        """Name of the SQLAlchemy dialect in use (e.g. 'mssql', 'postgresql')"""
+        if not self.engine:
+            return None
+        return self.engine.dialect.name
+
+    def get_session_info(self) -> Dict[str, Any]:
+        """Get current database, server and user in a single round trip"""
+        query = _SESSION_INFO_QUERIES.get(self.dialect, _SESSION_INFO_QUERIES["default"])
+        with self.engine.connect() as connection:
+            row = connection.execute(text(query)).one()
+        return {"database": row[0], "server": row[1], "user": row[2]}
+
+    @instrumented("database")
     def verify_connection(self) -> Tuple[bool, str]:
         """
         Verify the current database connection and return connection details
@@ -54,60 +160,80 @@ class DatabaseConnection:
             if not self.engine:
                 return False, "No database engine available"
                 
-            with self.engine.connect() as connection:
-                # Get current database
-                current_db = connection.execute(text("SELECT DB_NAME()")).scalar()
-                # Get server name
-                server_name = connection.execute(text("SELECT @@SERVERNAME")).scalar()
-                # Get user name
-                user_name = connection.execute(text("SELECT SYSTEM_USER")).scalar()
-                
-                connection_info = f"""
-                Connected to:
-                - Server: {server_name}
-                - Database: {current_db}
-                - User: {user_name}
-                """
-                return True, connection_info
+            session_info = self.get_session_info()
+            connection_info = f"""
+            Connected to:
+            - Server: {session_info["server"]}
+            - Database: {session_info["database"]}
+            - User: {session_info["user"]}
+            """
+            return True, connection_info
         except Exception as e:
             return False, f"Connection verification failed: {str(e)}"
 
+    @instrumented("database")
     def get_tables(self) -> List[str]:
         """Get list of tables in the database"""
         try:
-            return self.inspector.get_table_names()
+            return list(result_cache.get_or_compute(
+                (self.connection_key, "tables"),
+                lambda: inspect(self.engine).get_table_names(),
+                tags=[tables_tag(self)]
+            ))
         except Exception as e:
             print(f"Error getting tables: {str(e)}")
             return []
 
+    @instrumented("database")
     def get_table_columns(self, table_name: str) -> List[Dict]:
         """Get column information for a table"""
         try:
-            columns = self.inspector.get_columns(table_name)
-            return [
+            columns = self._cached_schema("columns", table_name, lambda inspector: [
                 {
                     "name": col["name"],
                     "type": str(col["type"]),
                     "nullable": col.get("nullable", True)
                 }
-                for col in columns
-            ]
+                for col in inspector.get_columns(table_name)
+            ])
+            return [dict(col) for col in columns]
         except Exception as e:
             print(f"Error getting columns for table {table_name}: {str(e)}")
             return []
 
+    @instrumented("database")
     def get_primary_keys(self, table_name: str) -> List[str]:
         """Get primary key columns for a specific table"""
         if not self.inspector:
             return []
-        return self.inspector.get_pk_constraint(table_name)['constrained_columns']
+        return list(self._cached_schema(
+            "primary_keys", table_name,
+            lambda inspector: inspector.get_pk_constraint(table_name)['constrained_columns']
+        ))
 
+    @instrumented("database")
     def get_foreign_keys(self, table_name: str) -> List[Dict]:
         """Get foreign key relationships for a specific table"""
         if not self.inspector:
             return []
-        return self.inspector.get_foreign_keys(table_name)
+        return [dict(fk) for fk in self._cached_schema(
+            "foreign_keys", table_name, lambda inspector: inspector.get_foreign_keys(table_name)
+        )]
 
+    def _cached_schema(self, kind: str, table_name: str, reflect):
+        """
+        Schema lookup shared across sessions and invalidated per table through the lineage index
+
+        A fresh inspector is used on a miss so an invalidated entry is never served from
+        the session inspector's own cache.
+        """
+        return result_cache.get_or_compute(
+            (self.connection_key, kind, table_name),
+            lambda: reflect(inspect(self.engine)),
+            tags=[table_tag(self, table_name)]
+        )
+
+    @instrumented("database")
     def get_table_sample(self, table_name: str, limit: int = 5) -> pd.DataFrame:
         """Get a sample of records from a table"""
         try:
@@ -116,29 +242,265 @@ class DatabaseConnection:
             print(f"Error getting sample data: {str(e)}")
             return pd.DataFrame()
 
-    def execute_query(self, query: str) -> Optional[pd.DataFrame]:
+    def build_sample_query(self, source: str, limit: Optional[int] = None) -> str:
+        """Build a SELECT over a view or table, limited to the first rows in the dialect's syntax"""
+        if limit is None:
+            return f"SELECT * FROM {source}"
+        if self.dialect == "mssql":
+            return f"SELECT TOP ({int(limit)}) * FROM {source}"
+        return f"SELECT * FROM {source} LIMIT {int(limit)}"
+
+    @instrumented("database")
+    def estimate_row_count(self, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Estimate the size of a table or view from metadata, without scanning it
+
+        Tables (and indexed or materialized views) use catalog statistics; plain views fall
+        back to the optimizer's estimated plan where the dialect exposes one.
+
+        Args:
+            source: Table or view name, optionally schema-qualified
+
+        Returns:
+            Dict with rows, bytes (None if unknown) and method ('catalog' or 'plan'),
+            or None when no estimate is available (e.g. SQLite before ANALYZE)
+        """
+        try:
+            estimate = self._catalog_estimate(source)
+            if estimate is None:
+                estimate = self._plan_estimate(source)
+            return estimate
+        except SQLAlchemyError as e:
+            print(f"Error estimating row count for {source}: {str(e)}")
+            return None
+
+    def _catalog_estimate(self, source: str) -> Optional[Dict[str, Any]]:
+        """Row count and size from the dialect's catalog statistics"""
+        query = _CATALOG_ESTIMATE_QUERIES.get(self.dialect)
+        if query is None:
+            return None
+        schema, _, table = source.rpartition(".")
+        params = {"name": source, "schema": schema or None, "table": table}
+        with self.engine.connect() as connection:
+            if self.dialect == "sqlite":
+                has_stats = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                ).first()
+                if not has_stats:
+                    return None
+            row = connection.execute(text(query), params).first()
+        if row is None or row[0] is None:
+            return None
+        return {"rows": int(row[0]), "bytes": int(row[1]) if row[1] is not None else None, "method": "catalog"}
+
+    def _plan_estimate(self, source: str) -> Optional[Dict[str, Any]]:
+        """Estimated output rows of SELECT * from the optimizer's plan, without executing it"""
+        query = self.build_sample_query(source)
+        with self.engine.connect() as connection:
+            if self.dialect == "mssql":
+                connection.exec_driver_sql("SET SHOWPLAN_XML ON")
+                try:
+                    plan = connection.exec_driver_sql(query).scalar()
+                finally:
+                    connection.exec_driver_sql("SET SHOWPLAN_XML OFF")
+                match = re.search(r'StatementEstRows="([0-9.eE+-]+)"', plan or "")
+                rows = float(match.group(1)) if match else None
+                size = None
+            elif self.dialect == "postgresql":
+                plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query}").scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                rows = plan[0]["Plan"]["Plan Rows"]
+                size = rows * plan[0]["Plan"]["Plan Width"]
+            elif self.dialect == "mysql":
+                # Join output is estimated as the product of rows examined per table after filtering
+                plan = connection.exec_driver_sql(f"EXPLAIN {query}").mappings().all()
+                rows = None
+                for step in plan:
+                    if step.get("rows") is not None:
+                        rows = (rows or 1) * step["rows"] * float(step.get("filtered") or 100) / 100
+                size = None
+            else:
+                return None
+        if rows is None:
+            return None
+        return {"rows": int(round(rows)), "bytes": int(size) if size is not None else None, "method": "plan"}
+
+    @instrumented("database")
+    def describe_query(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Output columns of a SELECT query from metadata, without executing it
+
+        SQL Server uses sp_describe_first_result_set, SQLite compiles the query with EXPLAIN,
+        and other dialects open the query with a false predicate so no rows are read.
+
+        Args:
+            query: SQL SELECT query
+
+        Returns:
+            Column dicts with name, type and nullable (None where the dialect does not report it).
+            Duplicated names are reported once per occurrence.
+
+        Raises:
+            SQLAlchemyError: When the query is invalid (unknown or ambiguous references, syntax)
+        """
+        query = _strip_markdown(query).rstrip(";")
+        annotate(statement=query)
+        with self.engine.connect() as connection:
+            if self.dialect == "mssql":
+                rows = connection.execute(
+                    text("EXEC sp_describe_first_result_set @tsql = :tsql"), {"tsql": query}
+                ).mappings().all()
+                return [
+                    {"name": row["name"], "type": row["system_type_name"], "nullable": bool(row["is_nullable"])}
+                    for row in rows if not row.get("is_hidden")
+                ]
+
+            if self.dialect == "sqlite":
+                # EXPLAIN compiles the statement and reports bad references; a temporary view
+                # (private to this connection) then gives the declared type of each column
+                connection.exec_driver_sql(f"EXPLAIN {query}")
+                connection.exec_driver_sql("DROP VIEW IF EXISTS temp.du_describe")
+                connection.exec_driver_sql(f"CREATE TEMP VIEW du_describe AS {query}")
+                try:
+                    rows = connection.exec_driver_sql("PRAGMA temp.table_info(du_describe)").all()
+                finally:
+                    connection.exec_driver_sql("DROP VIEW IF EXISTS temp.du_describe")
+                names = {row[1].lower() for row in rows}
+                columns = []
+                for row in rows:
+                    match = _SQLITE_DUPLICATE_NAME.match(row[1])
+                    name = match.group(1) if match and match.group(1).lower() in names else row[1]
+                    columns.append({"name": name, "type": row[2] or None, "nullable": None})
+                return columns
+
+            result = connection.exec_driver_sql(f"SELECT * FROM ({query}) du_describe WHERE 1 = 0")
+            description = result.cursor.description
+            result.close()
+            types = {}
+            if self.dialect == "postgresql":
+                # psycopg reports type OIDs; resolve them to type names
+                oids = sorted({column[1] for column in description if isinstance(column[1], int)})
+                if oids:
+                    types = dict(connection.execute(
+                        text("SELECT oid, format_type(oid, NULL) FROM pg_type WHERE oid = ANY(:oids)"),
+                        {"oids": oids}
+                    ).all())
+            return [
+                {"name": column[0], "type": types.get(column[1]), "nullable": column[6]}
+                for column in description
+            ]
+
+    def validate_view_definition(self, create_view_query: str) -> Dict[str, Any]:
+        """
+        Check a CREATE VIEW statement before it is executed
+
+        The SELECT body is described from metadata only (see describe_query), so invalid
+        references and duplicate or unnamed output columns are found in milliseconds and
+        no DDL reaches the server.
+
+        Args:
+            create_view_query: CREATE VIEW statement
+
+        Returns:
+            Dict with valid, view_name, columns (see describe_query) and errors (messages)
+        """
+        validation = {"valid": False, "view_name": None, "columns": [], "errors": []}
+        match = _CREATE_VIEW_PATTERN.match(_strip_markdown(create_view_query))
+        if not match:
+            validation["errors"].append("Not a CREATE VIEW ... AS SELECT statement")
+            return validation
+        view_name, column_list, body = match.groups()
+        validation["view_name"] = view_name
+
+        try:
+            columns = self.describe_query(body)
+        except SQLAlchemyError as e:
+            message = str(getattr(e, "orig", None) or e).strip()
+            validation["errors"].append(f"Invalid query: {message}")
+            return validation
+
+        if column_list is not None:
+            names = [name.strip() for name in column_list.split(",")]
+            if len(names) != len(columns):
+                validation["errors"].append(
+                    f"View declares {len(names)} column names but the query returns {len(columns)} columns"
+                )
+            else:
+                columns = [dict(column, name=name) for column, name in zip(columns, names)]
+        validation["columns"] = columns
+
+        seen = {}
+        for position, column in enumerate(columns, start=1):
+            name = (column["name"] or "").strip('[]"`')
+            if not name:
+                validation["errors"].append(f"Column {position} has no name; give the expression an alias")
+                continue
+            key = name.lower()
+            if key in seen:
+                validation["errors"].append(
+                    f"Column name '{name}' is used more than once (columns {seen[key]} and {position}); "
+                    f"give one of them a distinct alias"
+                )
+            else:
+                seen[key] = position
+        validation["valid"] = not validation["errors"]
+        return validation
+
+    def iter_query_batches(self, query: str, batch_size: int = 50000,
+                           params: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream a SELECT query as DataFrame batches without buffering the full result
+
+        Args:
+            query: SQL SELECT query to execute
+            batch_size: Number of rows per yielded DataFrame
+            params: Optional bound parameters for the query
+
+        Yields:
+            DataFrame batches of at most batch_size rows
+        """
+        # stream_results uses a server-side cursor where the driver supports one
+        with self.engine.connect().execution_options(stream_results=True) as connection:
+            for batch in pd.read_sql(text(query), connection, params=params, chunksize=batch_size):
+                yield batch
+
+    @instrumented("database")
+    def execute_query(self, query: str, compact: bool = False,
+                      column_types: Optional[Dict[str, str]] = None) -> Optional[pd.DataFrame]:
         """
         Execute a SQL query and return results as a DataFrame
         
         Args:
             query: SQL query to execute
+            compact: Return SELECT results with memory-compact dtypes (see compact_frame)
+            column_types: Column name to server type name, used to pick compact dtypes
             
         Returns:
             DataFrame containing query results, or None if query failed
         """
         try:
-            # Verify connection before executing query
-            is_connected, connection_info = self.verify_connection()
-            if not is_connected:
-                raise Exception(f"Database connection verification failed: {connection_info}")
-            
             # Clean up the query
-            query = query.replace("```sql", "").replace("```", "").strip()
+            query = _strip_markdown(query)
+            
+            annotate(statement=query)
             
             # For SELECT queries, use pandas read_sql
             if query.upper().startswith("SELECT"):
-                return pd.read_sql(query, self.engine)
+                # Identical SELECTs already running (e.g. several users opening the same dataset) share one execution
+                df, shared = query_flights.do(
+                    query_key(self.connection_key, query, _compact_key(compact, column_types)),
+                    lambda: self._read_select(query, compact, column_types),
+                    copy=lambda frame: frame.copy()
+                )
+                annotate(cache="hit" if shared else "miss")
+                return df
             else:
+                # Verify connection before executing query
+                is_connected, connection_info = self.verify_connection()
+                if not is_connected:
+                    raise Exception(f"Database connection verification failed: {connection_info}")
+                
                 # For non-SELECT queries, use SQLAlchemy execution
                 with self.engine.begin() as connection:
                     # For CREATE VIEW, we need to handle it specially
@@ -147,12 +509,13 @@ class DatabaseConnection:
                         query = query.rstrip(';')
                         # Execute the CREATE VIEW statement
                         connection.execute(text(query))
-                        # Verify the view was created
+                        # Verify the view was created (OBJECT_ID is SQL Server only; other dialects raise on failure)
                         view_name = query.split()[2]  # Get view name from CREATE VIEW statement
-                        verify_query = f"SELECT OBJECT_ID('{view_name}') as view_id"
-                        result = connection.execute(text(verify_query)).scalar()
-                        if result is None:
-                            raise Exception(f"Failed to create view: {view_name}")
+                        if self.dialect == "mssql":
+                            verify_query = f"SELECT OBJECT_ID('{view_name}') as view_id"
+                            result = connection.execute(text(verify_query)).scalar()
+                            if result is None:
+                                raise Exception(f"Failed to create view: {view_name}")
                     else:
                         connection.execute(text(query))
                 return None
@@ -160,7 +523,24 @@ class DatabaseConnection:
             print(f"Error executing query: {str(e)}")
             raise
 
+    def _read_select(self, query: str, compact: bool = False,
+                     column_types: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Verify the connection and read a SELECT query into a DataFrame"""
+        is_connected, connection_info = self.verify_connection()
+        if not is_connected:
+            raise Exception(f"Database connection verification failed: {connection_info}")
+        
+        # Time connection checkout separately from the query itself
+        started = time.perf_counter()
+        with self.engine.connect() as connection:
+            annotate(pool_wait_ms=(time.perf_counter() - started) * 1000)
+            df = pd.read_sql(query, connection)
+        return compact_frame(df, column_types) if compact else df
+
     def close(self):
-        """Close the database connection"""
-        if self.engine:
-            self.engine.dispose() 
\ No newline at end of file
+        """Close the database connection, returning the shared engine to the registry"""
+        if self._release_engine is not None:
+            self._release_engine()
+            self._release_engine = None
+        self.engine = None
+        self.inspector = None
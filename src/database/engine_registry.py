@@ -0,0 +1,224 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url, Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime, timedelta
+import hashlib
+import os
+import threading
+
+def normalize_connection_string(connection_string: str, identity: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Build the registry key for a connection string
+
+    Driver, host and query parameters are normalized so equivalent strings share an engine.
+    The password is hashed into the key rather than dropped, so a session with different
+    credentials never reuses another user's engine.
+
+    Returns:
+        (key, display) where display is safe to show (password hidden)
+    """
+    url = make_url(connection_string)
+    url = url.set(
+        drivername=url.drivername.lower(),
+        host=url.host.lower() if url.host else url.host,
+        query={k.lower(): url.query[k] for k in sorted(url.query)},
+    )
+    secret = hashlib.sha256((url.password or "").encode()).hexdigest()[:16]
+    display = url.render_as_string(hide_password=True)
+    key = f"{display}|{identity or url.username or ''}|{secret}"
+    return key, display
+
+def _pool_count(pool, method: str) -> int:
+    """Checked-out or checked-in connection count; pools without a queue report 0"""
+    return getattr(pool, method)() if hasattr(pool, method) else 0
+
+class _RegisteredEngine:
+    """Bookkeeping for one shared engine"""
+
+    def __init__(self, key: str, display: str, engine: Engine):
+        self.key = key
+        self.display = display
+        self.engine = engine
+        self.refs = 0
+        self.created_at = datetime.now()
+        self.last_released = datetime.now()
+
+class EngineRegistry:
+    def __init__(self, max_connections: int = 50, pool_size: int = 5, max_overflow: int = 10,
+                 pool_timeout: float = 30, pool_recycle: int = 1800,
+                 idle_timeout: timedelta = timedelta(minutes=15)):
+        """
+        Process-wide registry handing out shared SQLAlchemy engines
+
+        Args:
+            max_connections: Upper bound on open database connections across all engines
+            pool_size: Connections each engine keeps open when idle
+            max_overflow: Extra connections each engine may open under load
+            pool_timeout: Seconds to wait for a connection before giving up
+            pool_recycle: Seconds after which pooled connections are replaced
+            idle_timeout: Unreferenced engines are disposed after this long
+        """
+        self.max_connections = max_connections
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._engines: Dict[str, _RegisteredEngine] = {}
+        self._by_engine: Dict[int, _RegisteredEngine] = {}
+        self._slots = threading.BoundedSemaphore(max_connections)
+        # DBAPI connections currently holding a global slot
+        self._slot_holders = set()
+
+    def acquire(self, connection_string: str, identity: Optional[str] = None, **engine_kwargs) -> Engine:
+        """
+        Get the shared engine for a connection string, creating it on first use
+
+        Every acquire must be matched by a release.
+
+        Args:
+            connection_string: SQLAlchemy URL
+            identity: Extra identity to key on when the URL alone does not identify the user
+            **engine_kwargs: Passed to create_engine when the engine is first created
+        """
+        key, display = normalize_connection_string(connection_string, identity)
+        self.dispose_idle()
+        with self._lock:
+            entry = self._engines.get(key)
+            if entry is None:
+                entry = _RegisteredEngine(key, display, self._create_engine(connection_string, engine_kwargs))
+                self._engines[key] = entry
+                self._by_engine[id(entry.engine)] = entry
+            entry.refs += 1
+            return entry.engine
+
+    def release(self, engine: Engine):
+        """Drop one reference to a shared engine; it is disposed once idle for idle_timeout"""
+        with self._lock:
+            entry = self._by_engine.get(id(engine))
+            if entry is None or entry.refs == 0:
+                return
+            entry.refs -= 1
+            if entry.refs == 0:
+                entry.last_released = datetime.now()
+        self.dispose_idle()
+
+    def references(self, engine: Engine) -> int:
+        """Number of holders of a shared engine (0 if it is not registered)"""
+        with self._lock:
+            entry = self._by_engine.get(id(engine))
+            return entry.refs if entry is not None else 0
+
+    def dispose_idle(self, now: Optional[datetime] = None) -> int:
+        """Dispose unreferenced engines idle for longer than idle_timeout; returns how many were disposed"""
+        now = now or datetime.now()
+        with self._lock:
+            idle = [entry for entry in self._engines.values()
+                    if entry.refs == 0 and now - entry.last_released >= self.idle_timeout]
+            for entry in idle:
+                self._remove(entry)
+        for entry in idle:
+            entry.engine.dispose()
+        return len(idle)
+
+    def dispose_all(self):
+        """Dispose every engine, e.g. at process shutdown"""
+        with self._lock:
+            entries = list(self._engines.values())
+            for entry in entries:
+                self._remove(entry)
+        for entry in entries:
+            entry.engine.dispose()
+
+    @property
+    def open_connections(self) -> int:
+        """Physical connections currently open across all engines"""
+        with self._lock:
+            return len(self._slot_holders)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-engine reference counts and pool usage"""
+        with self._lock:
+            entries = list(self._engines.values())
+        return [
+            {
+                "connection": entry.display,
+                "references": entry.refs,
+                "checked_out": _pool_count(entry.engine.pool, "checkedout"),
+                "idle_connections": _pool_count(entry.engine.pool, "checkedin"),
+                "created_at": entry.created_at,
+            }
+            for entry in entries
+        ]
+
+    def _remove(self, entry: _RegisteredEngine):
+        """Forget an engine (caller holds the lock)"""
+        self._engines.pop(entry.key, None)
+        self._by_engine.pop(id(entry.engine), None)
+
+    def _create_engine(self, connection_string: str, engine_kwargs: Dict[str, Any]) -> Engine:
+        """Create an engine whose physical connections count against the global limit"""
+        kwargs = dict(pool_recycle=self.pool_recycle)
+        # SQLite pools are chosen by the dialect and do not all accept size settings
+        if not make_url(connection_string).get_backend_name() == "sqlite":
+            kwargs.update(pool_size=self.pool_size, max_overflow=self.max_overflow, pool_timeout=self.pool_timeout)
+        kwargs.update(engine_kwargs)
+        engine = create_engine(connection_string, **kwargs)
+        event.listen(engine, "do_connect", self._on_connect)
+        event.listen(engine.pool, "close", self._on_close)
+        event.listen(engine.pool, "close_detached", self._on_close_detached)
+        return engine
+
+    def _take_slot(self):
+        """Wait for a global connection slot, reclaiming idle pooled connections of other engines if needed"""
+        if self._slots.acquire(timeout=min(1.0, self.pool_timeout)):
+            return
+        with self._lock:
+            idle = [entry.engine for entry in self._engines.values()
+                    if _pool_count(entry.engine.pool, "checkedout") == 0
+                    and _pool_count(entry.engine.pool, "checkedin") > 0]
+        # Disposing closes checked-in connections, which frees their slots
+        for engine in idle:
+            engine.dispose()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise PoolTimeoutError(
+                f"All {self.max_connections} database connections are in use; timed out after {self.pool_timeout}s"
+            )
+
+    def _on_connect(self, dialect, conn_rec, cargs, cparams):
+        self._take_slot()
+        try:
+            dbapi_connection = dialect.connect(*cargs, **cparams)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._slot_holders.add(id(dbapi_connection))
+        return dbapi_connection
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self._free_slot(dbapi_connection)
+
+    def _on_close_detached(self, dbapi_connection):
+        self._free_slot(dbapi_connection)
+
+    def _free_slot(self, dbapi_connection):
+        with self._lock:
+            if id(dbapi_connection) not in self._slot_holders:
+                return
+            self._slot_holders.discard(id(dbapi_connection))
+        self._slots.release()
+
+def _registry_from_env() -> EngineRegistry:
+    """Build the process-wide registry, with limits overridable through environment variables"""
+    return EngineRegistry(
+        max_connections=int(os.getenv("DU_MAX_DB_CONNECTIONS", "50")),
+        pool_size=int(os.getenv("DU_DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DU_DB_MAX_OVERFLOW", "10")),
+        idle_timeout=timedelta(minutes=float(os.getenv("DU_DB_IDLE_MINUTES", "15"))),
+    )
+
+# Shared by every Streamlit session in this process
+engine_registry = _registry_from_env()
@@ -0,0 +1,245 @@
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Dict, Optional, Iterable, Set
+import json
+import threading
+from src.cache.result_cache import result_cache
+from src.utils.join_parser import JoinParser
+
+# Base tables a view reads from, following nested views, per dialect
+_CATALOG_DEPENDENCY_QUERIES = {
+    "mssql": """
+        WITH deps AS (
+            SELECT d.referenced_id, 1 AS depth
+            FROM sys.sql_expression_dependencies d
+            WHERE d.referencing_id = OBJECT_ID(:view_name) AND d.referenced_id IS NOT NULL
+            UNION ALL
+            SELECT d.referenced_id, deps.depth + 1
+            FROM sys.sql_expression_dependencies d
+            JOIN deps ON d.referencing_id = deps.referenced_id
+            WHERE deps.depth < 10 AND d.referenced_id IS NOT NULL
+        )
+        SELECT DISTINCT o.name
+        FROM deps
+        JOIN sys.objects o ON o.object_id = deps.referenced_id
+        WHERE o.type = 'U'
+    """,
+    "postgresql": """
+        SELECT DISTINCT table_name
+        FROM information_schema.view_table_usage
+        WHERE view_name = :view_name
+    """,
+}
+
+_LIST_LINEAGE = text("SELECT ViewName, TableName FROM DU_DatasetLineage")
+
+_DELETE_LINEAGE = text("DELETE FROM DU_DatasetLineage WHERE ViewName = :view_name")
+
+_INSERT_LINEAGE = text("""
+INSERT INTO DU_DatasetLineage (ViewName, TableName, Source)
+VALUES (:view_name, :table_name, :source)
+""")
+
+_LIST_DATASET_SOURCES = text("SELECT ViewName, JoinConditions, Tables FROM DU_Datasets")
+
+def normalize_name(name: str) -> str:
+    """Lowercase object name without schema or quoting, so 'dbo.[Orders]' and 'orders' match"""
+    return name.split(".")[-1].strip().strip('[]"`').lower()
+
+def dataset_tag(db, view_name: str) -> str:
+    """Cache tag for results derived from a dataset view"""
+    return f"{db.connection_key}|dataset:{normalize_name(view_name)}"
+
+def tables_tag(db) -> str:
+    """Cache tag for the list of tables in a database"""
+    return f"{db.connection_key}|tables"
+
+def table_tag(db, table_name: str) -> str:
+    """Cache tag for results derived from a table or view's schema"""
+    return f"{db.connection_key}|table:{normalize_name(table_name)}"
+
+class _LineageMaps:
+    """In-memory reverse map of one database, shared by every LineageIndex on it"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.datasets_by_table: Dict[str, Set[str]] = {}
+        self.tables_by_dataset: Dict[str, Set[str]] = {}
+        self.loaded = False
+
+class LineageIndex:
+    def __init__(self, db, maps: Optional[_LineageMaps] = None):
+        """
+        Table-to-dataset dependency index backed by DU_DatasetLineage
+
+        Lookups go through an in-memory reverse map; the table is the durable copy
+        shared between processes. Get one per use from get_lineage_index: the map is
+        shared process-wide, while the connection stays the caller's.
+
+        Args:
+            db: Connected DatabaseConnection used for this index's queries
+            maps: Shared in-memory map (default: a private one)
+        """
+        self.db = db
+        self._maps = maps or _LineageMaps()
+        self._lock = self._maps.lock
+        self._datasets_by_table = self._maps.datasets_by_table
+        self._tables_by_dataset = self._maps.tables_by_dataset
+
+    @property
+    def loaded(self) -> bool:
+        return self._maps.loaded
+
+    @loaded.setter
+    def loaded(self, value: bool):
+        self._maps.loaded = value
+
+    def load(self):
+        """Load the index from DU_DatasetLineage, seeding it from DU_Datasets when empty"""
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(_LIST_LINEAGE).all()
+        with self._lock:
+            self._datasets_by_table.clear()
+            self._tables_by_dataset.clear()
+            for view_name, table_name in rows:
+                self._add(view_name, [table_name])
+            self.loaded = True
+        if not rows:
+            self.rebuild()
+
+    def rebuild(self):
+        """Recompute lineage for every dataset in DU_Datasets"""
+        with self.db.engine.connect() as connection:
+            datasets = connection.execute(_LIST_DATASET_SOURCES).all()
+        for view_name, join_conditions, tables in datasets:
+            try:
+                self.record(view_name, join_conditions=join_conditions, tables=tables)
+            except (SQLAlchemyError, ValueError) as e:
+                # e.g. a malformed Tables list; the other datasets still get their lineage
+                print(f"Error recording lineage of {view_name}: {str(e)}")
+
+    def record(self, view_name: str, join_conditions: Optional[str] = None,
+               tables: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Resolve and store the base tables of a dataset view
+
+        Catalog dependencies are preferred; otherwise tables named in the join
+        conditions, then the dataset's declared table list, are used.
+
+        Args:
+            view_name: Dataset view
+            join_conditions: Natural language join conditions of the dataset
+            tables: Declared table list (list or JSON string)
+
+        Returns:
+            The recorded table names
+        """
+        resolved, source = self._catalog_tables(view_name), "catalog"
+        if not resolved and join_conditions:
+            joins = JoinParser.parse_join_condition(join_conditions)
+            resolved = sorted({j["source_table"] for j in joins} | {j["target_table"] for j in joins})
+            source = "join_conditions"
+        if not resolved and tables:
+            resolved = json.loads(tables) if isinstance(tables, str) else list(tables)
+            source = "declared"
+
+        names = sorted({normalize_name(t) for t in resolved})
+        with self.db.engine.begin() as connection:
+            connection.execute(_DELETE_LINEAGE, {"view_name": view_name})
+            if names:
+                connection.execute(_INSERT_LINEAGE, [
+                    {"view_name": view_name, "table_name": name, "source": source} for name in names
+                ])
+        with self._lock:
+            self._discard(view_name)
+            self._add(view_name, names)
+        return names
+
+    def remove(self, view_name: str):
+        """Forget a dataset's lineage"""
+        with self.db.engine.begin() as connection:
+            connection.execute(_DELETE_LINEAGE, {"view_name": view_name})
+        with self._lock:
+            self._discard(view_name)
+
+    def datasets_for_table(self, table_name: str) -> Set[str]:
+        """Dataset views that read from a table"""
+        self._ensure_loaded()
+        with self._lock:
+            return set(self._datasets_by_table.get(normalize_name(table_name), ()))
+
+    def tables_for_dataset(self, view_name: str) -> Set[str]:
+        """Base tables a dataset view reads from"""
+        self._ensure_loaded()
+        with self._lock:
+            return set(self._tables_by_dataset.get(normalize_name(view_name), ()))
+
+    def invalidate_table(self, table_name: str) -> Set[str]:
+        """
+        Drop cached previews, profiles and schema entries affected by a change to a table
+
+        Returns:
+            The dataset views whose cached results were invalidated
+        """
+        datasets = self.datasets_for_table(table_name)
+        tags = [table_tag(self.db, table_name)]
+        for view_name in datasets:
+            tags += [dataset_tag(self.db, view_name), table_tag(self.db, view_name)]
+        result_cache.invalidate_tags(tags)
+        return datasets
+
+    def invalidate_dataset(self, view_name: str):
+        """Drop cached results of one dataset, e.g. after its definition or materialization changed"""
+        result_cache.invalidate_tags([dataset_tag(self.db, view_name), table_tag(self.db, view_name)])
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            try:
+                self.load()
+            except (SQLAlchemyError, ValueError) as e:
+                # Without the lineage table, lookups simply find nothing
+                print(f"Error loading dataset lineage: {str(e)}")
+                self.loaded = True
+            except AttributeError as e:
+                # Closed connection (no engine); the next caller with a live one loads the index
+                print(f"Error loading dataset lineage: {str(e)}")
+
+    def _catalog_tables(self, view_name: str) -> List[str]:
+        """Base tables of a view from the database catalog, where the dialect exposes them"""
+        query = _CATALOG_DEPENDENCY_QUERIES.get(self.db.dialect)
+        if query is None:
+            return []
+        try:
+            with self.db.engine.connect() as connection:
+                return [row[0] for row in connection.execute(text(query), {"view_name": view_name})]
+        except SQLAlchemyError as e:
+            print(f"Error reading dependencies of {view_name}: {str(e)}")
+            return []
+
+    def _add(self, view_name: str, tables: Iterable[str]):
+        """Add edges to the in-memory maps (caller holds the lock)"""
+        view_key = normalize_name(view_name)
+        for table in tables:
+            table_key = normalize_name(table)
+            self._datasets_by_table.setdefault(table_key, set()).add(view_name)
+            self._tables_by_dataset.setdefault(view_key, set()).add(table_key)
+
+    def _discard(self, view_name: str):
+        """Remove a dataset's edges from the in-memory maps (caller holds the lock)"""
+        view_key = normalize_name(view_name)
+        for table_key in self._tables_by_dataset.pop(view_key, set()):
+            views = {v for v in self._datasets_by_table.get(table_key, ()) if normalize_name(v) != view_key}
+            if views:
+                self._datasets_by_table[table_key] = views
+            else:
+                self._datasets_by_table.pop(table_key, None)
+
+# Shared maps only; connections are never kept here, so closing a session releases its engine
+_maps: Dict[str, _LineageMaps] = {}
+_maps_lock = threading.Lock()
+
+def get_lineage_index(db) -> LineageIndex:
+    """Lineage index for the database a connection points at, sharing the process-wide map"""
+    with _maps_lock:
+        maps = _maps.setdefault(db.connection_key, _LineageMaps())
+    return LineageIndex(db, maps)
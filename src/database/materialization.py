@@ -0,0 +1,231 @@
+from sqlalchemy import text
+from typing import List, Optional
+from datetime import datetime, timedelta
+import re
+import time
+from .repository import DatasetRepository
+from .lineage import get_lineage_index
+
+# Supported materialization modes and their display labels
+MATERIALIZATION_MODES = {
+    "view": "Plain view (no materialization)",
+    "indexed_view": "Indexed view (SQL Server)",
+    "materialized_view": "Materialized view (PostgreSQL)",
+    "snapshot_table": "Snapshot table",
+}
+
+# Refresh schedules and the interval after which a refresh is due
+REFRESH_SCHEDULES = {
+    "on_demand": None,
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+class DatasetMaterializer:
+    def __init__(self, db_connection):
+        """Initialize materializer on top of an open DatabaseConnection"""
+        self.db = db_connection
+        self.repository = DatasetRepository(db_connection)
+
+    def supported_modes(self) -> List[str]:
+        """Get the materialization modes available for the connected database"""
+        modes = ["view"]
+        if self.db.dialect == "mssql":
+            modes.append("indexed_view")
+        elif self.db.dialect == "postgresql":
+            modes.append("materialized_view")
+        modes.append("snapshot_table")
+        return modes
+
+    @staticmethod
+    def materialized_name(view_name: str, mode: str) -> Optional[str]:
+        """Get the name of the object holding the materialized rows"""
+        if mode == "indexed_view":
+            return view_name
+        if mode == "materialized_view":
+            return f"{view_name}_mv"
+        if mode == "snapshot_table":
+            return f"{view_name}_snapshot"
+        return None
+
+    def read_source(self, view_name: str, mode: Optional[str] = None,
+                    materialized_name: Optional[str] = None) -> str:
+        """
+        Get the FROM clause target that reads a dataset most cheaply
+
+        Args:
+            view_name: Name of the dataset's view
+            mode: Materialization mode recorded in DU_Datasets
+            materialized_name: Materialized object recorded in DU_Datasets
+
+        Returns:
+            str: Object name (with hints where needed) to select from
+        """
+        if not mode or mode == "view":
+            return view_name
+        if mode == "indexed_view":
+            # NOEXPAND makes non-Enterprise editions read the clustered index
+            return f"{view_name} WITH (NOEXPAND)"
+        return materialized_name or self.materialized_name(view_name, mode)
+
+    def validate(self, mode: str, refresh_schedule: str = "on_demand", key_columns: Optional[List[str]] = None):
+        """Raise ValueError unless the mode, schedule and key columns can be materialized on this database"""
+        if mode not in MATERIALIZATION_MODES:
+            raise ValueError(f"Unknown materialization mode: {mode}")
+        if mode not in self.supported_modes():
+            raise ValueError(f"Materialization mode '{mode}' is not supported for {self.db.dialect}")
+        if refresh_schedule not in REFRESH_SCHEDULES:
+            raise ValueError(f"Unknown refresh schedule: {refresh_schedule}")
+        if mode == "indexed_view" and not key_columns:
+            raise ValueError("Indexed views require at least one unique key column")
+
+    def materialize(self, view_name: str, mode: str, refresh_schedule: str = "on_demand",
+                    key_columns: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Materialize an existing dataset view and record it in DU_Datasets
+
+        Args:
+            view_name: Name of the dataset's view
+            mode: One of MATERIALIZATION_MODES
+            refresh_schedule: One of REFRESH_SCHEDULES
+            key_columns: Unique key columns (required for indexed views)
+
+        Returns:
+            Name of the materialized object, or None for plain views
+        """
+        self.validate(mode, refresh_schedule, key_columns)
+        target = self.materialized_name(view_name, mode)
+        started = time.perf_counter()
+
+        if mode == "indexed_view":
+            self._create_indexed_view(view_name, key_columns or [])
+        elif mode == "materialized_view":
+            with self.db.engine.begin() as connection:
+                connection.execute(text(f"CREATE MATERIALIZED VIEW {target} AS SELECT * FROM {view_name} WITH DATA"))
+        elif mode == "snapshot_table":
+            self._rebuild_snapshot(view_name, target)
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        self.repository.update_materialization(view_name, mode, target, refresh_schedule, duration_ms)
+        # Cached previews and profiles now read from a different object
+        get_lineage_index(self.db).invalidate_dataset(view_name)
+        return target
+
+    def refresh(self, view_name: str, mode: str, materialized_name: Optional[str] = None) -> int:
+        """
+        Refresh a materialized dataset on demand
+
+        Returns:
+            int: Refresh duration in milliseconds
+        """
+        target = materialized_name or self.materialized_name(view_name, mode)
+        started = time.perf_counter()
+
+        if mode == "materialized_view":
+            with self.db.engine.begin() as connection:
+                connection.execute(text(f"REFRESH MATERIALIZED VIEW {target}"))
+        elif mode == "snapshot_table":
+            self._rebuild_snapshot(view_name, target)
+        # Indexed views are maintained by the server on every base table write
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        self.repository.record_refresh(view_name, duration_ms)
+        get_lineage_index(self.db).invalidate_dataset(view_name)
+        return duration_ms
+
+    def refresh_due_datasets(self, now: Optional[datetime] = None) -> List[str]:
+        """Refresh every scheduled dataset whose refresh interval has elapsed"""
+        rows = self.repository.list_scheduled_datasets()
+
+        refreshed = []
+        for row in rows:
+            if self.is_refresh_due(row["RefreshSchedule"], row["LastRefreshedDate"], now):
+                try:
+                    self.refresh(row["ViewName"], row["MaterializationMode"], row["MaterializedName"])
+                    refreshed.append(row["ViewName"])
+                except Exception as e:
+                    print(f"Error refreshing dataset {row['ViewName']}: {str(e)}")
+        return refreshed
+
+    @staticmethod
+    def is_refresh_due(refresh_schedule: Optional[str], last_refreshed: Optional[datetime],
+                       now: Optional[datetime] = None) -> bool:
+        """Check whether a scheduled refresh interval has elapsed"""
+        interval = REFRESH_SCHEDULES.get(refresh_schedule or "on_demand")
+        if interval is None:
+            return False
+        if last_refreshed is None:
+            return True
+        return (now or datetime.now()) - last_refreshed >= interval
+
+    def drop(self, view_name: str, mode: str, materialized_name: Optional[str] = None):
+        """Remove the materialized copy of a dataset, leaving its plain view"""
+        target = materialized_name or self.materialized_name(view_name, mode)
+        with self.db.engine.begin() as connection:
+            if mode == "materialized_view":
+                connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {target}"))
+            elif mode == "snapshot_table":
+                connection.execute(text(f"DROP TABLE IF EXISTS {target}"))
+                connection.execute(text(f"DROP TABLE IF EXISTS {target}__staging"))
+            elif mode == "indexed_view":
+                connection.execute(text(f"DROP INDEX IF EXISTS {self._indexed_view_index(view_name)} ON {view_name}"))
+        self.repository.update_materialization(view_name, "view", None, "on_demand", None)
+        get_lineage_index(self.db).invalidate_dataset(view_name)
+
+    def _create_indexed_view(self, view_name: str, key_columns: List[str]):
+        """Schema-bind an existing view and give it a unique clustered index"""
+        if not key_columns:
+            raise ValueError("Indexed views require at least one unique key column")
+
+        with self.db.engine.begin() as connection:
+            definition = connection.execute(
+                text("SELECT OBJECT_DEFINITION(OBJECT_ID(:view_name))"),
+                {"view_name": view_name}
+            ).scalar()
+            if not definition:
+                raise Exception(f"View definition not found: {view_name}")
+
+            if not re.search(r"WITH\s+SCHEMABINDING", definition, flags=re.IGNORECASE):
+                definition = re.sub(
+                    r"^\s*CREATE\s+VIEW\s+([^\s(]+)(\s*\([^)]*\))?\s+AS\b",
+                    r"ALTER VIEW \1\2 WITH SCHEMABINDING AS",
+                    definition,
+                    count=1,
+                    flags=re.IGNORECASE
+                )
+            else:
+                definition = re.sub(r"^\s*CREATE\s+VIEW", "ALTER VIEW", definition, count=1, flags=re.IGNORECASE)
+
+            # Sent as-is: the view body may contain ':name' text that must not become a bind parameter
+            connection.exec_driver_sql(definition)
+            connection.execute(text(
+                f"CREATE UNIQUE CLUSTERED INDEX {self._indexed_view_index(view_name)} "
+                f"ON {view_name} ({', '.join(key_columns)})"
+            ))
+
+    @staticmethod
+    def _indexed_view_index(view_name: str) -> str:
+        """Quoted name of an indexed view's clustered index, from the bare view name (no schema)"""
+        bare_name = view_name.rpartition(".")[2].strip('[]"')
+        return f"[IX_{bare_name}_Materialized]"
+
+    def _rebuild_snapshot(self, view_name: str, target: str):
+        """Rebuild a snapshot table in a staging table and swap it in"""
+        staging = f"{target}__staging"
+        with self.db.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+            if self.db.dialect == "mssql":
+                connection.execute(text(f"SELECT * INTO {staging} FROM {view_name}"))
+            else:
+                connection.execute(text(f"CREATE TABLE {staging} AS SELECT * FROM {view_name}"))
+
+        # Swap in a separate short transaction so readers never see an empty table.
+        # The new name is given without its schema; the table stays in the staging table's schema.
+        new_name = target.rpartition(".")[2]
+        with self.db.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {target}"))
+            if self.db.dialect == "mssql":
+                connection.execute(text(f"EXEC sp_rename '{staging}', '{new_name}'"))
+            else:
+                connection.execute(text(f"ALTER TABLE {staging} RENAME TO {new_name}"))
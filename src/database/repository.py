@@ -0,0 +1,212 @@
+from sqlalchemy import text
+from typing import List, Dict, Optional, Any, Iterable
+import json
+import pandas as pd
+
+# Columns written for every dataset record, in insert order
+DATASET_COLUMNS = [
+    "DatasetName", "Description", "CreatedBy", "ViewName",
+    "JoinConditions", "Tables", "DatabaseName", "ServerName",
+    "MaterializationMode", "RefreshSchedule"
+]
+
+# Statements are module-level constants so SQLAlchemy's compiled cache and the
+# server's plan cache both see one stable, parameterized statement text.
+_INSERT_DATASET = text(f"""
+INSERT INTO DU_Datasets ({', '.join(DATASET_COLUMNS)})
+VALUES ({', '.join(':' + c for c in DATASET_COLUMNS)})
+""")
+
+_MERGE_DATASET_MSSQL = text(f"""
+MERGE DU_Datasets WITH (HOLDLOCK) AS target
+USING (SELECT {', '.join(f':{c} AS {c}' for c in DATASET_COLUMNS)}) AS source
+ON target.ViewName = source.ViewName
+WHEN MATCHED THEN UPDATE SET
+    {', '.join(f'{c} = source.{c}' for c in DATASET_COLUMNS if c not in ('ViewName', 'CreatedBy'))}
+WHEN NOT MATCHED THEN
+    INSERT ({', '.join(DATASET_COLUMNS)})
+    VALUES ({', '.join('source.' + c for c in DATASET_COLUMNS)});
+""")
+
+_UPDATE_DATASET = text(f"""
+UPDATE DU_Datasets
+SET {', '.join(f'{c} = :{c}' for c in DATASET_COLUMNS if c not in ('ViewName', 'CreatedBy'))}
+WHERE ViewName = :ViewName
+""")
+
+_INSERT_DATASET_IF_MISSING = text(f"""
+INSERT INTO DU_Datasets ({', '.join(DATASET_COLUMNS)})
+SELECT {', '.join(':' + c for c in DATASET_COLUMNS)}
+WHERE NOT EXISTS (SELECT 1 FROM DU_Datasets WHERE ViewName = :ViewName)
+""")
+
+_LIST_DATASETS = text("""
+SELECT
+    DatasetID,
+    DatasetName,
+    Description,
+    CreatedDate,
+    CreatedBy,
+    ViewName,
+    JoinConditions,
+    Tables,
+    DatabaseName,
+    ServerName,
+    MaterializationMode,
+    MaterializedName,
+    RefreshSchedule,
+    LastRefreshedDate
+FROM DU_Datasets
+ORDER BY CreatedDate DESC
+""")
+
+_GET_DATASET = text("""
+SELECT ViewName, DatasetName, Description, JoinConditions, Tables,
+       MaterializationMode, MaterializedName, RefreshSchedule, LastRefreshedDate
+FROM DU_Datasets
+WHERE ViewName = :view_name
+""")
+
+_UPDATE_MATERIALIZATION = text("""
+UPDATE DU_Datasets
+SET MaterializationMode = :mode,
+    MaterializedName = :target,
+    RefreshSchedule = :refresh_schedule,
+    LastRefreshedDate = CASE WHEN :mode = 'view' THEN NULL ELSE CURRENT_TIMESTAMP END,
+    LastRefreshDurationMs = :duration_ms
+WHERE ViewName = :view_name
+""")
+
+_RECORD_REFRESH = text("""
+UPDATE DU_Datasets
+SET LastRefreshedDate = CURRENT_TIMESTAMP,
+    LastRefreshDurationMs = :duration_ms
+WHERE ViewName = :view_name
+""")
+
+_LIST_SCHEDULED = text("""
+SELECT ViewName, MaterializationMode, MaterializedName, RefreshSchedule, LastRefreshedDate
+FROM DU_Datasets
+WHERE MaterializationMode IN ('materialized_view', 'snapshot_table')
+""")
+
+class DatasetRepository:
+    def __init__(self, db_connection, chunk_size: int = 1000):
+        """
+        Initialize repository for DU_Datasets on top of a DatabaseConnection
+
+        Args:
+            db_connection: Connected DatabaseConnection
+            chunk_size: Number of records sent per executemany batch
+        """
+        self.db = db_connection
+        self.chunk_size = chunk_size
+
+    def get_context(self) -> Dict[str, Any]:
+        """Get current user, database and server in a single round trip"""
+        session_info = self.db.get_session_info()
+        return {
+            "CreatedBy": session_info["user"],
+            "DatabaseName": session_info["database"] or self.db.current_database,
+            "ServerName": session_info["server"] or self.db.current_server,
+        }
+
+    def insert_dataset(self, record: Dict[str, Any]) -> int:
+        """Insert a single dataset record"""
+        return self.insert_datasets([record])
+
+    def insert_datasets(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert dataset records in batched executemany calls
+
+        Args:
+            records: Dicts keyed by DATASET_COLUMNS; CreatedBy, DatabaseName and
+                ServerName default to the current connection context
+
+        Returns:
+            int: Number of records written
+        """
+        return self._execute_batched(_INSERT_DATASET, records)
+
+    def upsert_datasets(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or update dataset records keyed by ViewName in batched calls
+
+        Returns:
+            int: Number of records written
+        """
+        if self.db.dialect == "mssql":
+            return self._execute_batched(_MERGE_DATASET_MSSQL, records)
+        return self._execute_batched([_UPDATE_DATASET, _INSERT_DATASET_IF_MISSING], records)
+
+    def list_datasets(self) -> pd.DataFrame:
+        """Get all registered datasets, newest first"""
+        with self.db.engine.connect() as connection:
+            return pd.read_sql(_LIST_DATASETS, connection)
+
+    def get_dataset(self, view_name: str) -> Optional[Dict[str, Any]]:
+        """Get one registered dataset by view name, or None"""
+        with self.db.engine.connect() as connection:
+            row = connection.execute(_GET_DATASET, {"view_name": view_name}).mappings().first()
+        return dict(row) if row is not None else None
+
+    def list_scheduled_datasets(self) -> List[Dict[str, Any]]:
+        """Get materialized datasets with their refresh schedule"""
+        with self.db.engine.connect() as connection:
+            return [dict(row) for row in connection.execute(_LIST_SCHEDULED).mappings().all()]
+
+    def update_materialization(self, view_name: str, mode: str, target: Optional[str],
+                               refresh_schedule: str, duration_ms: Optional[int]):
+        """Record materialization settings and the initial refresh"""
+        with self.db.engine.begin() as connection:
+            connection.execute(_UPDATE_MATERIALIZATION, {
+                "mode": mode,
+                "target": target,
+                "refresh_schedule": refresh_schedule,
+                "duration_ms": duration_ms,
+                "view_name": view_name
+            })
+
+    def record_refresh(self, view_name: str, duration_ms: int):
+        """Record a completed refresh of a materialized dataset"""
+        with self.db.engine.begin() as connection:
+            connection.execute(_RECORD_REFRESH, {"duration_ms": duration_ms, "view_name": view_name})
+
+    def _execute_batched(self, statements, records: Iterable[Dict[str, Any]]) -> int:
+        """Run one or more statements over records in executemany chunks in one transaction"""
+        if not isinstance(statements, list):
+            statements = [statements]
+
+        context = self.get_context()
+        written = 0
+        chunk = []
+        with self.db.engine.begin() as connection:
+            for record in records:
+                chunk.append(self._normalize(record, context))
+                if len(chunk) >= self.chunk_size:
+                    for statement in statements:
+                        connection.execute(statement, chunk)
+                    written += len(chunk)
+                    chunk = []
+            if chunk:
+                for statement in statements:
+                    connection.execute(statement, chunk)
+                written += len(chunk)
+        return written
+
+    @staticmethod
+    def _normalize(record: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill defaults so every record binds the same parameter set"""
+        tables = record.get("Tables", [])
+        return {
+            "DatasetName": record["DatasetName"],
+            "Description": record.get("Description"),
+            "CreatedBy": record.get("CreatedBy") or context["CreatedBy"],
+            "ViewName": record.get("ViewName") or record["DatasetName"],
+            "JoinConditions": record.get("JoinConditions") or "",
+            "Tables": tables if isinstance(tables, str) else json.dumps(tables),
+            "DatabaseName": record.get("DatabaseName") or context["DatabaseName"],
+            "ServerName": record.get("ServerName") or context["ServerName"],
+            "MaterializationMode": record.get("MaterializationMode") or "view",
+            "RefreshSchedule": record.get("RefreshSchedule") or "on_demand",
+        }
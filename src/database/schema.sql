@@ -25,4 +25,32 @@ END
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_DU_Datasets_CreatedDate' AND object_id = OBJECT_ID('DU_Datasets'))
 BEGIN
     CREATE NONCLUSTERED INDEX [IX_DU_Datasets_CreatedDate] ON [dbo].[DU_Datasets]([CreatedDate])
-END 
\ No newline at end of file
+END 
+
+-- Materialization settings and refresh metadata
+IF COL_LENGTH('dbo.DU_Datasets', 'MaterializationMode') IS NULL
+BEGIN
+    ALTER TABLE [dbo].[DU_Datasets] ADD
+        [MaterializationMode] [nvarchar](20) NOT NULL CONSTRAINT [DF_DU_Datasets_MaterializationMode] DEFAULT 'view',
+        [MaterializedName] [nvarchar](128) NULL,
+        [RefreshSchedule] [nvarchar](20) NOT NULL CONSTRAINT [DF_DU_Datasets_RefreshSchedule] DEFAULT 'on_demand',
+        [LastRefreshedDate] [datetime] NULL,
+        [LastRefreshDurationMs] [int] NULL
+END
+
+-- Normalized table-to-dataset lineage, so dependents of a table are found without parsing Tables JSON
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[DU_DatasetLineage]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[DU_DatasetLineage](
+        [ViewName] [nvarchar](100) NOT NULL,
+        [TableName] [nvarchar](128) NOT NULL,
+        [Source] [nvarchar](20) NOT NULL,
+        [RecordedDate] [datetime] NOT NULL CONSTRAINT [DF_DU_DatasetLineage_RecordedDate] DEFAULT GETDATE(),
+        CONSTRAINT [PK_DU_DatasetLineage] PRIMARY KEY CLUSTERED ([ViewName] ASC, [TableName] ASC)
+    )
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_DU_DatasetLineage_TableName' AND object_id = OBJECT_ID('DU_DatasetLineage'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_DU_DatasetLineage_TableName] ON [dbo].[DU_DatasetLineage]([TableName]) INCLUDE ([ViewName])
+END
@@ -0,0 +1,311 @@
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from datetime import datetime
+import os
+import threading
+from src.cache.result_cache import result_cache
+from .engine_registry import engine_registry
+from .lineage import get_lineage_index, tables_tag
+
+# Seconds between change-signal polls; 0 disables the watcher
+SCHEMA_WATCH_INTERVAL = float(os.getenv("DU_SCHEMA_WATCH_SECONDS", "30"))
+
+# One cheap value per dialect that changes whenever a table or view is created, altered or dropped
+_SIGNAL_QUERIES = {
+    "mssql": """
+        SELECT CONVERT(varchar(33), MAX(modify_date), 126) + '|' + CAST(COUNT(*) AS varchar(12))
+        FROM sys.objects
+        WHERE type IN ('U', 'V') AND is_ms_shipped = 0
+    """,
+    "postgresql": """
+        SELECT md5(string_agg(c.oid::text || ':' || c.xmin::text, ',' ORDER BY c.oid))
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'v', 'm', 'p') AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    """,
+    "mysql": """
+        SELECT CONCAT(COALESCE(MAX(CREATE_TIME), ''), '|', COUNT(*))
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+    """,
+    "sqlite": "PRAGMA schema_version",
+}
+
+# Name, type and version of every table and view; diffed when the signal moves
+_SNAPSHOT_QUERIES = {
+    "mssql": """
+        SELECT name, CASE type WHEN 'V' THEN 'view' ELSE 'table' END, CONVERT(varchar(33), modify_date, 126)
+        FROM sys.objects
+        WHERE type IN ('U', 'V') AND is_ms_shipped = 0
+    """,
+    "postgresql": """
+        SELECT c.relname, CASE WHEN c.relkind IN ('v', 'm') THEN 'view' ELSE 'table' END, c.xmin::text
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'v', 'm', 'p') AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    """,
+    "mysql": """
+        SELECT TABLE_NAME, CASE TABLE_TYPE WHEN 'VIEW' THEN 'view' ELSE 'table' END, CAST(CREATE_TIME AS CHAR)
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+    """,
+    "sqlite": "SELECT name, type, sql FROM sqlite_master WHERE type IN ('table', 'view')",
+}
+
+# Optional Postgres DDL log written by event triggers; when installed, changes are read
+# from it directly instead of diffing catalog snapshots
+POSTGRES_EVENT_LOG_SQL = """
+CREATE TABLE IF NOT EXISTS du_schema_changes (
+    id bigserial PRIMARY KEY,
+    command_tag text NOT NULL,
+    object_type text,
+    object_identity text,
+    changed_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION du_log_ddl_command() RETURNS event_trigger LANGUAGE plpgsql AS $$
+DECLARE r record;
+BEGIN
+    FOR r IN SELECT * FROM pg_event_trigger_ddl_commands() LOOP
+        INSERT INTO du_schema_changes (command_tag, object_type, object_identity)
+        VALUES (r.command_tag, r.object_type, r.object_identity);
+    END LOOP;
+END $$;
+
+CREATE OR REPLACE FUNCTION du_log_dropped_object() RETURNS event_trigger LANGUAGE plpgsql AS $$
+DECLARE r record;
+BEGIN
+    FOR r IN SELECT * FROM pg_event_trigger_dropped_objects() LOOP
+        IF r.object_type IN ('table', 'view', 'materialized view') THEN
+            INSERT INTO du_schema_changes (command_tag, object_type, object_identity)
+            VALUES ('DROP', r.object_type, r.object_identity);
+        END IF;
+    END LOOP;
+END $$;
+
+DROP EVENT TRIGGER IF EXISTS du_ddl_command_log;
+CREATE EVENT TRIGGER du_ddl_command_log ON ddl_command_end EXECUTE FUNCTION du_log_ddl_command();
+DROP EVENT TRIGGER IF EXISTS du_dropped_object_log;
+CREATE EVENT TRIGGER du_dropped_object_log ON sql_drop EXECUTE FUNCTION du_log_dropped_object();
+"""
+
+_POSTGRES_EVENT_LOG_EXISTS = "SELECT to_regclass('du_schema_changes') IS NOT NULL"
+
+_POSTGRES_EVENT_LOG_POSITION = "SELECT COALESCE(MAX(id), 0) FROM du_schema_changes"
+
+_POSTGRES_EVENT_LOG_CHANGES = """
+SELECT id, command_tag, object_type, object_identity
+FROM du_schema_changes
+WHERE id > :last_id
+ORDER BY id
+"""
+
+class SchemaChangeEvent:
+    """A table or view that was added, altered or dropped"""
+
+    def __init__(self, kind: str, object_name: str, object_type: str,
+                 detected_at: Optional[datetime] = None):
+        self.kind = kind
+        self.object_name = object_name
+        self.object_type = object_type
+        self.detected_at = detected_at or datetime.now()
+
+    def __repr__(self):
+        return f"SchemaChangeEvent({self.kind} {self.object_type} {self.object_name})"
+
+class SchemaWatcher:
+    def __init__(self, db, interval: float = SCHEMA_WATCH_INTERVAL):
+        """
+        Poll a cheap schema-change signal and emit change events to subscribers
+
+        In steady state each poll is a single one-row query; the catalog is only
+        read and diffed when the signal moves.
+
+        Args:
+            db: Connected DatabaseConnection owned by the watcher
+            interval: Seconds between polls
+        """
+        self.db = db
+        self.interval = interval
+        self.subscribers: List[Callable[[List[SchemaChangeEvent]], None]] = []
+        self._signal = None
+        self._snapshot: Optional[Dict[str, Tuple[str, Any]]] = None
+        self._event_log_position: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[List[SchemaChangeEvent]], None]):
+        """Register a callable that receives each batch of change events"""
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[SchemaChangeEvent]], None]):
+        """Unregister a subscriber"""
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self.poll()  # establish the baseline before the first interval
+        self._thread = threading.Thread(target=self._run, name="schema-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+
+    def install_event_log(self):
+        """Create the Postgres DDL event log and its event triggers (requires superuser)"""
+        if self.db.dialect != "postgresql":
+            raise ValueError("The schema event log is only available for PostgreSQL")
+        with self.db.engine.begin() as connection:
+            connection.exec_driver_sql(POSTGRES_EVENT_LOG_SQL)
+        self._event_log_position = None
+
+    def poll(self) -> List[SchemaChangeEvent]:
+        """Check the change signal once and publish any detected changes"""
+        with self.db.engine.connect() as connection:
+            if self.db.dialect == "postgresql" and connection.execute(text(_POSTGRES_EVENT_LOG_EXISTS)).scalar():
+                events = self._poll_event_log(connection)
+            else:
+                events = self._poll_snapshot(connection)
+        if events:
+            self._publish(events)
+        return events
+
+    def _poll_event_log(self, connection) -> List[SchemaChangeEvent]:
+        """Read new entries from the Postgres DDL event log"""
+        if self._event_log_position is None:
+            self._event_log_position = connection.execute(text(_POSTGRES_EVENT_LOG_POSITION)).scalar()
+            return []
+        rows = connection.execute(text(_POSTGRES_EVENT_LOG_CHANGES), {"last_id": self._event_log_position}).all()
+        events = []
+        for change_id, command_tag, object_type, identity in rows:
+            self._event_log_position = change_id
+            if object_type not in ("table", "view", "materialized view") or not identity:
+                continue
+            verb = command_tag.split()[0].upper()
+            kind = {"CREATE": "added", "DROP": "dropped"}.get(verb, "altered")
+            events.append(SchemaChangeEvent(kind, identity, "table" if object_type == "table" else "view"))
+        return events
+
+    def _poll_snapshot(self, connection) -> List[SchemaChangeEvent]:
+        """Compare the change signal and, if it moved, diff a catalog snapshot"""
+        query = _SIGNAL_QUERIES.get(self.db.dialect)
+        if query is None:
+            return []
+        signal = connection.execute(text(query)).scalar()
+        if signal == self._signal and self._snapshot is not None:
+            return []
+        self._signal = signal
+
+        snapshot = {
+            name: (object_type, version)
+            for name, object_type, version in connection.execute(text(_SNAPSHOT_QUERIES[self.db.dialect]))
+        }
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return []
+
+        events = []
+        for name, (object_type, version) in snapshot.items():
+            if name not in previous:
+                events.append(SchemaChangeEvent("added", name, object_type))
+            elif previous[name] != (object_type, version):
+                events.append(SchemaChangeEvent("altered", name, object_type))
+        for name, (object_type, _) in previous.items():
+            if name not in snapshot:
+                events.append(SchemaChangeEvent("dropped", name, object_type))
+        return events
+
+    def _publish(self, events: List[SchemaChangeEvent]):
+        for callback in list(self.subscribers):
+            try:
+                callback(events)
+            except Exception as e:
+                print(f"Error in schema change subscriber: {str(e)}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Stop once no session uses this database anymore (the watcher holds one reference)
+            if engine_registry.references(self.db.engine) <= 1:
+                _remove_watcher(self)
+                return
+            try:
+                self.poll()
+            except SQLAlchemyError as e:
+                print(f"Error polling for schema changes: {str(e)}")
+
+def invalidate_caches(watcher: SchemaWatcher) -> Callable[[List[SchemaChangeEvent]], None]:
+    """Subscriber dropping the table list, schema, preview and profile cache entries affected by changes"""
+    def on_changes(events: List[SchemaChangeEvent]):
+        db = watcher.db
+        lineage = get_lineage_index(db)
+        if any(event.kind in ("added", "dropped") for event in events):
+            result_cache.invalidate_tags([tables_tag(db)])
+        for event in events:
+            lineage.invalidate_table(event.object_name)
+            if event.object_type == "view":
+                lineage.invalidate_dataset(event.object_name)
+    return on_changes
+
+_watchers: Dict[str, SchemaWatcher] = {}
+_watchers_lock = threading.Lock()
+# One lock per database and identity, so starting a watcher only blocks callers for the same database
+_start_locks: Dict[str, threading.Lock] = {}
+
+def get_schema_watcher(db, interval: float = SCHEMA_WATCH_INTERVAL) -> SchemaWatcher:
+    """
+    Start (once per database and identity) a watcher that keeps the shared caches fresh
+
+    The watcher opens its own connection so it outlives the session that started it,
+    and stops by itself once the last session using the database is gone.
+    """
+    with _watchers_lock:
+        start_lock = _start_locks.setdefault(db.connection_key, threading.Lock())
+    # Connecting and the first poll run under the per-database lock only, so a slow or hung
+    # server never delays sessions of other databases
+    with start_lock:
+        with _watchers_lock:
+            watcher = _watchers.get(db.connection_key)
+            if watcher is not None and watcher.running:
+                return watcher
+            if watcher is not None:
+                del _watchers[db.connection_key]
+        if watcher is not None:
+            # Its thread died; give back its connection before replacing it
+            watcher.stop()
+            watcher.db.close()
+
+        from .connection import DatabaseConnection
+        own_connection = DatabaseConnection(db.connection_string, db.identity, watch_schema=False)
+        if not own_connection.connect():
+            raise RuntimeError("Schema watcher could not connect to the database")
+        watcher = SchemaWatcher(own_connection, interval)
+        watcher.subscribe(invalidate_caches(watcher))
+        try:
+            watcher.start()
+        except Exception:
+            own_connection.close()
+            raise
+        with _watchers_lock:
+            _watchers[db.connection_key] = watcher
+    return watcher
+
+def _remove_watcher(watcher: SchemaWatcher):
+    """Forget a watcher and give back its connection"""
+    with _watchers_lock:
+        if _watchers.get(watcher.db.connection_key) is watcher:
+            del _watchers[watcher.db.connection_key]
+    watcher.stop()
+    watcher.db.close()
@@ -0,0 +1,87 @@
+from typing import Dict, Optional, Any, Callable, Hashable, Tuple
+import threading
+
+class _Call:
+    """One in-flight execution and the waiters sharing its result"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self):
+        """Coalesce concurrent calls with the same key into a single execution"""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           copy: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, bool]:
+        """
+        Run fn, or wait for an identical call already in flight and share its outcome
+
+        Only calls that overlap in time are coalesced; nothing is cached once the call finishes.
+
+        Args:
+            key: Identity of the call
+            fn: Work to execute
+            copy: When given and the result is shared, every caller gets its own copy,
+                  so one caller mutating its result cannot affect another
+
+        Returns:
+            (result, shared) where shared is True when this caller reused another caller's execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return (copy(call.result) if copy else call.result), True
+
+        result = None
+        try:
+            result = call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later callers start a fresh execution instead of reusing this result
+            with self._lock:
+                self._calls.pop(key, None)
+                waiters = call.waiters
+            # The leader's copy is taken before waiters wake, so the shared original stays pristine;
+            # waiters are released even if the copy fails
+            try:
+                if copy and waiters and call.error is None:
+                    result = copy(call.result)
+            finally:
+                call.done.set()
+        return result, False
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently executing"""
+        with self._lock:
+            return len(self._calls)
+
+def query_key(connection_key: str, query: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    """
+    Key identifying a query: connection identity, SQL text and bound parameters
+
+    Only surrounding whitespace and a trailing semicolon are ignored; whitespace inside the
+    statement may be part of a string literal.
+    """
+    normalized = query.strip().rstrip(";").rstrip()
+    return (connection_key, normalized, tuple(sorted((params or {}).items())))
+
+# Shared by every session so identical queries from different users coalesce
+query_flights = SingleFlight()
@@ -0,0 +1,21 @@
+"""
+Background job package: persistent queue, cron schedules and worker processes.
+"""
+
+from .schedule import CronSchedule
+from .store import JobStore, JOBS_DB_PATH, get_job_store
+from .runner import JobScheduler, JobWorker, JOB_KINDS, DEFAULT_CONCURRENCY, SINGLE_WRITER_KINDS, DEFAULT_SCHEDULES, run_workers
+
+__all__ = [
+    'CronSchedule',
+    'JobStore',
+    'JOBS_DB_PATH',
+    'get_job_store',
+    'JobScheduler',
+    'JobWorker',
+    'JOB_KINDS',
+    'DEFAULT_CONCURRENCY',
+    'SINGLE_WRITER_KINDS',
+    'DEFAULT_SCHEDULES',
+    'run_workers',
+]
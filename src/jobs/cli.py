@@ -0,0 +1,96 @@
+from typing import List, Optional
+import argparse
+import json
+import os
+from .runner import JobScheduler, JOB_KINDS, DEFAULT_CONCURRENCY, SINGLE_WRITER_KINDS, run_workers
+from .schedule import CronSchedule
+from .store import JobStore, JOBS_DB_PATH, JOB_STATUSES
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: python -m src.jobs.cli"""
+    parser = argparse.ArgumentParser(description="Schedule and run background profiling, refresh and re-index jobs")
+    parser.add_argument("--connection-string", default=os.getenv("DU_CONNECTION_STRING"),
+                        help="SQLAlchemy connection string (default: DU_CONNECTION_STRING)")
+    parser.add_argument("--store", default=JOBS_DB_PATH, help="Job store SQLite file (default: DU_JOBS_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the scheduler and worker processes")
+    run_parser.add_argument("--workers", type=int, default=2)
+    run_parser.add_argument("--tick-seconds", type=float, default=30)
+    for kind, cap in DEFAULT_CONCURRENCY.items():
+        if kind in SINGLE_WRITER_KINDS:
+            continue
+        run_parser.add_argument(f"--max-{kind}", type=int, default=cap, help=f"Concurrent {kind} jobs")
+
+    enqueue_parser = commands.add_parser("enqueue", help="Queue a job now")
+    enqueue_parser.add_argument("kind", choices=list(JOB_KINDS))
+    enqueue_parser.add_argument("target", nargs="?", help="Dataset view (default: every dataset, or all due refreshes)")
+    enqueue_parser.add_argument("--strategy", help="Profiling strategy")
+    enqueue_parser.add_argument("--priority", type=int, default=0)
+
+    status_parser = commands.add_parser("status", help="Show queue counts and recent jobs")
+    status_parser.add_argument("--status", choices=JOB_STATUSES)
+    status_parser.add_argument("--limit", type=int, default=20)
+
+    schedule_parser = commands.add_parser("schedule", help="List, set or remove schedules")
+    schedule_parser.add_argument("action", choices=["list", "set", "remove"])
+    schedule_parser.add_argument("name", nargs="?")
+    schedule_parser.add_argument("--kind", choices=list(JOB_KINDS))
+    schedule_parser.add_argument("--cron", help="Five-field cron expression, e.g. '0 2 * * *'")
+    schedule_parser.add_argument("--target", help="Dataset view (default: every dataset)")
+    schedule_parser.add_argument("--max-attempts", type=int, default=3)
+    schedule_parser.add_argument("--disabled", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.connection_string:
+        parser.error("--connection-string or DU_CONNECTION_STRING is required")
+
+    if args.command == "run":
+        concurrency = {kind: getattr(args, f"max_{kind}", cap) for kind, cap in DEFAULT_CONCURRENCY.items()}
+        print(f"Running {args.workers} job workers (store: {args.store})")
+        run_workers(args.connection_string, workers=args.workers, store_path=args.store,
+                    concurrency=concurrency, tick_seconds=args.tick_seconds)
+        return
+
+    from src.database.connection import DatabaseConnection
+
+    store = JobStore(args.store)
+    db = DatabaseConnection(args.connection_string, watch_schema=False)
+    if not db.connect():
+        raise SystemExit("Failed to connect to database")
+    try:
+        if args.command == "enqueue":
+            payload = {"strategy": args.strategy} if args.strategy else {}
+            job_ids = JobScheduler(store, db).enqueue(args.kind, args.target, payload, priority=args.priority)
+            print(f"Queued {len(job_ids)} job(s): {job_ids}")
+
+        elif args.command == "status":
+            print(json.dumps(store.counts(db.connection_key)))
+            for job in store.list_jobs(args.status, args.limit, db.connection_key):
+                error = f"  {job['error']}" if job["error"] else ""
+                print(f"{job['id']:>6}  {job['status']:<10} {job['kind']:<8} {job['target'] or '*':<30} "
+                      f"attempt {job['attempts']}/{job['max_attempts']}  {job['created_at']:%Y-%m-%d %H:%M}{error}")
+
+        elif args.command == "schedule":
+            if args.action == "list":
+                for schedule in store.list_schedules(db.connection_key):
+                    state = "enabled" if schedule["enabled"] else "disabled"
+                    print(f"{schedule['name']:<20} {schedule['kind']:<8} {schedule['cron']:<15} "
+                          f"{schedule['target'] or '*':<30} {state}  last: {schedule['last_enqueued_at']}")
+            elif not args.name:
+                parser.error(f"schedule {args.action} needs a name")
+            elif args.action == "set":
+                if not args.kind or not args.cron:
+                    parser.error("schedule set needs --kind and --cron")
+                CronSchedule(args.cron)  # validate before storing
+                store.set_schedule(db.connection_key, args.name, args.kind, args.cron, target=args.target,
+                                   max_attempts=args.max_attempts, enabled=not args.disabled)
+                print(f"Saved schedule {args.name}")
+            else:
+                removed = store.remove_schedule(db.connection_key, args.name)
+                print(f"Removed schedule {args.name}" if removed else f"No schedule named {args.name}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+from typing import List, Dict, Optional, Any
+from datetime import datetime, timedelta
+import json
+import multiprocessing
+import os
+import socket
+import threading
+from src.database.repository import DatasetRepository
+from src.database.materialization import DatasetMaterializer
+from src.database.lineage import get_lineage_index
+from src.database.compact import COMPACT_FRAMES
+from src.utils.dataset_profiler import DatasetProfiler
+from src.utils.join_parser import JoinParser
+from src.monitoring import instrumentation
+from .schedule import CronSchedule
+from .store import JobStore, JOBS_DB_PATH
+
+# Job kinds the workers know how to run
+JOB_KINDS = {
+    "profile": "Profile a dataset and store the result for the profiling page",
+    "refresh": "Refresh materialized datasets (all that are due, or one)",
+    "reindex": "Re-record a dataset's lineage and vector store metadata",
+}
+
+# Default maximum number of jobs of each kind running at once
+DEFAULT_CONCURRENCY = {"profile": 2, "refresh": 1, "reindex": 1}
+
+# Kinds that always run one at a time across every worker and database. Re-indexing writes
+# to the persistent ChromaDB directory, which is not safe with writers in several processes.
+SINGLE_WRITER_KINDS = ("reindex",)
+
+# Schedules created for a database the first time its workers start.
+# Profiling and re-indexing run off-hours; the refresh check runs hourly and only
+# refreshes datasets whose own refresh schedule has elapsed.
+DEFAULT_SCHEDULES = [
+    {"name": "nightly-profile", "kind": "profile", "cron": "0 1 * * *"},
+    {"name": "nightly-reindex", "kind": "reindex", "cron": "30 0 * * *"},
+    {"name": "hourly-refresh", "kind": "refresh", "cron": "5 * * * *"},
+]
+
+# Kinds that are enqueued once per registered dataset when a schedule has no target
+_PER_DATASET_KINDS = ("profile", "reindex")
+
+def run_job(db, job: Dict[str, Any], store: JobStore) -> Dict[str, Any]:
+    """
+    Execute one job against a connected DatabaseConnection
+
+    Returns:
+        A short JSON-serializable summary of what was done
+    """
+    kind, target, payload = job["kind"], job["target"], job["payload"]
+    repository = DatasetRepository(db)
+    materializer = DatasetMaterializer(db)
+
+    if kind == "profile":
+        dataset = _get_dataset(repository, target)
+        read_source = materializer.read_source(
+            dataset["ViewName"], dataset["MaterializationMode"], dataset["MaterializedName"]
+        )
+        profile = DatasetProfiler.profile_source(db, read_source, strategy=payload.get("strategy"),
+                                                 compact=payload.get("compact", COMPACT_FRAMES))
+        store.save_result("profile", db.connection_key, target, DatasetProfiler.summary(profile), job_id=job["id"])
+        return {"strategy": profile["strategy"], "rows": profile["rows_profiled"]}
+
+    if kind == "refresh":
+        if target is None:
+            return {"refreshed": materializer.refresh_due_datasets()}
+        dataset = _get_dataset(repository, target)
+        duration_ms = materializer.refresh(target, dataset["MaterializationMode"], dataset["MaterializedName"])
+        return {"refreshed": [target], "duration_ms": duration_ms}
+
+    if kind == "reindex":
+        dataset = _get_dataset(repository, target)
+        tables = json.loads(dataset["Tables"]) if dataset["Tables"] else []
+        lineage = get_lineage_index(db).record(target, join_conditions=dataset["JoinConditions"], tables=tables)
+        indexed = _index_vector_store(db, dataset, tables)
+        return {"lineage": lineage, "vector_store": indexed}
+
+    raise ValueError(f"Unknown job kind: {kind}")
+
+def _get_dataset(repository: DatasetRepository, view_name: Optional[str]) -> Dict[str, Any]:
+    if not view_name:
+        raise ValueError("This job kind needs a dataset target")
+    dataset = repository.get_dataset(view_name)
+    if dataset is None:
+        raise ValueError(f"Dataset '{view_name}' does not exist")
+    return dataset
+
+def _job_concurrency(concurrency: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """Per-kind caps with SINGLE_WRITER_KINDS forced to one"""
+    caps = dict(concurrency or DEFAULT_CONCURRENCY)
+    for kind in SINGLE_WRITER_KINDS:
+        if kind in caps:
+            caps[kind] = 1
+    return caps
+
+def _index_vector_store(db, dataset: Dict[str, Any], tables: List[str]) -> bool:
+    """
+    Upsert a dataset's description, table columns and joins into ChromaDB when it is installed
+
+    Only called from reindex jobs, which run one at a time across all workers (SINGLE_WRITER_KINDS).
+    The client is released after each job, so no worker process keeps a stale in-memory
+    index of the store between jobs.
+    """
+    try:
+        from src.vector_store.chroma_manager import ChromaManager
+    except ImportError:
+        return False
+    chroma = ChromaManager()
+    try:
+        name = dataset["DatasetName"]
+        chroma.save_dataset(name, dataset["Description"] or "", tables)
+        for table in tables:
+            chroma.save_table_metadata(name, table, db.get_table_columns(table), f"Table {table} of dataset {name}")
+        joins = JoinParser.parse_join_condition(dataset["JoinConditions"] or "")
+        for join in joins:
+            chroma.save_relationship(name, join["source_table"], join["target_table"], [join])
+    finally:
+        chroma.close()
+    return True
+
+class JobScheduler:
+    def __init__(self, store: JobStore, db):
+        """
+        Enqueue jobs for the schedules of one database when their cron expression fires
+
+        Args:
+            store: Job store holding the schedules and the queue
+            db: Connected DatabaseConnection (used to fan out per-dataset jobs)
+        """
+        self.store = store
+        self.db = db
+
+    def ensure_default_schedules(self):
+        """Create DEFAULT_SCHEDULES for this database if it has no schedules yet"""
+        if self.store.list_schedules(self.db.connection_key):
+            return
+        for schedule in DEFAULT_SCHEDULES:
+            self.store.set_schedule(self.db.connection_key, **schedule)
+
+    def tick(self, now: Optional[datetime] = None) -> List[int]:
+        """Enqueue the jobs of every schedule that fired since it last ran; returns the new job ids"""
+        now = now or datetime.now()
+        job_ids = []
+        for schedule in self.store.list_schedules(self.db.connection_key):
+            if not schedule["enabled"]:
+                continue
+            try:
+                if not CronSchedule(schedule["cron"]).due_since(schedule["last_enqueued_at"], now):
+                    continue
+                job_ids += self.enqueue(schedule["kind"], schedule["target"], schedule["payload"],
+                                        max_attempts=schedule["max_attempts"])
+                self.store.mark_scheduled(self.db.connection_key, schedule["name"], now)
+            except Exception as e:
+                print(f"Error running schedule {schedule['name']}: {str(e)}")
+        return job_ids
+
+    def enqueue(self, kind: str, target: Optional[str] = None, payload: Optional[Dict[str, Any]] = None,
+                priority: int = 0, max_attempts: int = 3) -> List[int]:
+        """Queue a job, or one job per registered dataset for per-dataset kinds without a target"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if target is None and kind in _PER_DATASET_KINDS:
+            targets = DatasetRepository(self.db).list_datasets()["ViewName"].tolist()
+        else:
+            targets = [target]
+        job_ids = []
+        for view_name in targets:
+            job_id = self.store.enqueue(kind, self.db.connection_key, view_name, payload,
+                                        priority=priority, max_attempts=max_attempts)
+            if job_id is not None:
+                job_ids.append(job_id)
+        return job_ids
+
+class JobWorker:
+    def __init__(self, store: JobStore, db, concurrency: Optional[Dict[str, int]] = None,
+                 worker_id: Optional[str] = None, poll_interval: float = 5,
+                 heartbeat_interval: float = 30, retry_delay: float = 60):
+        """
+        Claim and run queued jobs for one database
+
+        Args:
+            store: Job store holding the queue
+            db: Connected DatabaseConnection the jobs run against
+            concurrency: Maximum running jobs per kind across all workers (SINGLE_WRITER_KINDS are always 1)
+            worker_id: Name recorded on claimed jobs
+            poll_interval: Seconds to wait when the queue is empty
+            heartbeat_interval: Seconds between heartbeats while a job runs
+            retry_delay: Base delay before a failed job is retried (doubled per attempt)
+        """
+        self.store = store
+        self.db = db
+        self.concurrency = _job_concurrency(concurrency)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_delay = retry_delay
+
+    def run_once(self) -> Optional[Dict[str, Any]]:
+        """Run the next runnable job, if any; returns the job that ran"""
+        job = self.store.claim(self.worker_id, self.db.connection_key, self.concurrency,
+                               shared_kinds=SINGLE_WRITER_KINDS)
+        if job is None:
+            return None
+
+        done = threading.Event()
+        def heartbeat():
+            while not done.wait(self.heartbeat_interval):
+                self.store.heartbeat(job["id"])
+        threading.Thread(target=heartbeat, name=f"job-{job['id']}-heartbeat", daemon=True).start()
+
+        try:
+            with instrumentation.span("jobs", job["kind"]):
+                job["result"] = run_job(self.db, job, self.store)
+            self.store.complete(job["id"])
+            job["status"] = "succeeded"
+        except Exception as e:
+            print(f"Error running {job['kind']} job {job['id']}: {str(e)}")
+            job["status"] = "queued" if self.store.fail(job["id"], str(e), self.retry_delay) else "failed"
+        finally:
+            done.set()
+        return job
+
+    def run(self, stop: threading.Event):
+        """Process jobs until stop is set"""
+        while not stop.is_set():
+            try:
+                job = self.run_once()
+            except Exception as e:
+                print(f"Error claiming job: {str(e)}")
+                job = None
+            if job is None:
+                stop.wait(self.poll_interval)
+
+def _worker_main(connection_string: str, store_path: str, concurrency: Dict[str, int], stop):
+    """Entry point of a worker process"""
+    from src.database.connection import DatabaseConnection
+
+    db = DatabaseConnection(connection_string, watch_schema=False)
+    if not db.connect():
+        print("Job worker could not connect to the database")
+        return
+    try:
+        JobWorker(JobStore(store_path), db, concurrency).run(stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+def run_workers(connection_string: str, workers: int = 2, store_path: str = JOBS_DB_PATH,
+                concurrency: Optional[Dict[str, int]] = None, tick_seconds: float = 30,
+                stop: Optional[threading.Event] = None):
+    """
+    Run the scheduler in this process and job workers in child processes until stopped
+
+    Profiling is CPU-bound pandas work, so each worker is a separate process with its
+    own database connection. Workers that exit are restarted; finished jobs older than
+    a week are purged.
+
+    Args:
+        connection_string: SQLAlchemy URL of the database the jobs run against
+        workers: Number of worker processes
+        store_path: Job store SQLite file
+        concurrency: Maximum running jobs per kind (SINGLE_WRITER_KINDS are always 1)
+        tick_seconds: Seconds between schedule checks
+        stop: Event that ends the run (Ctrl+C also stops it)
+    """
+    from src.database.connection import DatabaseConnection
+
+    store = JobStore(store_path)
+    db = DatabaseConnection(connection_string, watch_schema=False)
+    if not db.connect():
+        raise RuntimeError("Job scheduler could not connect to the database")
+    scheduler = JobScheduler(store, db)
+    scheduler.ensure_default_schedules()
+
+    context = multiprocessing.get_context("spawn")
+    worker_stop = context.Event()
+    concurrency = _job_concurrency(concurrency)
+    processes: List[multiprocessing.Process] = []
+    stop = stop or threading.Event()
+    try:
+        while not stop.is_set():
+            processes = [process for process in processes if process.is_alive()]
+            while len(processes) < workers:
+                process = context.Process(
+                    target=_worker_main, args=(connection_string, store_path, concurrency, worker_stop),
+                    name=f"job-worker-{len(processes)}", daemon=True
+                )
+                process.start()
+                processes.append(process)
+            scheduler.tick()
+            store.purge(timedelta(days=7))
+            stop.wait(tick_seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker_stop.set()
+        for process in processes:
+            process.join(timeout=60)
+            if process.is_alive():
+                process.terminate()
+        db.close()
@@ -0,0 +1,94 @@
+from typing import Optional, Set
+from datetime import datetime, timedelta
+
+# (name, lowest, highest) of the five cron fields
+_FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 6),
+]
+
+# Shorthands accepted in place of a five-field expression
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+def _parse_field(text: str, name: str, lowest: int, highest: int) -> Set[int]:
+    """Expand one cron field ('*', '5', '1-5', '*/15', '0,30', '9-17/2') into its values"""
+    values = set()
+    for part in text.split(","):
+        base, _, step = part.partition("/")
+        if base == "*":
+            start, end = lowest, highest
+        elif "-" in base:
+            start, end = (int(v) for v in base.split("-", 1))
+        else:
+            start = end = int(base)
+        if step and base != "*" and "-" not in base:
+            end = highest
+        if not lowest <= start <= end <= highest:
+            raise ValueError(f"Invalid {name} in cron expression: {part}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+class CronSchedule:
+    def __init__(self, expression: str):
+        """
+        Five-field cron expression (minute hour day-of-month month day-of-week)
+
+        Supports '*', lists, ranges, steps and the @hourly/@daily/@weekly/@monthly
+        shorthands. Day of week runs from 0 (Sunday) to 6. As in cron, when both
+        day fields are restricted a time matches if either of them does.
+        """
+        self.expression = expression
+        fields = _ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)
+        )
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def matches(self, moment: datetime) -> bool:
+        """Whether the schedule fires in the minute containing moment"""
+        return (moment.minute in self.minutes and moment.hour in self.hours
+                and moment.month in self.months and self._day_matches(moment))
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First minute strictly after moment at which the schedule fires"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skip whole hours and days that cannot match instead of testing every minute
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+    def due_since(self, last_run: Optional[datetime], now: datetime) -> bool:
+        """Whether the schedule fired after last_run and at or before now (first run: fired this minute)"""
+        if last_run is None:
+            return self.matches(now)
+        return self.next_after(last_run) <= now
+
+    def _day_matches(self, moment: datetime) -> bool:
+        # Python counts Monday as 0, cron counts Sunday as 0
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
@@ -0,0 +1,387 @@
+from typing import List, Dict, Optional, Any, Iterable, Sequence
+from datetime import datetime, timedelta
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# Local SQLite file holding the job queue, schedules and precomputed results
+JOBS_DB_PATH = os.getenv("DU_JOBS_DB", "./job_queue/jobs.sqlite")
+
+# Running jobs whose worker has not sent a heartbeat for this long are considered lost
+STALE_JOB_SECONDS = 300
+
+JOB_STATUSES = ["queued", "running", "succeeded", "failed", "cancelled"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    connection_key TEXT NOT NULL,
+    target TEXT,
+    payload TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS IX_jobs_claim ON jobs (status, connection_key, run_after);
+
+CREATE TABLE IF NOT EXISTS job_schedules (
+    connection_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    cron TEXT NOT NULL,
+    target TEXT,
+    payload TEXT NOT NULL DEFAULT '{}',
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    last_enqueued_at REAL,
+    PRIMARY KEY (connection_key, name)
+);
+
+CREATE TABLE IF NOT EXISTS job_results (
+    kind TEXT NOT NULL,
+    connection_key TEXT NOT NULL,
+    target TEXT NOT NULL,
+    job_id INTEGER,
+    computed_at REAL NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (kind, connection_key, target)
+);
+"""
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"] or "{}")
+    for column in ("run_after", "created_at", "started_at", "heartbeat_at", "finished_at"):
+        if job[column] is not None:
+            job[column] = datetime.fromtimestamp(job[column])
+    return job
+
+class JobStore:
+    def __init__(self, path: str = JOBS_DB_PATH):
+        """
+        Persistent job queue, schedules and job results in a local SQLite file
+
+        Safe to share between threads and worker processes: every call opens its own
+        connection, the file runs in WAL mode and jobs are claimed in an immediate
+        transaction, so two workers never run the same job.
+
+        Args:
+            path: SQLite file (created with its directory if missing)
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+
+    def _connect(self) -> "_ClosingConnection":
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return _ClosingConnection(connection)
+
+    def enqueue(self, kind: str, connection_key: str, target: Optional[str] = None,
+                payload: Optional[Dict[str, Any]] = None, priority: int = 0, max_attempts: int = 3,
+                run_after: Optional[datetime] = None) -> Optional[int]:
+        """
+        Queue a job unless the same job is already queued or running
+
+        Args:
+            kind: Job kind, e.g. 'profile'
+            connection_key: Database the job runs against (DatabaseConnection.connection_key)
+            target: Dataset view the job is about, or None for database-wide jobs
+            payload: JSON-serializable job options
+            priority: Higher runs first
+            max_attempts: Attempts before the job is marked failed
+            run_after: Earliest start time (default: now)
+
+        Returns:
+            The new job id, or None when an identical job was already pending
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            pending = connection.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND connection_key = ? AND target IS ? "
+                "AND status IN ('queued', 'running')",
+                (kind, connection_key, target)
+            ).fetchone()
+            if pending is not None:
+                connection.execute("COMMIT")
+                return None
+            cursor = connection.execute(
+                "INSERT INTO jobs (kind, connection_key, target, payload, priority, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, connection_key, target, json.dumps(payload or {}), priority, max_attempts,
+                 run_after.timestamp() if run_after else now, now)
+            )
+            connection.execute("COMMIT")
+            return cursor.lastrowid
+
+    def claim(self, worker: str, connection_key: str, concurrency: Dict[str, int],
+              shared_kinds: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the next runnable job, respecting per-kind concurrency caps
+
+        Jobs left running by a lost worker are first put back in the queue (or failed
+        when out of attempts).
+
+        Args:
+            worker: Identifier of the claiming worker
+            connection_key: Only jobs for this database are claimed
+            concurrency: Maximum running jobs per kind; kinds missing from it are not claimed
+            shared_kinds: Kinds whose cap counts running jobs of every database, not just this one
+
+        Returns:
+            The claimed job, or None when nothing is runnable
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            self._recover_stale(connection, now)
+            running = dict(connection.execute(
+                "SELECT kind, COUNT(*) FROM jobs WHERE status = 'running' AND connection_key = ? GROUP BY kind",
+                (connection_key,)
+            ).fetchall())
+            if shared_kinds:
+                running.update(connection.execute(
+                    f"SELECT kind, COUNT(*) FROM jobs WHERE status = 'running' "
+                    f"AND kind IN ({', '.join('?' for _ in shared_kinds)}) GROUP BY kind",
+                    tuple(shared_kinds)
+                ).fetchall())
+            kinds = [kind for kind, cap in concurrency.items() if running.get(kind, 0) < cap]
+            if not kinds:
+                connection.execute("COMMIT")
+                return None
+            row = connection.execute(
+                f"SELECT * FROM jobs WHERE status = 'queued' AND connection_key = ? AND run_after <= ? "
+                f"AND kind IN ({', '.join('?' for _ in kinds)}) "
+                f"ORDER BY priority DESC, run_after, id LIMIT 1",
+                (connection_key, now, *kinds)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                "heartbeat_at = ?, worker = ?, error = NULL WHERE id = ?",
+                (now, now, worker, row["id"])
+            )
+            job = connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            connection.execute("COMMIT")
+            return _row_to_job(job)
+
+    def heartbeat(self, job_id: int):
+        """Mark a running job as still alive"""
+        with self._connect() as connection:
+            connection.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'",
+                               (time.time(), job_id))
+
+    def complete(self, job_id: int):
+        """Mark a running job as succeeded"""
+        with self._connect() as connection:
+            connection.execute("UPDATE jobs SET status = 'succeeded', finished_at = ? WHERE id = ?",
+                               (time.time(), job_id))
+
+    def fail(self, job_id: int, error: str, retry_delay: float = 60) -> bool:
+        """
+        Record a failed attempt, retrying with exponential backoff while attempts remain
+
+        Returns:
+            True when the job was queued for another attempt
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            retry = row is not None and row["attempts"] < row["max_attempts"]
+            if retry:
+                connection.execute(
+                    "UPDATE jobs SET status = 'queued', run_after = ?, worker = NULL, error = ? WHERE id = ?",
+                    (now + retry_delay * 2 ** (row["attempts"] - 1), error, job_id)
+                )
+            else:
+                connection.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                    (now, error, job_id)
+                )
+            connection.execute("COMMIT")
+        return retry
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started yet"""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            return cursor.rowcount > 0
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100,
+                  connection_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent jobs, optionally with one status or for one database"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM jobs WHERE (? IS NULL OR status = ?) AND (? IS NULL OR connection_key = ?) "
+                "ORDER BY id DESC LIMIT ?",
+                (status, status, connection_key, connection_key, limit)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def counts(self, connection_key: Optional[str] = None) -> Dict[str, int]:
+        """Number of jobs per status, optionally for one database"""
+        with self._connect() as connection:
+            counts = dict(connection.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE ? IS NULL OR connection_key = ? GROUP BY status",
+                (connection_key, connection_key)
+            ).fetchall())
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
+
+    def purge(self, older_than: timedelta = timedelta(days=7)) -> int:
+        """Delete finished jobs older than the given age; returns how many were deleted"""
+        cutoff = time.time() - older_than.total_seconds()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?",
+                (cutoff,)
+            )
+            return cursor.rowcount
+
+    def set_schedule(self, connection_key: str, name: str, kind: str, cron: str, target: Optional[str] = None,
+                     payload: Optional[Dict[str, Any]] = None, max_attempts: int = 3, enabled: bool = True):
+        """Create or replace a named schedule"""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO job_schedules (connection_key, name, kind, cron, target, payload, max_attempts, enabled) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (connection_key, name) DO UPDATE SET kind = excluded.kind, cron = excluded.cron, "
+                "target = excluded.target, payload = excluded.payload, max_attempts = excluded.max_attempts, "
+                "enabled = excluded.enabled",
+                (connection_key, name, kind, cron, target, json.dumps(payload or {}), max_attempts, int(enabled))
+            )
+
+    def remove_schedule(self, connection_key: str, name: str) -> bool:
+        """Delete a named schedule"""
+        with self._connect() as connection:
+            cursor = connection.execute("DELETE FROM job_schedules WHERE connection_key = ? AND name = ?",
+                                        (connection_key, name))
+            return cursor.rowcount > 0
+
+    def list_schedules(self, connection_key: str) -> List[Dict[str, Any]]:
+        """Schedules of one database"""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT * FROM job_schedules WHERE connection_key = ? ORDER BY name",
+                                      (connection_key,)).fetchall()
+        schedules = []
+        for row in rows:
+            schedule = dict(row)
+            schedule["payload"] = json.loads(schedule["payload"] or "{}")
+            schedule["enabled"] = bool(schedule["enabled"])
+            if schedule["last_enqueued_at"] is not None:
+                schedule["last_enqueued_at"] = datetime.fromtimestamp(schedule["last_enqueued_at"])
+            schedules.append(schedule)
+        return schedules
+
+    def mark_scheduled(self, connection_key: str, name: str, at: datetime):
+        """Record when a schedule last enqueued its jobs"""
+        with self._connect() as connection:
+            connection.execute("UPDATE job_schedules SET last_enqueued_at = ? WHERE connection_key = ? AND name = ?",
+                               (at.timestamp(), connection_key, name))
+
+    def save_result(self, kind: str, connection_key: str, target: str, value: Any, job_id: Optional[int] = None):
+        """
+        Store the latest result of a job, replacing the previous one
+
+        Values are pickled so DataFrames keep their dtypes and index; the file is
+        local and only written by this application's workers.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO job_results (kind, connection_key, target, job_id, computed_at, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, connection_key, target, job_id, time.time(), pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            )
+
+    def get_result(self, kind: str, connection_key: str, target: str,
+                   max_age: Optional[timedelta] = None) -> Optional[Dict[str, Any]]:
+        """
+        Latest stored result of a job
+
+        Returns:
+            {'value', 'computed_at', 'job_id'}, or None when missing or older than max_age
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT job_id, computed_at, value FROM job_results WHERE kind = ? AND connection_key = ? AND target = ?",
+                (kind, connection_key, target)
+            ).fetchone()
+        if row is None:
+            return None
+        if max_age is not None and time.time() - row["computed_at"] > max_age.total_seconds():
+            return None
+        return {
+            "value": pickle.loads(row["value"]),
+            "computed_at": datetime.fromtimestamp(row["computed_at"]),
+            "job_id": row["job_id"],
+        }
+
+    def delete_results(self, connection_key: str, target: str, kinds: Iterable[str] = ("profile",)):
+        """Drop stored results for a dataset, e.g. after its definition changed"""
+        kinds = list(kinds)
+        with self._connect() as connection:
+            connection.execute(
+                f"DELETE FROM job_results WHERE connection_key = ? AND target = ? "
+                f"AND kind IN ({', '.join('?' for _ in kinds)})",
+                (connection_key, target, *kinds)
+            )
+
+    @staticmethod
+    def _recover_stale(connection: sqlite3.Connection, now: float):
+        """Requeue (or fail, when out of attempts) running jobs whose worker stopped sending heartbeats"""
+        cutoff = now - STALE_JOB_SECONDS
+        connection.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = 'Worker lost' "
+            "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= max_attempts",
+            (now, cutoff)
+        )
+        connection.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, error = 'Worker lost' "
+            "WHERE status = 'running' AND heartbeat_at < ?",
+            (cutoff,)
+        )
+
+class _ClosingConnection:
+    """sqlite3 connection used as a context manager that closes (rather than commits) on exit"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None and self._connection.in_transaction:
+            self._connection.execute("ROLLBACK")
+        self._connection.close()
+
+_default_store: Optional[JobStore] = None
+_default_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """Process-wide job store at JOBS_DB_PATH"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = JobStore()
+        return _default_store
@@ -0,0 +1,31 @@
+"""
+Performance instrumentation package: timing spans, hooks and metrics.
+"""
+
+from .instrumentation import (
+    instrumentation,
+    Instrumentation,
+    LoggingHook,
+    PrometheusHook,
+    OpenTelemetryHook,
+    configure_hooks,
+    instrumented,
+    annotate,
+    page_context,
+    track_page,
+    instrument_engine,
+)
+
+__all__ = [
+    'instrumentation',
+    'Instrumentation',
+    'LoggingHook',
+    'PrometheusHook',
+    'OpenTelemetryHook',
+    'configure_hooks',
+    'instrumented',
+    'annotate',
+    'page_context',
+    'track_page',
+    'instrument_engine',
+]
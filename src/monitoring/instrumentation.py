@@ -0,0 +1,422 @@
+from sqlalchemy import event
+from typing import List, Dict, Optional, Any, Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from datetime import datetime
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+import pandas as pd
+
+# Latency buckets (seconds) for the Prometheus duration histogram
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SPAN_FIELDS = ["started_at", "page", "component", "operation", "duration_ms", "rows", "bytes",
+               "pool_wait_ms", "cache", "status", "error", "statement"]
+
+# Page currently rendering in this thread (Streamlit runs each session in its own thread)
+_current_page: ContextVar[Optional[str]] = ContextVar("du_current_page", default=None)
+_current_span: ContextVar[Optional[Dict[str, Any]]] = ContextVar("du_current_span", default=None)
+
+class LoggingHook:
+    def __init__(self, logger: Optional[logging.Logger] = None, slow_ms: Optional[float] = None):
+        """
+        Log finished spans
+
+        Args:
+            logger: Logger to write to (defaults to 'dataset_understanding.perf')
+            slow_ms: Only log spans at least this slow; errors are always logged
+        """
+        self.logger = logger or logging.getLogger("dataset_understanding.perf")
+        self.slow_ms = slow_ms
+
+    def __call__(self, span: Dict[str, Any]):
+        if span["status"] != "ok":
+            self.logger.warning("%s.%s failed after %.1f ms: %s", span["component"], span["operation"],
+                                span["duration_ms"], span["error"])
+        elif self.slow_ms is None or span["duration_ms"] >= self.slow_ms:
+            self.logger.info("%s.%s %.1f ms rows=%s bytes=%s pool_wait_ms=%s cache=%s page=%s",
+                             span["component"], span["operation"], span["duration_ms"], span["rows"],
+                             span["bytes"], span["pool_wait_ms"], span["cache"], span["page"])
+
+class PrometheusHook:
+    def __init__(self, namespace: str = "du"):
+        """Aggregate spans into counters and histograms rendered in Prometheus text exposition format"""
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counts: Dict[tuple, int] = {}
+        self._durations: Dict[tuple, List[float]] = {}
+        self._sums: Dict[tuple, float] = {}
+        self._rows: Dict[tuple, int] = {}
+        self._bytes: Dict[tuple, int] = {}
+        self._pool_wait: Dict[tuple, float] = {}
+        self._cache: Dict[tuple, int] = {}
+
+    def __call__(self, span: Dict[str, Any]):
+        key = (span["component"], span["operation"])
+        seconds = span["duration_ms"] / 1000
+        with self._lock:
+            status_key = key + (span["status"],)
+            self._counts[status_key] = self._counts.get(status_key, 0) + 1
+            buckets = self._durations.setdefault(key, [0] * len(DURATION_BUCKETS))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + seconds
+            if span["rows"] is not None:
+                self._rows[key] = self._rows.get(key, 0) + span["rows"]
+            if span["bytes"] is not None:
+                self._bytes[key] = self._bytes.get(key, 0) + span["bytes"]
+            if span["pool_wait_ms"] is not None:
+                self._pool_wait[key] = self._pool_wait.get(key, 0.0) + span["pool_wait_ms"] / 1000
+            if span["cache"] is not None:
+                cache_key = (span["component"], span["cache"])
+                self._cache[cache_key] = self._cache.get(cache_key, 0) + 1
+
+    def exposition(self) -> str:
+        """Render all metrics in Prometheus text format"""
+        ns = self.namespace
+        lines = []
+
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in values.items()) + "}"
+
+        with self._lock:
+            lines += [f"# HELP {ns}_operations_total Instrumented calls by outcome",
+                      f"# TYPE {ns}_operations_total counter"]
+            for (component, operation, status), count in sorted(self._counts.items()):
+                lines.append(f"{ns}_operations_total{labels(component=component, operation=operation, status=status)} {count}")
+
+            lines += [f"# HELP {ns}_operation_duration_seconds Wall-clock duration of instrumented calls",
+                      f"# TYPE {ns}_operation_duration_seconds histogram"]
+            for (component, operation), buckets in sorted(self._durations.items()):
+                total = sum(c for (comp, op, _), c in self._counts.items() if (comp, op) == (component, operation))
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f"{ns}_operation_duration_seconds_bucket"
+                                 f"{labels(component=component, operation=operation, le=bound)} {count}")
+                lines.append(f"{ns}_operation_duration_seconds_bucket"
+                             f"{labels(component=component, operation=operation, le='+Inf')} {total}")
+                lines.append(f"{ns}_operation_duration_seconds_sum"
+                             f"{labels(component=component, operation=operation)} {self._sums[(component, operation)]:.6f}")
+                lines.append(f"{ns}_operation_duration_seconds_count"
+                             f"{labels(component=component, operation=operation)} {total}")
+
+            for name, help_text, values in [
+                ("rows_total", "Rows returned by instrumented calls", self._rows),
+                ("bytes_total", "Approximate bytes fetched by instrumented calls", self._bytes),
+                ("pool_wait_seconds_total", "Time spent acquiring pooled connections", self._pool_wait),
+            ]:
+                lines += [f"# HELP {ns}_{name} {help_text}", f"# TYPE {ns}_{name} counter"]
+                for (component, operation), value in sorted(values.items()):
+                    lines.append(f"{ns}_{name}{labels(component=component, operation=operation)} {value}")
+
+            lines += [f"# HELP {ns}_cache_requests_total Cache lookups by result",
+                      f"# TYPE {ns}_cache_requests_total counter"]
+            for (component, result), count in sorted(self._cache.items()):
+                lines.append(f"{ns}_cache_requests_total{labels(component=component, result=result)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop all aggregated metrics"""
+        with self._lock:
+            for values in (self._counts, self._durations, self._sums, self._rows,
+                           self._bytes, self._pool_wait, self._cache):
+                values.clear()
+
+class OpenTelemetryHook:
+    def __init__(self, tracer=None):
+        """
+        Export finished spans through the OpenTelemetry API
+
+        Args:
+            tracer: OpenTelemetry tracer (defaults to the global tracer provider's tracer)
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("The OpenTelemetry hook requires opentelemetry-api. Install it with: pip install opentelemetry-api")
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("dataset_understanding")
+
+    def __call__(self, span: Dict[str, Any]):
+        end_ns = span["_end_ns"]
+        otel_span = self.tracer.start_span(
+            f"{span['component']}.{span['operation']}",
+            start_time=end_ns - int(span["duration_ms"] * 1_000_000),
+            attributes={
+                f"du.{field}": span[field]
+                for field in ("page", "rows", "bytes", "pool_wait_ms", "cache", "statement")
+                if span[field] is not None
+            }
+        )
+        if span["status"] != "ok":
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span["error"]))
+        otel_span.end(end_time=end_ns)
+
+def _escape_label(value: Any) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Instrumentation:
+    def __init__(self, buffer_size: int = 5000):
+        """
+        Collect timing spans from instrumented calls and fan them out to hooks
+
+        Args:
+            buffer_size: Number of recent spans kept in memory for the performance page
+        """
+        self._spans = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self.hooks: List[Callable[[Dict[str, Any]], None]] = []
+        self.enabled = True
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """Register a callable that receives every finished span"""
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """Unregister a hook"""
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def get_hook(self, hook_type: type):
+        """Return the first registered hook of the given type, if any"""
+        return next((hook for hook in self.hooks if isinstance(hook, hook_type)), None)
+
+    @contextmanager
+    def span(self, component: str, operation: str, activate: bool = True, **fields):
+        """
+        Time a block of work
+
+        The yielded dict can be annotated with rows, bytes, pool_wait_ms, cache and statement.
+        With activate=False the span is not visible to annotate(), which generators need
+        because they suspend while their span is open.
+        """
+        if not self.enabled:
+            yield dict.fromkeys(SPAN_FIELDS)
+            return
+
+        span = dict.fromkeys(SPAN_FIELDS)
+        span.update(component=component, operation=operation, page=_current_page.get(), status="ok", **fields)
+        token = _current_span.set(span) if activate else None
+        span["started_at"] = datetime.now()
+        started = time.perf_counter()
+        try:
+            yield span
+        # Control-flow exceptions (GeneratorExit, Streamlit reruns) derive from BaseException and are not failures
+        except Exception as e:
+            span["status"] = "error"
+            span["error"] = str(e)[:500]
+            raise
+        finally:
+            span["duration_ms"] = (time.perf_counter() - started) * 1000
+            span["_end_ns"] = time.time_ns()
+            if token is not None:
+                _current_span.reset(token)
+            self.record(span)
+
+    def record(self, span: Dict[str, Any]):
+        """Store a finished span and pass it to every hook"""
+        with self._lock:
+            self._spans.append(span)
+        for hook in list(self.hooks):
+            try:
+                hook(span)
+            except Exception as e:
+                print(f"Error in instrumentation hook: {str(e)}")
+
+    def recent(self) -> pd.DataFrame:
+        """Recent spans, oldest first"""
+        with self._lock:
+            spans = list(self._spans)
+        return pd.DataFrame(spans, columns=SPAN_FIELDS)
+
+    def slowest(self, limit: int = 20, component: Optional[str] = None) -> pd.DataFrame:
+        """Slowest recent spans, optionally for one component"""
+        spans = self.recent()
+        if component:
+            spans = spans[spans["component"] == component]
+        return spans.nlargest(limit, "duration_ms")
+
+    def summary(self, by: Optional[List[str]] = None) -> pd.DataFrame:
+        """Latency percentiles and totals of recent spans grouped by the given columns"""
+        by = by or ["component", "operation"]
+        spans = self.recent()
+        if spans.empty:
+            return pd.DataFrame(columns=by + ["calls", "errors", "p50_ms", "p95_ms", "max_ms",
+                                              "total_ms", "rows", "bytes", "pool_wait_ms"])
+        spans["page"] = spans["page"].fillna("(none)")
+        grouped = spans.groupby(by, dropna=False)
+        result = grouped["duration_ms"].agg(
+            calls="count",
+            p50_ms=lambda d: d.quantile(0.5),
+            p95_ms=lambda d: d.quantile(0.95),
+            max_ms="max",
+            total_ms="sum",
+        )
+        result.insert(1, "errors", grouped["status"].agg(lambda s: int((s != "ok").sum())))
+        result["rows"] = grouped["rows"].sum(min_count=1)
+        result["bytes"] = grouped["bytes"].sum(min_count=1)
+        result["pool_wait_ms"] = grouped["pool_wait_ms"].sum(min_count=1)
+        return result.reset_index().sort_values("total_ms", ascending=False)
+
+    def cache_summary(self) -> pd.DataFrame:
+        """Cache hit and miss counts per component"""
+        spans = self.recent().dropna(subset=["cache"])
+        if spans.empty:
+            return pd.DataFrame(columns=["component", "hit", "miss", "hit_rate"])
+        counts = spans.pivot_table(index="component", columns="cache", values="operation",
+                                   aggfunc="count", fill_value=0)
+        for result in ("hit", "miss"):
+            if result not in counts:
+                counts[result] = 0
+        counts["hit_rate"] = counts["hit"] / (counts["hit"] + counts["miss"])
+        return counts[["hit", "miss", "hit_rate"]].reset_index()
+
+    def clear(self):
+        """Drop recent spans and any aggregated hook metrics"""
+        with self._lock:
+            self._spans.clear()
+        for hook in self.hooks:
+            if hasattr(hook, "reset"):
+                hook.reset()
+
+# Process-wide instrumentation shared by all sessions
+instrumentation = Instrumentation()
+
+def configure_hooks(names: Optional[str] = None):
+    """
+    Register hooks by name from a comma-separated list (default: DU_INSTRUMENTATION_HOOKS or 'prometheus')
+
+    Supported names are 'log', 'prometheus' and 'otel'.
+    """
+    names = names if names is not None else os.getenv("DU_INSTRUMENTATION_HOOKS", "prometheus")
+    for name in filter(None, (n.strip().lower() for n in names.split(","))):
+        if name == "log" and not instrumentation.get_hook(LoggingHook):
+            slow_ms = os.getenv("DU_SLOW_QUERY_MS")
+            instrumentation.add_hook(LoggingHook(slow_ms=float(slow_ms) if slow_ms else None))
+        elif name == "prometheus" and not instrumentation.get_hook(PrometheusHook):
+            instrumentation.add_hook(PrometheusHook())
+        elif name == "otel" and not instrumentation.get_hook(OpenTelemetryHook):
+            try:
+                instrumentation.add_hook(OpenTelemetryHook())
+            except ImportError as e:
+                print(f"Error enabling OpenTelemetry hook: {str(e)}")
+
+configure_hooks()
+
+def annotate(**fields):
+    """Attach rows, bytes, pool_wait_ms, cache or statement to the innermost active span"""
+    span = _current_span.get()
+    if span is not None:
+        span.update(fields)
+
+def _annotate_result(span: Dict[str, Any], result: Any):
+    """Fill rows and bytes from a DataFrame or sized result unless the call already did"""
+    if result is None or span.get("rows") is not None:
+        return
+    if isinstance(result, pd.DataFrame):
+        span["rows"] = len(result)
+        span["bytes"] = int(result.memory_usage(index=False).sum())
+    elif isinstance(result, (list, dict)):
+        span["rows"] = len(result)
+
+def instrumented(component: str, operation: Optional[str] = None):
+    """
+    Decorator that records a span for every call of a function or method
+
+    Generator functions are timed across the whole iteration, with rows and bytes summed over yielded DataFrames.
+    """
+    def decorator(func):
+        name = operation or func.__name__
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                with instrumentation.span(component, name, activate=False) as span:
+                    span["rows"], span["bytes"] = 0, 0
+                    for item in func(*args, **kwargs):
+                        if isinstance(item, pd.DataFrame):
+                            span["rows"] += len(item)
+                            span["bytes"] += int(item.memory_usage(index=False).sum())
+                        yield item
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with instrumentation.span(component, name) as span:
+                result = func(*args, **kwargs)
+                _annotate_result(span, result)
+                return result
+        return wrapper
+    return decorator
+
+@contextmanager
+def page_context(page: str):
+    """Attribute every span recorded in this block to a page and time the whole render"""
+    token = _current_page.set(page)
+    try:
+        with instrumentation.span("page", "render"):
+            yield
+    finally:
+        _current_page.reset(token)
+
+def track_page(page: str):
+    """Decorator form of page_context for a Streamlit page's main()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with page_context(page):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("du_query_start", []).append(time.perf_counter())
+
+def _record_statement(conn, statement: str, executemany: bool, rows: Optional[int] = None,
+                      error: Optional[BaseException] = None):
+    """Record a 'sql' span for a statement whose start time was pushed by _before_cursor_execute"""
+    starts = conn.info.get("du_query_start")
+    if not starts:
+        return
+    started = starts.pop()
+    if not instrumentation.enabled:
+        return
+    span = dict.fromkeys(SPAN_FIELDS)
+    span.update(
+        started_at=datetime.now(),
+        page=_current_page.get(),
+        component="sql",
+        operation="executemany" if executemany else "execute",
+        duration_ms=(time.perf_counter() - started) * 1000,
+        rows=rows if rows is not None and rows >= 0 else None,
+        status="ok" if error is None else "error",
+        error=str(error)[:500] if error is not None else None,
+        statement=" ".join(statement.split())[:2000],
+        _end_ns=time.time_ns(),
+    )
+    instrumentation.record(span)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(conn, statement, executemany, rows=cursor.rowcount)
+
+def _handle_error(exception_context):
+    if exception_context.connection is not None and exception_context.statement is not None:
+        _record_statement(exception_context.connection, exception_context.statement,
+                          bool(exception_context.execution_context and exception_context.execution_context.executemany),
+                          error=exception_context.original_exception)
+
+def instrument_engine(engine):
+    """Record a 'sql' span for every statement executed through an engine"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
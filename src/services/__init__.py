@@ -0,0 +1,7 @@
+"""
+Headless service layer: dataset flows shared by the UI, the command line and the HTTP API.
+"""
+
+from .dataset_service import DatasetService, DatasetNotFoundError, DEFAULT_PREVIEW_ROWS
+
+__all__ = ['DatasetService', 'DatasetNotFoundError', 'DEFAULT_PREVIEW_ROWS']
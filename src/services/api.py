@@ -0,0 +1,249 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from urllib.parse import urlparse, parse_qs, unquote
+import hmac
+import json
+import os
+import queue
+import threading
+from src.monitoring import instrumentation, PrometheusHook, page_context
+from .dataset_service import DatasetService, DatasetNotFoundError, DEFAULT_PREVIEW_ROWS
+from .serialization import to_json, to_arrow_stream, ARROW_STREAM_MEDIA_TYPE
+
+# Request bodies larger than this are rejected
+MAX_REQUEST_BYTES = 1024 * 1024
+
+class QueueFullError(RuntimeError):
+    """Raised when the request queue has no room for more work"""
+
+class WorkerPool:
+    def __init__(self, workers: int = 4, queue_size: int = 100):
+        """
+        Fixed set of worker threads fed from a bounded request queue
+
+        Bounding the queue applies backpressure: once it is full, new requests are
+        rejected immediately instead of piling up behind slow database work.
+
+        Args:
+            workers: Requests processed concurrently
+            queue_size: Requests allowed to wait for a worker
+        """
+        self.workers = workers
+        self._queue: "queue.Queue[Optional[Tuple[Callable[[], Any], Future]]]" = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"api-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[[], Any]) -> Future:
+        """Queue work for a worker; raises QueueFullError when the queue is full"""
+        future = Future()
+        try:
+            self._queue.put_nowait((fn, future))
+        except queue.Full:
+            raise QueueFullError("Request queue is full")
+        return future
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self):
+        """Stop the workers once the queued requests are done"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            fn, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+class _Response:
+    """Status, body and content type produced by a route"""
+
+    def __init__(self, body: bytes, status: int = 200, content_type: str = "application/json"):
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+
+class DatasetAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service: DatasetService, host: str = "127.0.0.1", port: int = 8765,
+                 workers: int = 4, queue_size: int = 100, request_timeout: float = 300,
+                 token: Optional[str] = None):
+        """
+        Local HTTP API over a DatasetService
+
+        Connections are accepted on their own threads, but the work is executed by a
+        fixed worker pool, so database load is bounded by the number of workers.
+
+        Routes:
+            GET  /health                       worker and queue status
+            GET  /metrics                      Prometheus exposition of the instrumentation
+            GET  /datasets                     registered datasets
+            POST /datasets                     create a dataset (JSON body, see DatasetService.create_dataset)
+            GET  /datasets/<view>              one dataset
+            GET  /datasets/<view>/preview      first rows (?limit=)
+            GET  /datasets/<view>/profile      profile (?strategy=, ?fresh=1, ?section= for Arrow responses)
+
+        Tabular results are returned as Arrow IPC streams when the request accepts
+        application/vnd.apache.arrow.stream, and as JSON otherwise.
+
+        Args:
+            service: DatasetService bound to a connected database
+            host: Interface to listen on
+            port: Port to listen on
+            workers: Requests processed concurrently
+            queue_size: Requests allowed to wait for a worker before 503 is returned
+            request_timeout: Seconds a request may wait for its result before 504 is returned
+            token: Bearer token required on every request except /health (None for no auth)
+        """
+        super().__init__((host, port), _DatasetAPIHandler)
+        self.service = service
+        self.pool = WorkerPool(workers, queue_size)
+        self.request_timeout = request_timeout
+        self.token = token
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Optional[Dict[str, Any]],
+              accept: str) -> _Response:
+        """Dispatch a request to the service (runs on a worker thread)"""
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+        arrow = ARROW_STREAM_MEDIA_TYPE in accept
+
+        if parts == ["health"]:
+            return _Response(to_json({"status": "ok", "workers": self.pool.workers, "queued": self.pool.queued}))
+        if parts == ["metrics"]:
+            hook = instrumentation.get_hook(PrometheusHook)
+            exposition = hook.exposition() if hook else ""
+            return _Response(exposition.encode("utf-8"), content_type="text/plain; version=0.0.4")
+        if parts == ["datasets"] and method == "GET":
+            return self._table(self.service.list_datasets(), arrow)
+        if parts == ["datasets"] and method == "POST":
+            if not body or "dataset_name" not in body:
+                raise ValueError("Request body must be a JSON object with at least dataset_name and tables")
+            return _Response(to_json(self.service.create_dataset(**body)), status=201)
+        if len(parts) == 2 and parts[0] == "datasets" and method == "GET":
+            return _Response(to_json(self.service.get_dataset(parts[1])))
+        if len(parts) == 3 and parts[0] == "datasets" and method == "GET":
+            view_name, action = parts[1], parts[2]
+            if action == "preview":
+                limit = int(_param(query, "limit", DEFAULT_PREVIEW_ROWS))
+                return self._table(self.service.preview(view_name, limit), arrow)
+            if action == "profile":
+                profile = self.service.profile(view_name, strategy=_param(query, "strategy"),
+                                               use_precomputed=_param(query, "fresh") not in ("1", "true"))
+                section = _param(query, "section")
+                if section is not None:
+                    if section not in profile or section in ("strategy", "estimate", "computed_at", "rows_profiled"):
+                        raise ValueError(f"Unknown profile section: {section}")
+                    return self._table(profile[section], arrow)
+                if arrow:
+                    return self._table(profile["columns"], arrow)
+                # Profiles do not carry the profiled rows; use the preview route for data
+                return _Response(to_json(profile))
+        return _Response(to_json({"error": f"No route for {method} {path}"}), status=404)
+
+    @staticmethod
+    def _table(df, arrow: bool) -> _Response:
+        if df is None:
+            return _Response(to_json({"error": "Query returned no result"}), status=500)
+        if arrow:
+            return _Response(to_arrow_stream(df), content_type=ARROW_STREAM_MEDIA_TYPE)
+        return _Response(to_json(df))
+
+def _param(query: Dict[str, List[str]], name: str, default: Any = None) -> Any:
+    values = query.get(name)
+    return values[0] if values else default
+
+class _DatasetAPIHandler(BaseHTTPRequestHandler):
+    server: DatasetAPIServer
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method: str):
+        url = urlparse(self.path)
+        if url.path != "/health" and not self._authorized():
+            self._send(_Response(to_json({"error": "Unauthorized"}), status=401))
+            return
+
+        try:
+            body = self._read_body() if method == "POST" else None
+        except ValueError as e:
+            self._send(_Response(to_json({"error": str(e)}), status=400))
+            return
+
+        accept = self.headers.get("Accept", "")
+        query = parse_qs(url.query)
+
+        def work():
+            with page_context(f"API {method} {url.path}"):
+                return self.server.route(method, url.path, query, body, accept)
+
+        try:
+            response = self.server.pool.submit(work).result(timeout=self.server.request_timeout)
+        except QueueFullError as e:
+            response = _Response(to_json({"error": str(e)}), status=503)
+        except FutureTimeoutError:
+            response = _Response(to_json({"error": "Request timed out"}), status=504)
+        except DatasetNotFoundError as e:
+            response = _Response(to_json({"error": str(e)}), status=404)
+        except (ValueError, TypeError) as e:
+            response = _Response(to_json({"error": str(e)}), status=400)
+        except Exception as e:
+            print(f"Error handling {method} {self.path}: {str(e)}")
+            response = _Response(to_json({"error": str(e)}), status=500)
+        self._send(response)
+
+    def _authorized(self) -> bool:
+        if not self.server.token:
+            return True
+        expected = f"Bearer {self.server.token}"
+        return hmac.compare_digest(self.headers.get("Authorization", ""), expected)
+
+    def _read_body(self) -> Optional[Dict[str, Any]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            raise ValueError("Request body too large")
+        if not length:
+            return None
+        try:
+            body = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {str(e)}")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def _send(self, response: _Response):
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(response.body)))
+        if response.status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def log_message(self, format, *args):
+        if os.getenv("DU_API_ACCESS_LOG"):
+            super().log_message(format, *args)
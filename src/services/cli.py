@@ -0,0 +1,175 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any
+import argparse
+import json
+import os
+import sys
+import time
+from src.utils.dataset_profiler import PROFILE_STRATEGIES
+from src.database.materialization import MATERIALIZATION_MODES, REFRESH_SCHEDULES
+from src.jobs import get_job_store
+from .dataset_service import DatasetService, DEFAULT_PREVIEW_ROWS
+from .serialization import to_jsonable, to_arrow_stream
+
+def _connect(connection_string: str):
+    from src.database.connection import DatabaseConnection
+
+    db = DatabaseConnection(connection_string)
+    if not db.connect():
+        raise SystemExit("Failed to connect to database")
+    return db
+
+def _generator():
+    """OpenAI generator for datasets created without a view definition, when a key is configured"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    from src.utils.openai_generator import OpenAIGenerator
+    return OpenAIGenerator(api_key)
+
+def _write(result, fmt: str, output: Optional[str]):
+    """Write a DataFrame or JSON-able result to a file or stdout"""
+    if fmt == "arrow":
+        data = to_arrow_stream(result)
+    elif fmt == "csv":
+        data = result.to_csv(index=False).encode("utf-8")
+    else:
+        data = json.dumps(to_jsonable(result), indent=2, default=str).encode("utf-8")
+    if output:
+        with open(output, "wb") as output_file:
+            output_file.write(data)
+    else:
+        sys.stdout.buffer.write(data)
+        if fmt != "arrow":
+            sys.stdout.buffer.write(b"\n")
+
+def _run_parallel(fn, items: List[Any], workers: int) -> List[Dict[str, Any]]:
+    """Apply fn to every item on a thread pool, collecting per-item outcomes instead of stopping at the first error"""
+    def run(item):
+        started = time.perf_counter()
+        try:
+            result = fn(item)
+            status, error = "ok", None
+        except Exception as e:
+            result, status, error = None, "error", str(e)
+        return {"item": item, "status": status, "error": error, "result": result,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, items))
+
+def _load_specs(path: str) -> List[Dict[str, Any]]:
+    """Dataset specs from a JSON array or a JSON Lines file"""
+    with open(path, encoding="utf-8") as spec_file:
+        content = spec_file.read().strip()
+    if content.startswith("["):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: python -m src.services.cli"""
+    parser = argparse.ArgumentParser(description="Create, list, preview and profile datasets without the UI")
+    parser.add_argument("--connection-string", default=os.getenv("DU_CONNECTION_STRING"),
+                        help="SQLAlchemy connection string (default: DU_CONNECTION_STRING)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List registered datasets")
+    list_parser.add_argument("--format", choices=["json", "csv", "arrow"], default="json")
+    list_parser.add_argument("--output")
+
+    preview_parser = commands.add_parser("preview", help="Show the first rows of a dataset")
+    preview_parser.add_argument("view_name")
+    preview_parser.add_argument("--limit", type=int, default=DEFAULT_PREVIEW_ROWS)
+    preview_parser.add_argument("--format", choices=["json", "csv", "arrow"], default="json")
+    preview_parser.add_argument("--output")
+
+    profile_parser = commands.add_parser("profile", help="Profile one or more datasets in parallel")
+    profile_parser.add_argument("view_names", nargs="*", help="Datasets to profile (default: all)")
+    profile_parser.add_argument("--strategy", choices=list(PROFILE_STRATEGIES))
+    profile_parser.add_argument("--workers", type=int, default=4)
+    profile_parser.add_argument("--fresh", action="store_true", help="Ignore profiles precomputed by background jobs")
+    profile_parser.add_argument("--output", help="JSON file for the results (default: stdout)")
+
+    create_parser = commands.add_parser("create", help="Create and register one or more datasets in parallel")
+    create_parser.add_argument("--spec", help="JSON array or JSON Lines file of dataset specs")
+    create_parser.add_argument("--name", help="Dataset name (single dataset)")
+    create_parser.add_argument("--tables", nargs="+", default=[])
+    create_parser.add_argument("--join-conditions", default="")
+    create_parser.add_argument("--description", default="")
+    create_parser.add_argument("--view-query", help="CREATE VIEW statement; generated with OpenAI when omitted")
+    create_parser.add_argument("--materialization", choices=list(MATERIALIZATION_MODES), default="view")
+    create_parser.add_argument("--refresh-schedule", choices=list(REFRESH_SCHEDULES), default="on_demand")
+    create_parser.add_argument("--workers", type=int, default=4)
+
+    serve_parser = commands.add_parser("serve", help="Run the local HTTP API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--workers", type=int, default=4)
+    serve_parser.add_argument("--queue-size", type=int, default=100)
+    serve_parser.add_argument("--request-timeout", type=float, default=300)
+    args = parser.parse_args(argv)
+
+    if not args.connection_string:
+        parser.error("--connection-string or DU_CONNECTION_STRING is required")
+
+    db = _connect(args.connection_string)
+    service = DatasetService(db, generator=_generator(), job_store=get_job_store())
+    try:
+        if args.command == "list":
+            _write(service.list_datasets(), args.format, args.output)
+
+        elif args.command == "preview":
+            _write(service.preview(args.view_name, args.limit), args.format, args.output)
+
+        elif args.command == "profile":
+            view_names = args.view_names or service.list_datasets()["ViewName"].tolist()
+            outcomes = _run_parallel(
+                lambda view_name: service.profile(view_name, args.strategy, use_precomputed=not args.fresh),
+                view_names, args.workers
+            )
+            _write(outcomes, "json", args.output)
+            if any(outcome["status"] == "error" for outcome in outcomes):
+                raise SystemExit(1)
+
+        elif args.command == "create":
+            if args.spec:
+                specs = _load_specs(args.spec)
+            elif args.name:
+                specs = [{
+                    "dataset_name": args.name,
+                    "tables": args.tables,
+                    "join_conditions": args.join_conditions,
+                    "description": args.description,
+                    "create_view_query": args.view_query,
+                    "materialization_mode": args.materialization,
+                    "refresh_schedule": args.refresh_schedule,
+                }]
+            else:
+                parser.error("create needs --spec or --name")
+            outcomes = _run_parallel(lambda spec: service.create_dataset(**spec), specs, args.workers)
+            for outcome in outcomes:
+                outcome["item"] = outcome["item"].get("dataset_name")
+            _write(outcomes, "json", None)
+            if any(outcome["status"] == "error" for outcome in outcomes):
+                raise SystemExit(1)
+
+        elif args.command == "serve":
+            from .api import DatasetAPIServer
+
+            server = DatasetAPIServer(
+                service, host=args.host, port=args.port, workers=args.workers,
+                queue_size=args.queue_size, request_timeout=args.request_timeout,
+                token=os.getenv("DU_API_TOKEN")
+            )
+            print(f"Serving dataset API on http://{args.host}:{server.server_port}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+from typing import List, Dict, Optional, Any
+from datetime import timedelta
+import os
+import pandas as pd
+from src.cache.result_cache import result_cache
+from src.database.repository import DatasetRepository
+from src.database.materialization import DatasetMaterializer
+from src.database.lineage import get_lineage_index, dataset_tag
+from src.database.compact import COMPACT_FRAMES, column_types
+from src.utils.dataset_profiler import DatasetProfiler
+from src.monitoring import instrumented, annotate
+
+# Rows returned by a preview unless the caller asks for another amount
+DEFAULT_PREVIEW_ROWS = 5
+
+# Profiles computed by background jobs are served instead of live queries while younger than this
+PRECOMPUTED_PROFILE_MAX_AGE = timedelta(hours=float(os.getenv("DU_PRECOMPUTED_PROFILE_HOURS", "36")))
+
+# Generated view definitions are regenerated with the validation errors until valid, at most this many times
+VIEW_GENERATION_ATTEMPTS = int(os.getenv("DU_VIEW_GENERATION_ATTEMPTS", "3"))
+
+def _copy_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a cached profile whose frames callers may modify"""
+    return {key: value.copy() if isinstance(value, pd.DataFrame) else value for key, value in profile.items()}
+
+class DatasetNotFoundError(LookupError):
+    """Raised when a view name is not registered in DU_Datasets"""
+
+class DatasetService:
+    def __init__(self, db_connection, generator=None, job_store=None):
+        """
+        Dataset list, create, preview and profile flows, independent of any UI
+
+        Used by the Streamlit pages, the command line and the HTTP API, so each
+        flow is implemented once. Results are shared through the process-wide
+        result cache and invalidated through dataset lineage.
+
+        Args:
+            db_connection: Connected DatabaseConnection
+            generator: OpenAIGenerator used when a dataset is created without a view definition
+            job_store: JobStore whose precomputed profiles are served before profiling live
+        """
+        self.db = db_connection
+        self.generator = generator
+        self.job_store = job_store
+        self.repository = DatasetRepository(db_connection)
+        self.materializer = DatasetMaterializer(db_connection)
+
+    @instrumented("service")
+    def list_datasets(self) -> pd.DataFrame:
+        """Get all registered datasets, newest first"""
+        return self.repository.list_datasets()
+
+    def get_dataset(self, view_name: str) -> Dict[str, Any]:
+        """Get a registered dataset, raising DatasetNotFoundError when it does not exist"""
+        dataset = self.repository.get_dataset(view_name)
+        if dataset is None:
+            raise DatasetNotFoundError(f"Dataset '{view_name}' does not exist")
+        return dataset
+
+    def read_source(self, dataset: Dict[str, Any]) -> str:
+        """Object a dataset is read from: its view, or its materialized copy"""
+        return self.materializer.read_source(
+            dataset["ViewName"], dataset.get("MaterializationMode"), dataset.get("MaterializedName")
+        )
+
+    @instrumented("service")
+    def generate_view_query(self, view_name: str, tables: List[str], join_conditions: str) -> str:
+        """
+        Generate a CREATE VIEW statement for tables joined as described in natural language
+
+        Each generated statement is validated from metadata (see validate_view_definition);
+        invalid ones are regenerated with the errors as feedback, up to VIEW_GENERATION_ATTEMPTS
+        times. The last attempt is returned even if it is still invalid, so it can be edited.
+        """
+        if self.generator is None:
+            raise ValueError("No view definition given and no OpenAI generator configured")
+        missing = [table for table in tables if table not in self.db.get_tables()]
+        if missing:
+            raise ValueError(f"Tables do not exist in the database: {', '.join(missing)}")
+        table_columns = {table: self.db.get_table_columns(table) for table in tables}
+        feedback = None
+        for attempt in range(1, VIEW_GENERATION_ATTEMPTS + 1):
+            query = self.generator.generate_create_view_query(
+                view_name=view_name,
+                tables=tables,
+                table_columns=table_columns,
+                join_conditions=join_conditions,
+                feedback=feedback
+            )
+            validation = self.validate_view_definition(query)
+            if validation["valid"]:
+                break
+            print(f"Generated view definition {attempt} of {view_name} is invalid: {'; '.join(validation['errors'])}")
+            feedback = f"{query}\nProblems:\n" + "\n".join(f"- {error}" for error in validation["errors"])
+        return query
+
+    def validate_view_definition(self, create_view_query: str) -> Dict[str, Any]:
+        """Check a CREATE VIEW statement without executing it (see DatabaseConnection.validate_view_definition)"""
+        return self.db.validate_view_definition(create_view_query)
+
+    @instrumented("service")
+    def create_dataset(self, dataset_name: str, tables: List[str], join_conditions: str = "",
+                       description: str = "", view_name: Optional[str] = None,
+                       create_view_query: Optional[str] = None, materialization_mode: str = "view",
+                       refresh_schedule: str = "on_demand",
+                       key_columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Create a dataset view, register it and optionally materialize it
+
+        Args:
+            dataset_name: Display name of the dataset
+            tables: Base tables the dataset joins
+            join_conditions: Natural language join conditions
+            description: Dataset description
+            view_name: Name of the view (defaults to the dataset name)
+            create_view_query: CREATE VIEW statement; generated from the join conditions when omitted
+            materialization_mode: One of MATERIALIZATION_MODES
+            refresh_schedule: Refresh schedule of materialized datasets
+            key_columns: Unique key columns (required for indexed views)
+
+        Returns:
+            view_name, create_view_query, materialized_name, read_source, lineage tables and
+            materialization_error (set when the view was created but could not be materialized)
+        """
+        view_name = view_name or dataset_name
+        # Everything that can be checked is checked before any DDL runs
+        self.materializer.validate(materialization_mode, refresh_schedule, key_columns)
+        if create_view_query is None:
+            create_view_query = self.generate_view_query(view_name, tables, join_conditions)
+        validation = self.validate_view_definition(create_view_query)
+        if not validation["valid"]:
+            raise ValueError(f"Invalid view definition: {'; '.join(validation['errors'])}")
+
+        self.db.execute_query(create_view_query)
+        self.repository.insert_dataset({
+            "DatasetName": dataset_name,
+            "Description": description,
+            "ViewName": view_name,
+            "JoinConditions": join_conditions,
+            "Tables": tables
+        })
+
+        # A profile stored for an earlier dataset of the same name no longer applies
+        if self.job_store is not None:
+            self.job_store.delete_results(self.db.connection_key, view_name)
+
+        # Index the base tables the dataset reads, so their changes invalidate only its cached results
+        lineage = []
+        try:
+            lineage = get_lineage_index(self.db).record(view_name, join_conditions=join_conditions, tables=tables)
+        except Exception as e:
+            print(f"Could not record lineage of {view_name}: {str(e)}")
+
+        materialized_name = None
+        materialization_error = None
+        if materialization_mode != "view":
+            try:
+                materialized_name = self.materializer.materialize(
+                    view_name=view_name,
+                    mode=materialization_mode,
+                    refresh_schedule=refresh_schedule,
+                    key_columns=key_columns
+                )
+            except Exception as e:
+                # The dataset stays registered as a plain view; partial materialized objects are removed
+                print(f"Error materializing {view_name}: {str(e)}")
+                materialization_error = str(e)
+                try:
+                    self.materializer.drop(view_name, materialization_mode)
+                except Exception as cleanup_error:
+                    print(f"Error cleaning up materialization of {view_name}: {str(cleanup_error)}")
+                materialization_mode = "view"
+        return {
+            "view_name": view_name,
+            "create_view_query": create_view_query,
+            "materialized_name": materialized_name,
+            "read_source": self.materializer.read_source(view_name, materialization_mode, materialized_name),
+            "lineage": lineage,
+            "materialization_error": materialization_error,
+        }
+
+    @instrumented("service")
+    def preview(self, view_name: str, limit: int = DEFAULT_PREVIEW_ROWS,
+                read_source: Optional[str] = None, compact: bool = COMPACT_FRAMES) -> Optional[pd.DataFrame]:
+        """
+        First rows of a dataset, shared across callers until a base table of the dataset changes
+
+        Args:
+            view_name: Dataset view
+            limit: Rows to return
+            read_source: Object to read when already known (skips the DU_Datasets lookup)
+            compact: Return memory-compact dtypes chosen from the view's column types
+        """
+        read_source = read_source or self.read_source(self.get_dataset(view_name))
+        return result_cache.get_or_compute(
+            (self.db.connection_key, "preview", read_source, int(limit), compact),
+            lambda: self.db.execute_query(
+                self.db.build_sample_query(read_source, limit),
+                compact=compact,
+                column_types=column_types(self.db.get_table_columns(view_name)) if compact else None
+            ),
+            tags=[dataset_tag(self.db, view_name)],
+            copy=lambda frame: frame.copy()
+        )
+
+    def estimate_rows(self, view_name: str, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Metadata row estimate of a dataset, shared across callers until a base table changes
+
+        Args:
+            view_name: Dataset view
+            source: Object to size when not the view itself (e.g. a materialized object)
+
+        Returns:
+            See DatabaseConnection.estimate_row_count (None results are not cached)
+        """
+        source = source or view_name
+        return result_cache.get_or_compute(
+            (self.db.connection_key, "estimate", source),
+            lambda: self.db.estimate_row_count(source),
+            tags=[dataset_tag(self.db, view_name)],
+            copy=dict
+        )
+
+    @instrumented("service")
+    def profile(self, view_name: str, strategy: Optional[str] = None, read_source: Optional[str] = None,
+                use_precomputed: bool = True, compact: bool = COMPACT_FRAMES) -> Dict[str, Any]:
+        """
+        Profile a dataset with full scan, pushdown or sampling chosen from its estimated size
+
+        A recent profile computed by a background job is returned when available, so
+        heavy profiling queries can run off-hours instead of on demand.
+
+        Args:
+            view_name: Dataset view
+            strategy: Force a strategy instead of choosing one from the estimate (always profiles live)
+            read_source: Object to read when already known (skips the DU_Datasets lookup)
+            use_precomputed: Serve a background job's profile when one is recent enough
+            compact: Profile rows read with memory-compact dtypes
+
+        Returns:
+            The profile sections plus 'rows_profiled', 'strategy' and 'estimate' (see
+            DatasetProfiler.profile_source, without 'data'); precomputed profiles also carry 'computed_at'
+        """
+        if use_precomputed and strategy is None:
+            precomputed = self.precomputed_profile(view_name)
+            if precomputed is not None:
+                return precomputed
+
+        read_source = read_source or self.read_source(self.get_dataset(view_name))
+        return result_cache.get_or_compute(
+            (self.db.connection_key, "profile", read_source, strategy, compact),
+            # Only the profile sections are kept; the profiled rows would hold up to a full scan in memory
+            lambda: DatasetProfiler.summary(
+                DatasetProfiler.profile_source(self.db, read_source, strategy=strategy, compact=compact)
+            ),
+            tags=[dataset_tag(self.db, view_name)],
+            copy=_copy_profile
+        )
+
+    def precomputed_profile(self, view_name: str,
+                            max_age: timedelta = PRECOMPUTED_PROFILE_MAX_AGE) -> Optional[Dict[str, Any]]:
+        """Latest profile stored by a background profile job, or None when missing or too old"""
+        if self.job_store is None:
+            return None
+        try:
+            result = self.job_store.get_result("profile", self.db.connection_key, view_name, max_age)
+        except Exception as e:
+            print(f"Error reading precomputed profile of {view_name}: {str(e)}")
+            return None
+        if result is None:
+            return None
+        annotate(cache="hit")
+        return dict(DatasetProfiler.summary(result["value"]), computed_at=result["computed_at"])
+
+    def queue_profile(self, view_name: str, priority: int = 10) -> Optional[int]:
+        """Queue a background profile job for a dataset; returns its id, or None if one is already pending"""
+        if self.job_store is None:
+            raise ValueError("No job store configured")
+        return self.job_store.enqueue("profile", self.db.connection_key, view_name, priority=priority)
@@ -0,0 +1,71 @@
+from typing import Any
+from datetime import date, datetime
+from decimal import Decimal
+import io
+import json
+import math
+import numpy as np
+import pandas as pd
+from src.utils.dataset_exporter import _require_pyarrow
+
+# Media type of Arrow IPC stream responses
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def _with_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Move a meaningful index (e.g. a correlation matrix's column names) into a leading column"""
+    index = df.index
+    if isinstance(index, pd.RangeIndex) and index.name is None and index.start == 0 and index.step == 1:
+        return df
+    return df.reset_index()
+
+def to_jsonable(value: Any) -> Any:
+    """Convert DataFrames (index labels included), numpy scalars, timestamps and NaN into plain JSON values"""
+    if isinstance(value, pd.DataFrame):
+        value = _with_index(value)
+        return [
+            {str(column): to_jsonable(item) for column, item in zip(value.columns, row)}
+            for row in value.itertuples(index=False, name=None)
+        ]
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if value is pd.NA:
+        return None
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+def to_json(value: Any) -> bytes:
+    """Serialize a result to UTF-8 JSON"""
+    return json.dumps(to_jsonable(value), default=str).encode("utf-8")
+
+def to_arrow_stream(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to an Arrow IPC stream, keeping a non-default index as a column"""
+    pa, _ = _require_pyarrow()
+    table = pa.Table.from_pandas(_arrow_compatible(pa, _with_index(df)), preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def _arrow_compatible(pa, df: pd.DataFrame) -> pd.DataFrame:
+    """Send object columns Arrow cannot type without losing values (e.g. profile Min/Max across types) as text"""
+    converted = None
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            converted = df.copy() if converted is None else converted
+            converted[column] = df[column].map(lambda value: None if pd.isna(value) else str(value))
+    return df if converted is None else converted
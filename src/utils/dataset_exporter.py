@@ -0,0 +1,324 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from typing import List, Dict, Optional, Any, Tuple
+import argparse
+import os
+import time
+import pandas as pd
+from src.database.compact import type_kind, column_types
+
+# Supported export formats and their file extensions
+EXPORT_FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# Arrow types (pyarrow factory names) for columns whose first batch holds only nulls, by server type kind
+_ARROW_TYPES = {
+    "integer": "int64",
+    "float": "float64",
+    "boolean": "bool_",
+    "string": "large_string",
+}
+
+def _require_pyarrow():
+    """Import pyarrow lazily so the app runs without it until an export is requested"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        return pa, pq
+    except ImportError:
+        raise ImportError("Dataset export requires pyarrow. Install it with: pip install pyarrow")
+
+def _to_text(value: Any) -> Optional[str]:
+    """Text of a value stored in a string column (integers held as floats lose their '.0')"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+class _BatchWriter:
+    """Write DataFrame batches to a single Parquet or Arrow IPC file"""
+
+    def __init__(self, output_path: str, fmt: str, row_group_size: int, compression: Optional[str],
+                 column_types: Optional[Dict[str, str]] = None):
+        self.pa, self.pq = _require_pyarrow()
+        self.output_path = output_path
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.column_types = column_types or {}
+        self.schema = None
+        self.writer = None
+        self.sink = None
+        self.pending = []
+        self.pending_rows = 0
+        self.rows_written = 0
+
+    def write(self, df):
+        """Buffer a batch and flush whenever a full row group is available"""
+        batch_schema = self.pa.Schema.from_pandas(df, preserve_index=False)
+        if self.schema is None:
+            self.schema = self._initial_schema(batch_schema)
+        elif self.writer is None:
+            self._widen(batch_schema)
+        table = self.pa.Table.from_pandas(self._coerce(df), schema=self.schema, preserve_index=False, safe=False)
+        self.pending.append(table)
+        self.pending_rows += table.num_rows
+        if self.pending_rows >= self.row_group_size:
+            self._flush()
+
+    def close(self):
+        """Flush remaining rows and finalize the file"""
+        self._flush(final=True)
+        if self.writer is not None:
+            self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+
+    def _initial_schema(self, batch_schema):
+        """Schema of the first batch, with all-null columns typed from the server types where known"""
+        fields = []
+        for field in batch_schema:
+            if self.pa.types.is_null(field.type):
+                arrow_type = _ARROW_TYPES.get(type_kind(self.column_types.get(field.name) or ""))
+                if arrow_type is not None:
+                    field = self.pa.field(field.name, getattr(self.pa, arrow_type)())
+            fields.append(field)
+        return self.pa.schema(fields, metadata=batch_schema.metadata)
+
+    def _widen(self, batch_schema):
+        """Adopt the type of columns that were all-null so far, while nothing is written yet"""
+        fields = []
+        changed = False
+        for field in self.schema:
+            if self.pa.types.is_null(field.type) and field.name in batch_schema.names:
+                batch_type = batch_schema.field(field.name).type
+                if not self.pa.types.is_null(batch_type):
+                    field = self.pa.field(field.name, batch_type)
+                    changed = True
+            fields.append(field)
+        if changed:
+            self.schema = self.pa.schema(fields, metadata=self.schema.metadata)
+            self.pending = [table.cast(self.schema) for table in self.pending]
+
+    def _coerce(self, df):
+        """Convert values of columns the file stores as strings but the batch holds as other types"""
+        columns = {}
+        for field in self.schema:
+            if self.pa.types.is_large_string(field.type) and field.name in df.columns:
+                series = df[field.name]
+                if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+                    columns[field.name] = series.astype(object).where(series.notna(), None).map(_to_text)
+        return df.assign(**columns) if columns else df
+
+    def _open(self):
+        """Open the output file; columns still without a type are stored as strings"""
+        fields = [
+            self.pa.field(f.name, self.pa.large_string()) if self.pa.types.is_null(f.type) else f
+            for f in self.schema
+        ]
+        self.schema = self.pa.schema(fields, metadata=self.schema.metadata)
+        self.pending = [table.cast(self.schema) for table in self.pending]
+
+        if self.fmt == "parquet":
+            self.writer = self.pq.ParquetWriter(self.output_path, self.schema, compression=self.compression)
+        else:
+            self.sink = self.pa.OSFile(self.output_path, "wb")
+            options = self.pa.ipc.IpcWriteOptions(compression=self.compression) if self.compression else None
+            self.writer = self.pa.ipc.new_file(self.sink, self.schema, options=options)
+
+    def _flush(self, final: bool = False):
+        """Write buffered rows as full row groups, keeping the remainder unless final"""
+        if not self.pending:
+            return
+        if self.writer is None:
+            self._open()
+        table = self.pa.concat_tables(self.pending)
+        full_rows = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_size
+        if full_rows:
+            if self.fmt == "parquet":
+                self.writer.write_table(table.slice(0, full_rows), row_group_size=self.row_group_size)
+            else:
+                self.writer.write_table(table.slice(0, full_rows), max_chunksize=self.row_group_size)
+            self.rows_written += full_rows
+        remainder = table.slice(full_rows)
+        self.pending = [remainder] if remainder.num_rows else []
+        self.pending_rows = remainder.num_rows
+
+class DatasetExporter:
+    def __init__(self, db_connection, batch_size: int = 50000,
+                 row_group_size: Optional[int] = None, compression: Optional[str] = "snappy"):
+        """
+        Initialize exporter on top of an open DatabaseConnection
+
+        Args:
+            db_connection: Connected DatabaseConnection
+            batch_size: Number of rows fetched from the database per batch
+            row_group_size: Rows per Parquet row group / Arrow record batch
+                (defaults to batch_size)
+            compression: Parquet codec (snappy, zstd, gzip, ...) or Arrow IPC
+                codec (lz4, zstd); None disables compression
+        """
+        self.db = db_connection
+        self.batch_size = batch_size
+        self.row_group_size = row_group_size or batch_size
+        self.compression = compression
+
+    def export(self, source: str, output_path: str, fmt: str = "parquet",
+               where: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Stream a view or table into a single Parquet or Arrow IPC file
+
+        Args:
+            source: View or table to export
+            output_path: Destination file path
+            fmt: One of EXPORT_FORMATS
+            where: Optional WHERE clause (without the keyword) using bound parameters
+            params: Bound parameters for the WHERE clause
+
+        Returns:
+            int: Number of rows written
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        query = f"SELECT * FROM {source}"
+        if where:
+            query += f" WHERE {where}"
+
+        # Server types type the columns whose first batches are all null
+        object_name = source.split()[0]
+        types = column_types(self.db.get_table_columns(object_name))
+        writer = _BatchWriter(output_path, fmt, self.row_group_size, self._codec(fmt), types)
+        try:
+            for batch in self.db.iter_query_batches(query, batch_size=self.batch_size, params=params):
+                writer.write(batch)
+        except Exception:
+            writer.close()
+            # Do not leave a truncated file behind
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+        writer.close()
+        return writer.rows_written
+
+    def export_partitioned(self, source: str, output_dir: str, key_column: str,
+                           partitions: int = 4, fmt: str = "parquet",
+                           max_workers: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Export a view in parallel, one file per key range
+
+        Args:
+            source: View or table to export
+            output_dir: Directory receiving part-NNNNN files
+            key_column: Numeric column used to split the export into ranges
+            partitions: Number of key ranges
+            fmt: One of EXPORT_FORMATS
+            max_workers: Concurrent partition exports (defaults to partitions)
+
+        Returns:
+            List of (file path, rows written) per partition
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        os.makedirs(output_dir, exist_ok=True)
+
+        ranges = self.key_ranges(source, key_column, partitions)
+        extension = EXPORT_FORMATS[fmt]
+        tasks = []
+        for index, (low, high, last) in enumerate(ranges):
+            upper = "<=" if last else "<"
+            where = f"{key_column} >= :low AND {key_column} {upper} :high"
+            path = os.path.join(output_dir, f"part-{index:05d}{extension}")
+            tasks.append((path, where, {"low": low, "high": high}))
+        # Rows with a NULL key fall outside every range
+        tasks.append((os.path.join(output_dir, f"part-null{extension}"), f"{key_column} IS NULL", None))
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as executor:
+            futures = [
+                executor.submit(self.export, source, path, fmt, where, params)
+                for path, where, params in tasks
+            ]
+            return [(path, future.result()) for (path, _, _), future in zip(tasks, futures)]
+
+    def key_ranges(self, source: str, key_column: str, partitions: int) -> List[Tuple[Any, Any, bool]]:
+        """Split the key column's MIN..MAX span into contiguous ranges"""
+        with self.db.engine.connect() as connection:
+            low, high = connection.execute(
+                text(f"SELECT MIN({key_column}), MAX({key_column}) FROM {source}")
+            ).one()
+        if low is None or high is None:
+            return []
+        if not (pd.api.types.is_number(low) and pd.api.types.is_number(high)):
+            raise ValueError(f"Partition key {key_column} must be numeric")
+
+        partitions = max(1, partitions)
+        # The outer edges stay the exact MIN and MAX values, so high-precision DECIMAL or
+        # BIGINT keys never lose their last rows; only the interior points are computed
+        span = high - low
+        if low % 1 == 0 and high % 1 == 0:
+            interior = [low + span * i // partitions for i in range(1, partitions)]
+        else:
+            interior = [low + span * i / partitions for i in range(1, partitions)]
+        edges = [low] + sorted(set(edge for edge in interior if low < edge < high)) + [high]
+        return [
+            (edges[i], edges[i + 1], i == len(edges) - 2)
+            for i in range(len(edges) - 1)
+        ]
+
+    def _codec(self, fmt: str) -> Optional[str]:
+        """Map the configured compression onto what the format supports"""
+        if not self.compression:
+            return None
+        if fmt == "arrow" and self.compression not in ("lz4", "zstd"):
+            # Arrow IPC only supports lz4 and zstd buffer compression
+            return "zstd"
+        return self.compression
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: python -m src.utils.dataset_exporter"""
+    from src.database.connection import DatabaseConnection
+
+    parser = argparse.ArgumentParser(description="Export a dataset view to Parquet or Arrow IPC")
+    parser.add_argument("--connection-string", required=True, help="SQLAlchemy connection string")
+    parser.add_argument("--source", required=True, help="View or table to export")
+    parser.add_argument("--output", required=True, help="Output file, or directory when partitioning")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--row-group-size", type=int, default=None)
+    parser.add_argument("--compression", default="snappy", help="Codec name, or 'none'")
+    parser.add_argument("--key-column", help="Numeric column for parallel partitioned export")
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    db = DatabaseConnection(args.connection_string)
+    if not db.connect():
+        raise SystemExit("Failed to connect to database")
+
+    exporter = DatasetExporter(
+        db,
+        batch_size=args.batch_size,
+        row_group_size=args.row_group_size,
+        compression=None if args.compression.lower() == "none" else args.compression
+    )
+    started = time.perf_counter()
+    try:
+        if args.key_column:
+            results = exporter.export_partitioned(
+                args.source, args.output, args.key_column,
+                partitions=args.partitions, fmt=args.format, max_workers=args.workers
+            )
+            for path, rows in results:
+                print(f"{path}: {rows} rows")
+            total = sum(rows for _, rows in results)
+        else:
+            total = exporter.export(args.source, args.output, fmt=args.format)
+    finally:
+        db.close()
+    print(f"Exported {total} rows in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
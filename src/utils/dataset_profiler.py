@@ -0,0 +1,586 @@
+from typing import List, Dict, Optional, Any
+import math
+import re
+import string
+import warnings
+import numpy as np
+import pandas as pd
+from src.database.compact import column_types
+
+# Maps letters to 'A' and digits to '9' for string shape patterns
+_PATTERN_TABLE = str.maketrans(
+    string.ascii_letters + string.digits,
+    "A" * len(string.ascii_letters) + "9" * len(string.digits)
+)
+
+# Estimated-row thresholds for choosing how to profile a source
+PROFILE_FULL_SCAN_ROWS = 100000
+PROFILE_PUSHDOWN_ROWS = 50000000
+PROFILE_SAMPLE_ROWS = 10000
+
+PROFILE_STRATEGIES = {
+    "full_scan": "Full scan",
+    "pushdown": "Database aggregates + sample",
+    "sample": "Sample",
+}
+
+_NUMERIC_TYPE = re.compile(r"^(TINYINT|SMALLINT|MEDIUMINT|INT|INTEGER|BIGINT|DECIMAL|NUMERIC|FLOAT|REAL|DOUBLE|MONEY|SMALLMONEY)\b")
+_STRING_TYPE = re.compile(r"^(N?VARCHAR|N?CHAR|CHARACTER|VARCHAR2|STRING|N?TEXT)\b")
+
+# Legacy SQL Server types that cannot be compared, so COUNT(DISTINCT) needs a cast
+_MSSQL_LEGACY_TEXT = re.compile(r"^N?TEXT\b")
+
+_TABLE_HINT = re.compile(r"\s+WITH\s*\(.*\)\s*$", re.IGNORECASE)
+
+# Type numeric columns are cast to before summing, so sums of squares do not overflow
+_FLOAT_TYPES = {"mysql": "DOUBLE"}
+
+class SpaceSavingCounter:
+    """
+    Approximate top-k frequencies using a mergeable Space-Saving sketch
+
+    Each batch is summarized with one value_counts call and merged into the
+    monitored counters. A value missing from one side is charged that side's
+    smallest possible count, so every Count is an upper bound on the true
+    frequency and Error bounds how much it may overestimate.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+
+    def update(self, values: pd.Series):
+        """Add a batch of values to the sketch"""
+        batch = values.value_counts(dropna=True)
+        if batch.empty:
+            return
+        # Values cut from either summary can be at most as frequent as its floor
+        batch_floor = int(batch.iloc[self.capacity]) if len(batch) > self.capacity else 0
+        batch = batch.iloc[:self.capacity]
+        own_floor = int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+        union = self.counts.index.union(batch.index)
+        counts = (
+            self.counts.reindex(union).fillna(own_floor)
+            + batch.reindex(union).fillna(batch_floor)
+        )
+        errors = (
+            self.errors.reindex(union).fillna(own_floor)
+            + pd.Series(np.where(union.isin(batch.index), 0, batch_floor), index=union)
+        )
+
+        counts = counts.sort_values(ascending=False, kind="stable").iloc[:self.capacity]
+        self.counts = counts.astype("int64")
+        self.errors = errors.reindex(counts.index).astype("int64")
+
+    def top_k(self, k: int = 10) -> pd.DataFrame:
+        """Get the k most frequent values with their counts and error bounds"""
+        top = self.counts.iloc[:k]
+        return pd.DataFrame({
+            "Value": top.index,
+            "Count": top.values,
+            "Error": self.errors.reindex(top.index).values
+        })
+
+class DatasetProfiler:
+    def __init__(self, df: pd.DataFrame, bins: int = 10, top_k: int = 10):
+        """
+        Initialize profiler for a DataFrame
+
+        Numeric columns are profiled as one float matrix; all other columns are
+        factorized together once, so string statistics work on each distinct
+        value only once and on integer codes everywhere else.
+
+        Args:
+            df: Data to profile
+            bins: Number of histogram bins per numeric column
+            top_k: Number of most frequent values reported per column
+        """
+        self.df = df
+        self.bins = bins
+        self.top_k = top_k
+        dtypes = df.dtypes
+        self.numeric_columns = [c for c, t in dtypes.items() if pd.api.types.is_numeric_dtype(t)]
+        self.other_columns = [c for c, t in dtypes.items() if not pd.api.types.is_numeric_dtype(t)]
+        # Integer and boolean columns are not exact as floats, so their min, max and top values use their own dtype
+        self.exact_columns = [
+            c for c, t in dtypes.items() if pd.api.types.is_integer_dtype(t) or pd.api.types.is_bool_dtype(t)
+        ]
+        self.string_columns = [
+            c for c, t in dtypes.items()
+            if pd.api.types.is_string_dtype(t) or isinstance(t, pd.CategoricalDtype)
+        ]
+        self._matrix = None
+        self._sorted = None
+        self._codes = None
+        self._uniques = None
+        self._exact_codes = None
+
+    @staticmethod
+    def choose_strategy(estimated_rows: Optional[int], full_scan_rows: int = PROFILE_FULL_SCAN_ROWS,
+                        pushdown_rows: int = PROFILE_PUSHDOWN_ROWS) -> str:
+        """
+        Pick how to profile a source of the given estimated size
+
+        Small sources are read in full; medium ones get exact column statistics from
+        database aggregates plus a sample for distributions; very large or unknown
+        sizes are profiled from a sample only.
+        """
+        if estimated_rows is None:
+            return "sample"
+        if estimated_rows <= full_scan_rows:
+            return "full_scan"
+        if estimated_rows <= pushdown_rows:
+            return "pushdown"
+        return "sample"
+
+    @classmethod
+    def profile_source(cls, db, source: str, strategy: Optional[str] = None,
+                       sample_rows: int = PROFILE_SAMPLE_ROWS, compact: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        Profile a view or table, choosing full scan, pushdown or sampling from its estimated size
+
+        Args:
+            db: DatabaseConnection
+            source: View or table to profile
+            strategy: Force a strategy instead of choosing one from the estimate
+            sample_rows: Rows read when sampling
+            compact: Read the rows with memory-compact dtypes chosen from the server column types
+            **kwargs: Passed to the profiler (bins, top_k)
+
+        Returns:
+            Every profile section, plus 'data' (the rows profiled), 'rows_profiled', 'strategy' and 'estimate'
+        """
+        # Metadata lookups need the bare object name, without table hints such as WITH (NOEXPAND)
+        object_name = _TABLE_HINT.sub("", source)
+        estimate = db.estimate_row_count(object_name)
+        strategy = strategy or cls.choose_strategy(estimate["rows"] if estimate else None)
+        limit = None if strategy == "full_scan" else sample_rows
+        types = column_types(db.get_table_columns(object_name)) if compact else None
+        df = db.execute_query(db.build_sample_query(source, limit), compact=compact, column_types=types)
+        if df is None:
+            df = pd.DataFrame()
+
+        profile = cls(df, **kwargs).profile()
+        if strategy == "pushdown":
+            columns = cls.pushdown_statistics(db, source, object_name)
+            if not columns.empty:
+                profile["columns"] = columns
+        profile.update(data=df, rows_profiled=len(df), strategy=strategy, estimate=estimate)
+        return profile
+
+    @staticmethod
+    def summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """A profile without its 'data' frame, for caching and storing (the sections stay small)"""
+        return {key: value for key, value in profile.items() if key != "data"}
+
+    @staticmethod
+    def pushdown_statistics(db, source: str, object_name: Optional[str] = None) -> pd.DataFrame:
+        """
+        Compute column statistics with one aggregate query in the database
+
+        Returns the same columns as column_statistics(); the median is not pushed down.
+
+        Args:
+            db: DatabaseConnection
+            source: FROM clause target, possibly with table hints
+            object_name: Table or view name used to look up columns (defaults to source)
+        """
+        columns = db.get_table_columns(object_name or source)
+        if not columns:
+            return pd.DataFrame()
+        quote = db.engine.dialect.identifier_preparer.quote
+        float_type = _FLOAT_TYPES.get(db.dialect, "FLOAT")
+
+        select = ["COUNT(*) AS total_rows"]
+        for i, column in enumerate(columns):
+            name = quote(column["name"])
+            column_type = column["type"].upper()
+            select.append(f"COUNT({name}) AS c{i}_count")
+            if _NUMERIC_TYPE.match(column_type):
+                # Min and max keep the column's own type, so large BIGINT and DECIMAL values stay exact
+                value = f"CAST({name} AS {float_type})"
+                select += [f"MIN({name}) AS c{i}_min", f"MAX({name}) AS c{i}_max",
+                           f"SUM({value}) AS c{i}_sum", f"SUM({value} * {value}) AS c{i}_sum_squares"]
+            elif _STRING_TYPE.match(column_type):
+                if db.dialect == "mssql" and _MSSQL_LEGACY_TEXT.match(column_type):
+                    name = f"CAST({name} AS NVARCHAR(MAX))"
+                select.append(f"COUNT(DISTINCT {name}) AS c{i}_distinct")
+
+        # As objects, so reading the row does not turn exact integer minimums and maximums into floats
+        row = db.execute_query(f"SELECT {', '.join(select)} FROM {source}").astype(object).iloc[0]
+        total = int(row["total_rows"])
+
+        records = []
+        for i, column in enumerate(columns):
+            nulls = total - int(row[f"c{i}_count"])
+            record = {
+                "Column Name": column["name"],
+                "Data Type": column["type"],
+                "Total Rows": total,
+                "Null Count": nulls,
+                "Null Percentage": f"{(nulls / total * 100) if total else 0:.2f}%",
+            }
+            if f"c{i}_sum" in row.index:
+                count = total - nulls
+                mean = row[f"c{i}_sum"] / count if count else np.nan
+                variance = (row[f"c{i}_sum_squares"] - count * mean * mean) / (count - 1) if count > 1 else np.nan
+                record.update({
+                    "Min": row[f"c{i}_min"],
+                    "Max": row[f"c{i}_max"],
+                    "Mean": mean,
+                    "Median": np.nan,
+                    "Standard Deviation": math.sqrt(max(variance, 0)) if not pd.isna(variance) else np.nan,
+                })
+            if f"c{i}_distinct" in row.index:
+                record["Unique Values"] = int(row[f"c{i}_distinct"])
+            records.append(record)
+        frame = pd.DataFrame(records)
+        for name in ("Min", "Max"):
+            if name in frame.columns:
+                # Mixed integer and float columns would otherwise be widened to float64
+                frame[name] = pd.Series([record.get(name, np.nan) for record in records], dtype=object)
+        return frame
+
+    def profile(self) -> Dict[str, pd.DataFrame]:
+        """Compute every profile section"""
+        return {
+            "columns": self.column_statistics(),
+            "histograms": self.histograms(),
+            "quantile_histograms": self.histograms(kind="quantile"),
+            "top_values": self.top_values(),
+            "strings": self.string_statistics(),
+            "patterns": self.string_patterns(),
+            "correlation": self.correlation(),
+        }
+
+    def column_statistics(self) -> pd.DataFrame:
+        """Compute per-column scalar statistics in whole-frame operations"""
+        df = self.df
+        total = len(df)
+
+        null_counts = pd.Series(0, index=df.columns, dtype="int64")
+        if self.numeric_columns:
+            null_counts[self.numeric_columns] = np.isnan(self._numeric_matrix()).sum(axis=0)
+        if self.other_columns:
+            null_counts[self.other_columns] = np.isnan(self._factorized()[0]).sum(axis=0)
+
+        stats = pd.DataFrame({
+            "Column Name": df.columns,
+            "Data Type": [str(t) for t in df.dtypes],
+            "Total Rows": total,
+            "Null Count": null_counts.values,
+            "Null Percentage": [
+                f"{(n / total * 100) if total else 0:.2f}%" for n in null_counts.values
+            ],
+        }, index=df.columns)
+
+        if self.numeric_columns:
+            matrix = self._numeric_matrix()
+            with warnings.catch_warnings():
+                # All-null columns produce NaN statistics, which is what we want
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                numeric = pd.DataFrame({
+                    "Min": np.nanmin(matrix, axis=0) if total else np.nan,
+                    "Max": np.nanmax(matrix, axis=0) if total else np.nan,
+                    "Mean": np.nanmean(matrix, axis=0),
+                    "Median": self._quantiles([0.5])[0],
+                    "Standard Deviation": np.nanstd(matrix, axis=0, ddof=1),
+                }, index=self.numeric_columns)
+            if self.exact_columns and total:
+                numeric[["Min", "Max"]] = numeric[["Min", "Max"]].astype(object)
+                for column in self.exact_columns:
+                    values = df[column].dropna()
+                    if len(values):
+                        numeric.at[column, "Min"] = values.min()
+                        numeric.at[column, "Max"] = values.max()
+            stats = stats.join(numeric)
+
+        if self.string_columns:
+            ordered = np.sort(self._string_codes(), axis=0)
+            changed = np.vstack([np.ones((1, ordered.shape[1]), dtype=bool), np.diff(ordered, axis=0) != 0])
+            distinct = (changed & ~np.isnan(ordered)).sum(axis=0)
+            stats = stats.join(pd.Series(distinct, index=self.string_columns, name="Unique Values"))
+
+        return stats.reset_index(drop=True)
+
+    def histograms(self, kind: str = "equi_width") -> pd.DataFrame:
+        """
+        Compute histograms for all numeric columns at once
+
+        Args:
+            kind: 'equi_width' for equal-width bins or 'quantile' for equal-frequency bins
+
+        Returns:
+            Long DataFrame with Column Name, Bin, Lower, Upper and Count
+        """
+        if not self.numeric_columns or self.df.empty:
+            return pd.DataFrame(columns=["Column Name", "Bin", "Lower", "Upper", "Count"])
+
+        matrix = self._numeric_matrix()
+        rows, width = matrix.shape
+        valid = ~np.isnan(matrix)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            if kind == "quantile":
+                edges = self._quantiles(np.linspace(0, 1, self.bins + 1))
+            else:
+                lows = np.nanmin(matrix, axis=0)
+                highs = np.nanmax(matrix, axis=0)
+                edges = lows + np.linspace(0, 1, self.bins + 1)[:, None] * (highs - lows)
+
+        if kind == "quantile":
+            # Bin index = number of inner edges each value is >= to, for every column at once
+            inner = edges[1:-1]
+            index = np.zeros(matrix.shape, dtype=np.int64)
+            chunk = max(1, 2 ** 22 // max(1, width * max(1, len(inner))))
+            for start in range(0, rows, chunk):
+                block = matrix[start:start + chunk]
+                index[start:start + chunk] = (block[:, :, None] >= inner.T[None, :, :]).sum(axis=2)
+        else:
+            spans = np.where(highs > lows, highs - lows, 1.0)
+            with np.errstate(invalid="ignore"):
+                scaled = np.nan_to_num((matrix - lows) / spans * self.bins)
+            index = np.clip(scaled.astype(np.int64), 0, self.bins - 1)
+
+        flat = (index + np.arange(width) * self.bins)[valid]
+        counts = np.bincount(flat, minlength=width * self.bins).reshape(width, self.bins)
+
+        return pd.DataFrame({
+            "Column Name": np.repeat(self.numeric_columns, self.bins),
+            "Bin": np.tile(np.arange(self.bins), width),
+            "Lower": edges[:-1].T.ravel(),
+            "Upper": edges[1:].T.ravel(),
+            "Count": counts.ravel(),
+        })
+
+    def top_values(self, batch_size: int = 100000) -> pd.DataFrame:
+        """
+        Compute top-k values per column
+
+        Frames larger than batch_size are streamed through a Space-Saving sketch
+        per column. A frame that fits in one batch would leave the sketch exact,
+        so its counts are computed directly for all columns at once.
+        """
+        columns = ["Column Name", "Value", "Count", "Error"]
+        if self.df.columns.empty:
+            return pd.DataFrame(columns=columns)
+
+        if len(self.df) <= batch_size:
+            frames = []
+            float_columns = [c for c in self.numeric_columns if c not in self.exact_columns]
+            if float_columns:
+                positions = [self.numeric_columns.index(c) for c in float_columns]
+                frames.append(self._top_k_exact(float_columns, self._sorted_numeric()[:, positions], None, self.top_k))
+            if self.exact_columns:
+                codes, uniques = self._exact_factorized()
+                frames.append(self._top_k_exact(self.exact_columns, np.sort(codes, axis=0), uniques, self.top_k))
+            if self.other_columns:
+                codes, uniques = self._factorized()
+                frames.append(self._top_k_exact(self.other_columns, np.sort(codes, axis=0), uniques, self.top_k))
+            result = pd.concat(frames, ignore_index=True)
+            # Numeric columns in frame order first, then the others
+            order = {column: i for i, column in enumerate(self.numeric_columns + self.other_columns)}
+            result = result.sort_values("Column Name", key=lambda names: names.map(order), kind="stable")
+            result = result.reset_index(drop=True)
+            result["Error"] = 0
+        else:
+            frames = []
+            for column in self.df.columns:
+                counter = SpaceSavingCounter(capacity=self.top_k * 10)
+                series = self.df[column]
+                for start in range(0, len(series), batch_size):
+                    counter.update(series.iloc[start:start + batch_size])
+                top = counter.top_k(self.top_k)
+                top.insert(0, "Column Name", column)
+                frames.append(top)
+            result = pd.concat(frames, ignore_index=True)
+
+        result["Value"] = result["Value"].astype(str)
+        return result[columns]
+
+    def string_statistics(self) -> pd.DataFrame:
+        """Compute length statistics for all string columns at once"""
+        if not self.string_columns:
+            return pd.DataFrame(columns=["Column Name", "Min Length", "Mean Length", "Max Length", "Empty Count"])
+
+        uniques = self._factorized()[1]
+        # Measure each distinct value once, then look lengths up by code
+        unique_lengths = np.fromiter((len(str(u)) for u in uniques), dtype=float, count=len(uniques))
+        lengths = self._lookup(self._string_codes(), unique_lengths)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return pd.DataFrame({
+                "Column Name": self.string_columns,
+                "Min Length": np.nanmin(lengths, axis=0) if len(self.df) else np.nan,
+                "Mean Length": np.nanmean(lengths, axis=0),
+                "Max Length": np.nanmax(lengths, axis=0) if len(self.df) else np.nan,
+                "Empty Count": (lengths == 0).sum(axis=0),
+            })
+
+    def string_patterns(self, top_n: int = 3) -> pd.DataFrame:
+        """
+        Find the most common shapes of string values
+
+        Letters become 'A' and digits become '9', so '2024-01-05' and
+        'AB-123' map to '9999-99-99' and 'AA-999'.
+        """
+        if not self.string_columns:
+            return pd.DataFrame(columns=["Column Name", "Pattern", "Count"])
+
+        uniques = self._factorized()[1]
+        pattern_codes, patterns = pd.factorize(np.array(
+            [str(u).translate(_PATTERN_TABLE) for u in uniques], dtype=object
+        ))
+        matrix = self._lookup(self._string_codes(), pattern_codes.astype(float))
+        result = self._top_k_exact(self.string_columns, np.sort(matrix, axis=0), patterns, top_n)
+        return result.rename(columns={"Value": "Pattern"})
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Compute the pairwise Pearson correlation matrix of numeric columns
+
+        Missing values are handled pairwise (like DataFrame.corr) using masked
+        matrix products, so the whole matrix is a handful of BLAS calls.
+        """
+        if len(self.numeric_columns) < 2:
+            return pd.DataFrame()
+
+        matrix = self._numeric_matrix()
+        mask = (~np.isnan(matrix)).astype(float)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            # Centering first keeps the sums of squares numerically stable
+            centered = np.where(mask > 0, matrix - np.nanmean(matrix, axis=0), 0.0)
+
+            n = mask.T @ mask
+            sum_x = centered.T @ mask
+            sum_xx = (centered ** 2).T @ mask
+            sum_xy = centered.T @ centered
+
+            cov = sum_xy - sum_x * sum_x.T / n
+            var_x = sum_xx - sum_x ** 2 / n
+            var_y = var_x.T
+            corr = cov / np.sqrt(var_x * var_y)
+
+        corr[n < 2] = np.nan
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.numeric_columns, columns=self.numeric_columns)
+
+    @staticmethod
+    def _top_k_exact(columns: List[str], matrix: np.ndarray, uniques: Optional[np.ndarray], k: int) -> pd.DataFrame:
+        """
+        Count values of every column of a matrix at once and keep the top k per column
+
+        Args:
+            columns: Column names, one per matrix column
+            matrix: Float matrix of values (or factorized codes) with NaN for nulls,
+                already sorted along axis 0
+            uniques: Values behind the codes, or None if the matrix holds the values
+            k: Number of values kept per column
+        """
+        rows, width = matrix.shape
+        if rows == 0 or width == 0:
+            return pd.DataFrame(columns=["Column Name", "Value", "Count"])
+
+        # Run-length encode equal neighbours down each sorted column (NaNs sort last)
+        valid = ~np.isnan(matrix)
+        starts = np.vstack([np.ones((1, width), dtype=bool), matrix[1:] != matrix[:-1]]) & valid
+        run_rows, run_columns = np.nonzero(starts.T)[::-1]
+        ends = np.r_[run_rows[1:], 0]
+        # A run ends where the next run in the same column starts, else at the column's last valid row
+        column_ends = valid.sum(axis=0)
+        last_in_column = np.r_[run_columns[1:] != run_columns[:-1], True]
+        ends = np.where(last_in_column, column_ends[run_columns], ends)
+        counts = ends - run_rows
+
+        # Rank runs within each column by descending count with one integer sort
+        order = np.argsort(run_columns.astype(np.int64) * (rows + 1) + (rows - counts), kind="stable")
+        run_columns, run_rows, counts = run_columns[order], run_rows[order], counts[order]
+        first = np.searchsorted(run_columns, run_columns, side="left")
+        keep = (np.arange(len(run_columns)) - first) < k
+
+        values = matrix[run_rows[keep], run_columns[keep]]
+        if uniques is not None:
+            values = np.asarray(uniques, dtype=object)[values.astype(np.int64)]
+        return pd.DataFrame({
+            "Column Name": np.asarray(columns, dtype=object)[run_columns[keep]],
+            "Value": values,
+            "Count": counts[keep],
+        })
+
+    @staticmethod
+    def _lookup(codes: np.ndarray, table: np.ndarray) -> np.ndarray:
+        """Map a code matrix (NaN for nulls) through a per-code lookup table"""
+        valid = ~np.isnan(codes)
+        result = np.full(codes.shape, np.nan)
+        result[valid] = table[codes[valid].astype(np.int64)]
+        return result
+
+    def _numeric_matrix(self) -> np.ndarray:
+        """Get all numeric columns as one float matrix with NaN for nulls"""
+        if self._matrix is None:
+            self._matrix = self.df[self.numeric_columns].to_numpy(dtype=float, na_value=np.nan)
+        return self._matrix
+
+    def _sorted_numeric(self) -> np.ndarray:
+        """Get the numeric matrix sorted down each column, NaNs last"""
+        if self._sorted is None:
+            self._sorted = np.sort(self._numeric_matrix(), axis=0)
+        return self._sorted
+
+    def _quantiles(self, probabilities) -> np.ndarray:
+        """
+        Compute quantiles of every numeric column from the sorted matrix
+
+        Uses linear interpolation like numpy's default, without the
+        per-column fallback numpy takes when NaNs are present.
+
+        Returns:
+            Array of shape (len(probabilities), number of numeric columns)
+        """
+        ordered = self._sorted_numeric()
+        valid = (~np.isnan(ordered)).sum(axis=0)
+        positions = np.asarray(probabilities, dtype=float)[:, None] * np.maximum(valid - 1, 0)
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.minimum(lower + 1, np.maximum(valid - 1, 0))
+        low_values = np.take_along_axis(ordered, lower, axis=0) if len(ordered) else np.full(positions.shape, np.nan)
+        high_values = np.take_along_axis(ordered, upper, axis=0) if len(ordered) else np.full(positions.shape, np.nan)
+        result = low_values + (positions - lower) * (high_values - low_values)
+        result[:, valid == 0] = np.nan
+        return result
+
+    def _factorized(self):
+        """Factorize all non-numeric columns together into a float code matrix (NaN for nulls)"""
+        if self._codes is None:
+            values = self.df[self.other_columns].to_numpy(dtype=object)
+            codes, uniques = pd.factorize(values.ravel(order="F"), use_na_sentinel=True)
+            codes = codes.reshape(values.shape, order="F").astype(float)
+            codes[codes < 0] = np.nan
+            self._codes, self._uniques = codes, np.asarray(uniques, dtype=object)
+        return self._codes, self._uniques
+
+    def _exact_factorized(self):
+        """
+        Factorize integer and boolean columns one by one into a float code matrix (NaN for nulls)
+
+        Each column is factorized on its own dtype, so the uniques keep exact values and
+        booleans are never merged with the integers 0 and 1.
+        """
+        if self._exact_codes is None:
+            codes = np.empty((len(self.df), len(self.exact_columns)))
+            uniques = []
+            for i, column in enumerate(self.exact_columns):
+                column_codes, column_uniques = pd.factorize(self.df[column], use_na_sentinel=True)
+                codes[:, i] = np.where(column_codes < 0, np.nan, column_codes + len(uniques))
+                uniques.extend(column_uniques.tolist())
+            self._exact_codes = (codes, np.asarray(uniques, dtype=object))
+        return self._exact_codes
+
+    def _string_codes(self) -> np.ndarray:
+        """Get the code matrix restricted to string columns"""
+        codes = self._factorized()[0]
+        positions = {c: i for i, c in enumerate(self.other_columns)}
+        return codes[:, [positions[c] for c in self.string_columns]]
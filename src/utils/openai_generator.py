@@ -1,17 +1,20 @@
 import openai
-from typing import List, Dict
+from typing import List, Dict, Optional
+from src.monitoring import instrumented, annotate
 
 class OpenAIGenerator:
-    def __init__(self, api_key: str):
-        """Initialize OpenAI client"""
-        self.client = openai.OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, client=None):
+        """Initialize OpenAI client (an existing client can be passed in, e.g. for benchmarks)"""
+        self.client = client if client is not None else openai.OpenAI(api_key=api_key)
 
+    @instrumented("openai")
     def generate_create_view_query(
         self,
         view_name: str,
         tables: List[str],
         table_columns: Dict[str, List[Dict]],
-        join_conditions: str
+        join_conditions: str,
+        feedback: Optional[str] = None
     ) -> str:
         """
         Generate CREATE VIEW query using OpenAI API
@@ -21,6 +24,7 @@ class OpenAIGenerator:
             tables: List of table names
             table_columns: Dictionary of table columns
             join_conditions: Natural language description of join conditions
+            feedback: Problems found in a previous attempt, to be fixed in this one
             
         Returns:
             str: Generated CREATE VIEW query
@@ -46,6 +50,12 @@ class OpenAIGenerator:
         
         Return only the SQL query without any explanations or markdown formatting.
         """
+        if feedback:
+            prompt += f"""
+        A previous attempt was rejected before execution:
+        {feedback}
+        Generate a corrected statement.
+        """
         
         # Call OpenAI API
         response = self.client.chat.completions.create(
@@ -59,6 +69,7 @@ class OpenAIGenerator:
         
         # Extract and clean the query
         query = response.choices[0].message.content.strip()
+        annotate(bytes=len(query))
         return query
 
     def _format_table_columns(self, table_columns: Dict[str, List[Dict]]) -> str:
@@ -1,33 +1,171 @@
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import threading
+from src.monitoring import instrumented
+from .persistence import check_integrity, take_snapshot, list_snapshots, quarantine, restore_snapshot
 
-class ChromaManager:
-    def __init__(self, persist_directory: str = "./chroma_db"):
-        # Ensure the directory exists
-        os.makedirs(persist_directory, exist_ok=True)
-        
+# Persistent clients shared by every ChromaManager in the process, keyed by absolute directory,
+# so HNSW indexes are loaded once per process instead of once per Streamlit session
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.RLock()
+
+# Per-directory locks pausing this process's writes while a snapshot is taken
+_write_locks: Dict[str, threading.RLock] = {}
+
+# Errors from chromadb, SQLite or hnswlib that mean the files on disk are damaged
+_CORRUPTION_MARKERS = (
+    "database disk image is malformed",
+    "file is not a database",
+    "corrupt",
+    "cannot open file",
+    "index seems to be",
+)
+
+def _release_client(persist_directory: str):
+    """Stop and forget the shared client of a directory (chromadb keeps one System per path)"""
+    with _clients_lock:
+        client = _clients.pop(persist_directory, None)
         try:
-            self.client = chromadb.Client(Settings(
-                persist_directory=persist_directory,
-                anonymized_telemetry=False
-            ))
+            from chromadb.api.client import SharedSystemClient
+            systems = getattr(SharedSystemClient, "_identifer_to_system", None)
+            if isinstance(systems, dict):
+                system = systems.pop(persist_directory, None)
+            else:
+                # Cache layout of another chromadb version: drop every cached system, and the clients using them
+                system = getattr(client, "_system", None) if client is not None else None
+                SharedSystemClient.clear_system_cache()
+                _clients.clear()
+            if system is not None:
+                system.stop()
+        except Exception as e:
+            print(f"Error closing ChromaDB client: {str(e)}")
+
+def _is_corruption(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in _CORRUPTION_MARKERS)
+
+class ChromaManager:
+    def __init__(self, persist_directory: str = "./chroma_db", snapshot_directory: Optional[str] = None,
+                 keep_snapshots: int = 3, snapshot_interval: Optional[timedelta] = timedelta(hours=24)):
+        """
+        Initialize the vector store on a persistent ChromaDB directory
+
+        The directory is integrity-checked before it is opened. A damaged store is moved
+        aside (never deleted) and the latest good snapshot is restored, so a restart does
+        not force every embedding to be rebuilt.
+
+        Args:
+            persist_directory: ChromaDB data directory
+            snapshot_directory: Where snapshots are kept (default: <persist_directory>_snapshots)
+            keep_snapshots: Snapshots kept; older ones are deleted
+            snapshot_interval: Take a snapshot on open when the latest is older than this (None to disable)
+        """
+        self.persist_directory = os.path.abspath(persist_directory)
+        self.snapshot_directory = snapshot_directory or f"{self.persist_directory}_snapshots"
+        self.keep_snapshots = keep_snapshots
+        self.snapshot_interval = snapshot_interval
+        with _clients_lock:
+            self._lock = _write_locks.setdefault(self.persist_directory, threading.RLock())
+            self._open()
+
+    def _open(self):
+        """Get the shared client for the directory, recovering from a damaged store once (caller holds _clients_lock)"""
+        self.client = _clients.get(self.persist_directory)
+        if self.client is not None:
             self._initialize_collections()
+            return
+
+        os.makedirs(self.persist_directory, exist_ok=True)
+        ok, detail = check_integrity(self.persist_directory)
+        if not ok:
+            self._recover(detail)
+        try:
+            self._connect()
         except Exception as e:
             print(f"Error initializing ChromaDB: {str(e)}")
-            # Try to reinitialize with a clean state
-            if os.path.exists(persist_directory):
-                import shutil
-                shutil.rmtree(persist_directory)
-            os.makedirs(persist_directory, exist_ok=True)
-            self.client = chromadb.Client(Settings(
-                persist_directory=persist_directory,
-                anonymized_telemetry=False
-            ))
-            self._initialize_collections()
+            _release_client(self.persist_directory)
+            # Only damage on disk is recovered from a snapshot; lock, permission or version errors
+            # are raised, since replacing the store would lose everything written after the snapshot
+            ok, detail = check_integrity(self.persist_directory)
+            if ok and not _is_corruption(e):
+                raise
+            self._recover(detail if not ok else str(e))
+            self._connect()
+
+        if self.snapshot_interval is not None:
+            snapshots = list_snapshots(self.snapshot_directory)
+            latest = datetime.fromisoformat(snapshots[0]["created_at"]) if snapshots else None
+            if latest is None or datetime.now() - latest >= self.snapshot_interval:
+                try:
+                    self.snapshot()
+                except Exception as e:
+                    print(f"Error taking ChromaDB snapshot: {str(e)}")
+
+    def _connect(self):
+        """Open the persistent client and its collections, and share the client"""
+        self.client = chromadb.PersistentClient(
+            path=self.persist_directory,
+            settings=Settings(anonymized_telemetry=False)
+        )
+        self._initialize_collections()
+        # Reading the counts touches every collection's catalog entries, surfacing damage now
+        for collection in (self.dataset_collection, self.table_collection, self.relationship_collection):
+            collection.count()
+        _clients[self.persist_directory] = self.client
+
+    def _recover(self, detail: str):
+        """Move a damaged store aside and restore the latest snapshot, or start empty"""
+        print(f"ChromaDB store at {self.persist_directory} is damaged ({detail})")
+        moved_to = quarantine(self.persist_directory)
+        if moved_to:
+            print(f"Moved damaged store to {moved_to}")
+        for snapshot in list_snapshots(self.snapshot_directory):
+            try:
+                restore_snapshot(snapshot["path"], self.persist_directory)
+                print(f"Restored ChromaDB snapshot {snapshot['name']}")
+                return
+            except Exception as e:
+                print(f"Error restoring ChromaDB snapshot {snapshot['name']}: {str(e)}")
+        os.makedirs(self.persist_directory, exist_ok=True)
+        print("No usable snapshot; starting with an empty store")
+
+    def verify(self) -> tuple:
+        """Check the store on disk; returns (ok, detail)"""
+        with self._lock:
+            return check_integrity(self.persist_directory)
+
+    def snapshot(self) -> str:
+        """Take an atomic snapshot of the store; returns its path"""
+        with self._lock:
+            return take_snapshot(self.persist_directory, self.snapshot_directory, self.keep_snapshots)
+
+    def list_snapshots(self) -> List[Dict[str, str]]:
+        """Available snapshots, newest first"""
+        return list_snapshots(self.snapshot_directory)
+
+    def restore(self, name: Optional[str] = None):
+        """
+        Replace the store with a snapshot (the latest when no name is given)
+
+        The current store is moved aside, not deleted. Other ChromaManager instances in
+        this process must be recreated afterwards.
+        """
+        snapshots = list_snapshots(self.snapshot_directory)
+        snapshot = next((s for s in snapshots if name is None or s["name"] == name), None)
+        if snapshot is None:
+            raise ValueError(f"No snapshot named {name}" if name else "No snapshots available")
+        with _clients_lock, self._lock:
+            _release_client(self.persist_directory)
+            restore_snapshot(snapshot["path"], self.persist_directory)
+            self._connect()
+
+    def close(self):
+        """Release the shared client of this directory"""
+        _release_client(self.persist_directory)
 
     def _initialize_collections(self):
         """Initialize or get collections for different types of data"""
@@ -45,6 +183,7 @@ class ChromaManager:
             print(f"Error initializing collections: {str(e)}")
             raise
 
+    @instrumented("chroma")
     def save_dataset(self, dataset_name: str, description: str, tables: List[str]):
         """Save dataset information"""
         try:
@@ -53,15 +192,17 @@ class ChromaManager:
                 "tables": json.dumps(tables),
                 "created_at": datetime.now().isoformat()
             }
-            self.dataset_collection.upsert(
-                documents=[description],
-                metadatas=[metadata],
-                ids=[f"dataset_{dataset_name}"]
-            )
+            with self._lock:
+                self.dataset_collection.upsert(
+                    documents=[description],
+                    metadatas=[metadata],
+                    ids=[f"dataset_{dataset_name}"]
+                )
         except Exception as e:
             print(f"Error saving dataset: {str(e)}")
             raise
 
+    @instrumented("chroma")
     def save_table_metadata(self, dataset_name: str, table_name: str, 
                           columns: List[Dict], description: str):
         """Save table metadata"""
@@ -72,15 +213,17 @@ class ChromaManager:
                 "description": description,
                 "created_at": datetime.now().isoformat()
             }
-            self.table_collection.upsert(
-                documents=[description],
-                metadatas=[metadata],
-                ids=[f"table_{dataset_name}_{table_name}"]
-            )
+            with self._lock:
+                self.table_collection.upsert(
+                    documents=[description],
+                    metadatas=[metadata],
+                    ids=[f"table_{dataset_name}_{table_name}"]
+                )
         except Exception as e:
             print(f"Error saving table metadata: {str(e)}")
             raise
 
+    @instrumented("chroma")
     def save_relationship(self, dataset_name: str, source_table: str, 
                         target_table: str, join_conditions: List[Dict]):
         """Save table relationships"""
@@ -92,15 +235,17 @@ class ChromaManager:
                 "join_conditions": json.dumps(join_conditions),
                 "created_at": datetime.now().isoformat()
             }
-            self.relationship_collection.upsert(
-                documents=[f"Join relationship between {source_table} and {target_table}"],
-                metadatas=[metadata],
-                ids=[f"rel_{dataset_name}_{source_table}_{target_table}"]
-            )
+            with self._lock:
+                self.relationship_collection.upsert(
+                    documents=[f"Join relationship between {source_table} and {target_table}"],
+                    metadatas=[metadata],
+                    ids=[f"rel_{dataset_name}_{source_table}_{target_table}"]
+                )
         except Exception as e:
             print(f"Error saving relationship: {str(e)}")
             raise
 
+    @instrumented("chroma")
     def get_dataset_info(self, dataset_name: str) -> Optional[Dict]:
         """Retrieve dataset information"""
         try:
@@ -114,6 +259,7 @@ class ChromaManager:
             print(f"Error getting dataset info: {str(e)}")
             return None
 
+    @instrumented("chroma")
     def get_table_metadata(self, dataset_name: str, table_name: str) -> Optional[Dict]:
         """Retrieve table metadata"""
         try:
@@ -127,6 +273,7 @@ class ChromaManager:
             print(f"Error getting table metadata: {str(e)}")
             return None
 
+    @instrumented("chroma")
     def get_relationships(self, dataset_name: str) -> List[Dict]:
         """Retrieve all relationships for a dataset"""
         try:
@@ -0,0 +1,144 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+import json
+import os
+import shutil
+import sqlite3
+
+# Catalog database written by chromadb's persistent client
+CATALOG_FILE = "chroma.sqlite3"
+
+# Files every persisted HNSW vector segment directory must contain, and those that can never be empty
+# (link_lists.bin stays empty while the graph has a single level)
+_HNSW_FILES = ("header.bin", "data_level0.bin", "length.bin", "link_lists.bin")
+_HNSW_NON_EMPTY_FILES = ("header.bin", "data_level0.bin")
+
+_MANIFEST_FILE = "MANIFEST.json"
+
+def check_integrity(persist_directory: str) -> Tuple[bool, str]:
+    """
+    Check a persistent Chroma directory without opening it through chromadb
+
+    Runs SQLite's integrity_check on the catalog and verifies that every vector
+    segment directory on disk holds a complete HNSW index.
+
+    Returns:
+        (ok, detail)
+    """
+    catalog = os.path.join(persist_directory, CATALOG_FILE)
+    if not os.path.exists(catalog):
+        return True, "empty store"
+    try:
+        connection = sqlite3.connect(f"file:{catalog}?mode=ro", uri=True)
+        try:
+            result = connection.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != "ok":
+                return False, f"catalog integrity check failed: {result}"
+            try:
+                segments = [row[0] for row in connection.execute("SELECT id FROM segments WHERE scope = 'VECTOR'")]
+            except sqlite3.DatabaseError:
+                # Catalog layout of another chromadb version; the integrity check above still applies
+                segments = []
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError as e:
+        return False, f"catalog unreadable: {str(e)}"
+
+    for segment_id in segments:
+        segment_directory = os.path.join(persist_directory, segment_id)
+        # A segment only gets a directory once its index is first flushed
+        if not os.path.isdir(segment_directory):
+            continue
+        for name in _HNSW_FILES:
+            path = os.path.join(segment_directory, name)
+            if not os.path.isfile(path):
+                return False, f"vector segment {segment_id} is missing {name}"
+            if name in _HNSW_NON_EMPTY_FILES and os.path.getsize(path) == 0:
+                return False, f"vector segment {segment_id} has an empty {name}"
+    return True, "ok"
+
+def take_snapshot(persist_directory: str, snapshot_directory: str, keep: int = 3) -> str:
+    """
+    Copy a persistent Chroma directory into a new snapshot
+
+    The catalog is copied with SQLite's online backup API, so the copy is consistent
+    even if the catalog is open. The snapshot is assembled under a temporary name and
+    renamed into place, so a snapshot directory is either complete or absent.
+    Writers must be paused by the caller while the snapshot is taken.
+
+    Args:
+        persist_directory: Live Chroma directory
+        snapshot_directory: Directory holding the snapshots
+        keep: Snapshots kept; older ones are deleted
+
+    Returns:
+        Path of the new snapshot
+    """
+    os.makedirs(snapshot_directory, exist_ok=True)
+    name = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    staging = os.path.join(snapshot_directory, f".tmp-{name}")
+    target = os.path.join(snapshot_directory, name)
+
+    shutil.copytree(persist_directory, staging, ignore=shutil.ignore_patterns(f"{CATALOG_FILE}*"))
+    catalog = os.path.join(persist_directory, CATALOG_FILE)
+    if os.path.exists(catalog):
+        source = sqlite3.connect(catalog)
+        destination = sqlite3.connect(os.path.join(staging, CATALOG_FILE))
+        try:
+            source.backup(destination)
+        finally:
+            destination.close()
+            source.close()
+
+    ok, detail = check_integrity(staging)
+    if not ok:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise RuntimeError(f"Snapshot failed verification: {detail}")
+    with open(os.path.join(staging, _MANIFEST_FILE), "w", encoding="utf-8") as manifest:
+        json.dump({"created_at": datetime.now().isoformat(), "source": os.path.abspath(persist_directory)}, manifest)
+    os.replace(staging, target)
+
+    for old in list_snapshots(snapshot_directory)[keep:]:
+        shutil.rmtree(old["path"], ignore_errors=True)
+    return target
+
+def list_snapshots(snapshot_directory: str) -> List[Dict[str, str]]:
+    """Complete snapshots, newest first"""
+    if not os.path.isdir(snapshot_directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(snapshot_directory), reverse=True):
+        path = os.path.join(snapshot_directory, name)
+        if name.startswith(".") or not os.path.isfile(os.path.join(path, _MANIFEST_FILE)):
+            continue
+        with open(os.path.join(path, _MANIFEST_FILE), encoding="utf-8") as manifest:
+            snapshots.append({"name": name, "path": path, **json.load(manifest)})
+    return snapshots
+
+def quarantine(persist_directory: str, reason: str = "corrupt") -> Optional[str]:
+    """Move a Chroma directory aside (never delete it) so it can be inspected or recovered by hand"""
+    if not os.path.exists(persist_directory):
+        return None
+    target = f"{os.path.abspath(persist_directory)}.{reason}-{datetime.now():%Y%m%dT%H%M%S%f}"
+    os.replace(persist_directory, target)
+    return target
+
+def restore_snapshot(snapshot_path: str, persist_directory: str) -> Optional[str]:
+    """
+    Replace a Chroma directory with a copy of a snapshot
+
+    The snapshot is verified and copied next to the live directory first; the live
+    directory is then moved aside and the copy renamed into place.
+
+    Returns:
+        Where the replaced directory was moved, or None if there was none
+    """
+    ok, detail = check_integrity(snapshot_path)
+    if not ok:
+        raise RuntimeError(f"Snapshot {snapshot_path} failed verification: {detail}")
+    staging = f"{os.path.abspath(persist_directory)}.restoring"
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(snapshot_path, staging, ignore=shutil.ignore_patterns(_MANIFEST_FILE))
+    replaced = quarantine(persist_directory, "replaced")
+    os.replace(staging, persist_directory)
+    return replaced
@@ -0,0 +1,23 @@
+import sqlite3
+from src.cache.local_cache import LocalDatasetCache
+from src.database.connection import DatabaseConnection
+
+def test_extract_types_columns_that_are_null_in_the_first_batch(tmp_path):
+    source_path = tmp_path / "source.db"
+    with sqlite3.connect(source_path) as source:
+        source.execute("CREATE TABLE items (id INTEGER, label VARCHAR(20))")
+        source.executemany("INSERT INTO items VALUES (?, ?)",
+                           [(i, None if i < 5 else f"item {i}") for i in range(12)])
+        source.execute("CREATE VIEW v_items AS SELECT id, label FROM items ORDER BY id")
+
+    db = DatabaseConnection(f"sqlite:///{source_path}", watch_schema=False)
+    assert db.connect()
+    cache = LocalDatasetCache(str(tmp_path / "cache.duckdb"))
+    try:
+        assert cache.extract(db, "v_items", batch_size=5) == 12
+        frame = cache.load_frame(db, "v_items")
+        assert frame["label"].isna().sum() == 5
+        assert frame["label"].iloc[-1] == "item 11"
+    finally:
+        cache.close()
+        db.close()